@@ -0,0 +1 @@
+"""Performance benchmarks run against a fake Ollama server."""
@@ -0,0 +1,182 @@
+"""Deterministic stand-in for the Ollama HTTP API used by the benchmarks.
+
+Only the endpoints the agents rely on are implemented: ``/api/generate``
+and ``/api/chat`` (streaming and non-streaming) plus ``/api/tags``.  Each
+response waits ``latency`` seconds before the first token and then emits
+tokens at ``tokens_per_second``; both are scaled by a seeded random jitter
+so runs are reproducible.
+
+Prompts of the form ``PLAN <n>`` are answered with a numbered list of
+``n`` steps, which lets scenarios control how many tasks the manager
+dispatches.  Every other prompt yields ``response_tokens`` tokens of code.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+_PLAN_RE = re.compile(r"PLAN\s+(\d+)")
+
+
+class FakeOllama:
+    """Local fake Ollama server.
+
+    Parameters
+    ----------
+    latency:
+        Seconds before the first token of every response.
+    tokens_per_second:
+        Generation speed, ``0`` emits all tokens at once.
+    jitter:
+        Relative random variation applied to latency and token delays,
+        e.g. ``0.1`` for +/-10%.
+    response_tokens:
+        Number of tokens returned for non-planning prompts.
+    seed:
+        Seed of the jitter generator.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.05,
+        tokens_per_second: float = 200.0,
+        jitter: float = 0.0,
+        response_tokens: int = 32,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.response_tokens = response_tokens
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-ollama", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    def _scale(self, value: float) -> float:
+        if not self.jitter or not value:
+            return value
+        with self._rng_lock:
+            factor = 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, value * factor)
+
+    def tokens_for(self, prompt: str) -> List[str]:
+        """Return the tokens answering ``prompt``."""
+        match = _PLAN_RE.search(prompt)
+        if match:
+            count = int(match.group(1))
+            text = "\n".join(f"{i}. step {i}" for i in range(1, count + 1))
+            return re.findall(r"\S+\s*", text)
+        return [f"tok{i} " for i in range(self.response_tokens)]
+
+    def generate(self, prompt: str) -> Iterator[str]:
+        """Yield tokens for ``prompt`` with the configured timing."""
+        self.requests += 1
+        time.sleep(self._scale(self.latency))
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for token in self.tokens_for(prompt):
+            if delay:
+                time.sleep(self._scale(delay))
+            yield token
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path == "/api/tags":
+                    self._json({"models": []})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                length = int(self.headers.get("Content-Length") or 0)
+                body: Dict[str, Any] = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    prompt = body.get("prompt", "")
+                    wrap = lambda text: {"response": text}  # noqa: E731
+                elif self.path == "/api/chat":
+                    messages = body.get("messages") or [{}]
+                    prompt = messages[-1].get("content", "")
+                    wrap = lambda text: {  # noqa: E731
+                        "message": {"role": "assistant", "content": text}
+                    }
+                else:
+                    self.send_error(404)
+                    return
+                base = {"model": body.get("model", "fake"), "created_at": _now()}
+                tokens = fake.generate(prompt)
+                if body.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    count = 0
+                    for token in tokens:
+                        count += 1
+                        self._chunk({**base, **wrap(token), "done": False})
+                    self._chunk({**base, **wrap(""), "done": True, "eval_count": count})
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    text = "".join(tokens)
+                    self._json({**base, **wrap(text), "done": True})
+
+            def _chunk(self, data: Dict[str, Any]) -> None:
+                line = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, data: Dict[str, Any]) -> None:
+                payload = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        return Handler
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
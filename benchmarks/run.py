@@ -0,0 +1,184 @@
+"""End-to-end orchestration benchmarks against :mod:`benchmarks.fake_ollama`.
+
+Each scenario builds a manager with :func:`cli.build_manager` and runs
+:meth:`Manager.act` on an objective planned into ``tasks`` steps, spread
+over ``agents`` worker agents.  Scenarios run in a fresh process so that
+the reported peak RSS belongs to that scenario alone.
+
+Usage::
+
+    python -m benchmarks.run [--output results.json]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+
+The exit status is ``1`` when a scenario regressed against the baseline
+by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT / "src") not in sys.path:
+    sys.path.append(str(ROOT / "src"))
+
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+
+# Synchronous worker agents, in the order they are added to scenarios.
+WORKERS = ("developer", "writer", "planner")
+DEFAULT_TASKS = (8, 32, 128)
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank ``pct`` percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def scenarios(task_counts: Sequence[int], agent_counts: Sequence[int]) -> List[Dict[str, Any]]:
+    return [
+        {"name": f"tasks={t},agents={a}", "tasks": t, "agents": list(WORKERS[:a])}
+        for a in agent_counts
+        for t in task_counts
+    ]
+
+
+def agents_config(names: Sequence[str], url: str) -> Dict[str, Any]:
+    return {
+        "objective": "",
+        "supervision": {"enabled": False},
+        "agents": {
+            name: {
+                "role": name.title(),
+                "goal": f"Benchmark {name}",
+                "backstory": "Synthetic benchmark agent.",
+                "llm": {"model": "fake", "base_url": url, "temperature": 0.0},
+            }
+            for name in names
+        },
+    }
+
+
+def run_scenario(scenario: Dict[str, Any], url: str) -> Dict[str, Any]:
+    """Run ``scenario`` against the fake server at ``url``; used in a child process."""
+    # The manager's own model has no configured base URL and falls back to
+    # the Ollama client's environment variable.
+    os.environ["OLLAMA_HOST"] = url
+    from cli import build_manager
+    from core.tracing import TRACER
+
+    manager = build_manager(agents_config(scenario["agents"], url))
+    TRACER.enable()
+    start = time.perf_counter()
+    results = manager.act(f"PLAN {scenario['tasks']}")
+    elapsed = time.perf_counter() - start
+    TRACER.disable()
+    latencies = [
+        e["dur"] / 1e6
+        for e in TRACER.spans()
+        if e["cat"] == "agent" and e["name"].endswith(".act")
+    ]
+    return {
+        **scenario,
+        "completed": len(results),
+        "seconds": elapsed,
+        "throughput": len(results) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run(
+    scenario_list: Sequence[Dict[str, Any]], server: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run every scenario against a fake server configured by ``server``."""
+    ctx = multiprocessing.get_context("spawn")
+    out: List[Dict[str, Any]] = []
+    with FakeOllama(**server) as fake:
+        for scenario in scenario_list:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                out.append(pool.submit(run_scenario, scenario, fake.url).result())
+    return {"server": server, "scenarios": out}
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2
+) -> List[str]:
+    """Return regressions of ``current`` against ``baseline``.
+
+    Throughput may drop, and latency percentiles or peak RSS may grow, by
+    at most ``tolerance`` (a fraction) before a scenario is reported.
+    """
+    previous = {s["name"]: s for s in baseline.get("scenarios", [])}
+    problems: List[str] = []
+    for s in current["scenarios"]:
+        base = previous.get(s["name"])
+        if base is None:
+            continue
+        if s["throughput"] < base["throughput"] * (1 - tolerance):
+            problems.append(
+                f"{s['name']}: throughput {s['throughput']:.2f}/s < {base['throughput']:.2f}/s"
+            )
+        for key in ("p50", "p95", "p99", "peak_rss_kb"):
+            if base[key] and s[key] > base[key] * (1 + tolerance):
+                problems.append(f"{s['name']}: {key} {s[key]:.4g} > {base[key]:.4g}")
+    return problems
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=list(DEFAULT_TASKS))
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, len(WORKERS)])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--jitter", type=float, default=0.1, help="relative, e.g. 0.1")
+    parser.add_argument("--response-tokens", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    server = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "jitter": args.jitter,
+        "response_tokens": args.response_tokens,
+        "seed": args.seed,
+    }
+    agent_counts = [min(a, len(WORKERS)) for a in args.agents]
+    result = run(scenarios(args.tasks, agent_counts), server)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text)
+    if args.save_baseline:
+        args.baseline.write_text(text)
+        return 0
+    if args.baseline.exists():
+        problems = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in problems:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
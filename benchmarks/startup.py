@@ -0,0 +1,93 @@
+"""Startup benchmark for the ``ollama-crewai-agents`` CLI.
+
+Measures, in fresh interpreters, the wall-clock time to print ``--help``
+and the time from process launch until the first task has completed
+against :mod:`benchmarks.fake_ollama`.
+
+Usage::
+
+    python -m benchmarks.startup [--runs 5] [--output startup.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.run import ROOT, agents_config
+
+_HELP = "import sys, cli; sys.argv = ['ollama-crewai-agents', '--help']; cli.main()"
+
+# Builds a manager for the config given in argv[1] and runs one task.
+_FIRST_TASK = """
+import json, sys, time
+import cli
+manager = cli.build_manager(json.loads(sys.argv[1]))
+manager.act("PLAN 1")
+print(time.time())
+"""
+
+
+def _env(url: str | None = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    if url is not None:
+        env["OLLAMA_HOST"] = url
+    return env
+
+
+def time_help() -> float:
+    """Return the seconds needed to print the CLI help."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", _HELP], env=_env(), check=True, stdout=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def time_first_task(url: str, agents: Sequence[str] = ("developer",)) -> float:
+    """Return the seconds from launch until the first task completed."""
+    config = json.dumps(agents_config(agents, url))
+    start = time.time()
+    out = subprocess.run(
+        [sys.executable, "-c", _FIRST_TASK, config],
+        env=_env(url),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1]) - start
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    samples: Dict[str, List[float]] = {"help": [], "first_task": []}
+    with FakeOllama(latency=0, tokens_per_second=0) as fake:
+        for _ in range(args.runs):
+            samples["help"].append(time_help())
+            samples["first_task"].append(time_first_task(fake.url))
+    result: Dict[str, Any] = {
+        name: {"median": statistics.median(values), "min": min(values), "runs": values}
+        for name, values in samples.items()
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,34 @@
-"""Agents package exposing subclasses of :class:`crewai.Agent`."""
+"""Agents package exposing subclasses of :class:`crewai.Agent`.
 
-from .base import Agent
-from .manager import Manager
-from .planner import PlannerAgent
-from .researcher import ResearcherAgent
-from .developer import DeveloperAgent
-from .tester import TesterAgent
-from .writer import WriterAgent
+Agent classes are imported on first attribute access so that importing a
+single submodule, such as :mod:`agents.message`, does not load ``crewai``
+and every agent implementation.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    from .base import Agent
+    from .developer import DeveloperAgent
+    from .manager import Manager
+    from .planner import PlannerAgent
+    from .researcher import ResearcherAgent
+    from .tester import TesterAgent
+    from .writer import WriterAgent
+
+# Public name -> defining submodule
+_LAZY = {
+    "Agent": ".base",
+    "Manager": ".manager",
+    "PlannerAgent": ".planner",
+    "ResearcherAgent": ".researcher",
+    "DeveloperAgent": ".developer",
+    "TesterAgent": ".tester",
+    "WriterAgent": ".writer",
+}
 
 __all__ = [
     "Agent",
@@ -17,3 +39,16 @@ __all__ = [
     "TesterAgent",
     "WriterAgent",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *__all__])
@@ -3,17 +3,24 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, List, Optional, Union
 
 from langchain_ollama import OllamaLLM
 
+from core.files import default_output
+from core.metrics import LLM_SECONDS
+from core.tracing import span, traced
+
 from .base import Agent
+from .planning import ainvoke_text
 
 
 class DeveloperAgent(Agent):
     """Agent that uses an LLM to generate code and optionally save it."""
 
     last_written: Optional[Path] = None
+    changed_paths: List[Path] = []
+    output: Any = None
 
     def __init__(
         self,
@@ -35,10 +42,13 @@ class DeveloperAgent(Agent):
             allow_delegation=allow_delegation,
         )
         self.last_written = None
+        self.changed_paths = []
+        self.output = default_output()
 
     def plan(self) -> str:
         return "ready"
 
+    @traced()
     def act(
         self,
         prompt: str,
@@ -46,12 +56,34 @@ class DeveloperAgent(Agent):
         path: Union[str, Path] | None = None,
     ) -> str:
         """Generate code from ``prompt`` and optionally write to ``path``."""
-        code = self.llm.invoke(prompt)
+        llm_seconds = LLM_SECONDS.labels(agent="developer")
+        with span("llm.invoke", "llm", agent="developer"), llm_seconds.time():
+            code = self.llm.invoke(prompt)
+        self.changed_paths = []
+        if path is not None:
+            p = Path(path)
+            self.output.put(p, code)
+            self.last_written = p
+            self.changed_paths = [p]
+        return code
+
+    @traced()
+    async def aact(
+        self,
+        prompt: str,
+        *,
+        path: Union[str, Path] | None = None,
+    ) -> str:
+        """Asynchronous counterpart of :meth:`act` using ``llm.ainvoke``."""
+        llm_seconds = LLM_SECONDS.labels(agent="developer")
+        with span("llm.invoke", "llm", agent="developer"), llm_seconds.time():
+            code = await ainvoke_text(self.llm, prompt)
+        self.changed_paths = []
         if path is not None:
             p = Path(path)
-            p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(code)
+            await self.output.awrite(p, code)
             self.last_written = p
+            self.changed_paths = [p]
         return code
 
     def observe(self, result: str) -> None:
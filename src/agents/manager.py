@@ -2,19 +2,63 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import asyncio
+import inspect
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Tuple
 
 from langchain_ollama import OllamaLLM
 
+from core.bus import MessageBus
+from core.history import MessageHistory, intern
+from core.metrics import TASK_SECONDS, TASKS
+from core.profiling import bind, task_scope
+from core.scheduler import TaskScheduler
+from core.task import Task, TaskStatus
+from core.tracing import traced
+
 from .base import Agent
+from .message import Message
+from .planning import aiter_tasks, astream_text, iter_tasks, stream_text
+from .pool import AgentPool
+
+# Supervisor replies that stop a run before any task is dispatched.
+ABORT_COMMANDS = frozenset({"abort", "cancel", "reject", "stop"})
 
 
 class Manager(Agent):
-    """Simple manager that distributes tasks to other agents."""
+    """Simple manager that distributes tasks to other agents.
+
+    :meth:`run` is the asynchronous entry point used by the CLI: agents
+    providing ``aact`` or a coroutine ``act`` are awaited, while remaining
+    synchronous agents run on a thread pool of ``sync_workers`` threads so
+    the event loop never blocks on model I/O.
+    """
+
+    agents: Dict[str, Any] = {}
+    pools: Dict[str, Any] = {}
+    tasks: List[str] = []
+    results: List[Tuple[str, str]] = []
+    storage: Any = None
+    residency: Any = None
+    group_by_model: bool = False
+    limiter: Any = None
+    bus: Any = None
+    executor: Any = None
+    sync_workers: int = 4
+    parallelism: int | None = None
+    task_timeout: float | None = None
+    context: Any = None
+    decisions: Any = None
+    messages: Any = None
+    history_window: int = 500
 
     def __init__(
         self,
-        agents: Dict[str, Agent] | None = None,
+        agents: Dict[str, Agent | AgentPool] | None = None,
         *,
         role: str = "Manager",
         goal: str = "Coordinate agents to accomplish objectives",
@@ -23,6 +67,17 @@ class Manager(Agent):
         llm: OllamaLLM | None = None,
         verbose: bool = False,
         allow_delegation: bool = True,
+        storage: Any = None,
+        residency: Any = None,
+        group_by_model: bool = False,
+        limiter: Any = None,
+        bus: MessageBus | None = None,
+        executor: ThreadPoolExecutor | None = None,
+        sync_workers: int = 4,
+        parallelism: int | None = None,
+        task_timeout: float | None = None,
+        context: Any = None,
+        history_window: int = 500,
     ) -> None:
         super().__init__(
             role=role,
@@ -32,26 +87,415 @@ class Manager(Agent):
             verbose=verbose,
             allow_delegation=allow_delegation,
         )
-        self.agents: Dict[str, Agent] = agents or {}
         self.tasks: List[str] = []
         self.results: List[Tuple[str, str]] = []
+        self.storage = storage
+        self.residency = residency
+        self.group_by_model = group_by_model
+        self.limiter = limiter
+        self.bus = bus or MessageBus()
+        self.executor = executor
+        self.sync_workers = sync_workers
+        self.parallelism = parallelism
+        self.task_timeout = task_timeout
+        self.context = context
+        # Supervisor replies, bounded like the message history they are part of.
+        self.decisions: Deque[str] = deque(maxlen=history_window)
+        self.history_window = history_window
+        self.messages = MessageHistory(
+            history_window, spill=storage.append_history if storage is not None else None
+        )
+        self.agents: Dict[str, Agent] = {}
+        self.pools: Dict[str, AgentPool] = {}
+        for name, agent in (agents or {}).items():
+            self.register_agent(name, agent)
+
+    def register_agent(self, name: str, agent: Agent | AgentPool) -> None:
+        """Add ``agent`` under ``name`` and connect it to the message bus.
+
+        ``agent`` may be an :class:`AgentPool` of replicas; :attr:`agents`
+        then maps ``name`` to its primary replica and tasks are spread over
+        all of them.
+        """
+        pool = self._connect(name, agent)
+        self.pools[name] = pool
+        self.agents[name] = pool.primary
+
+    def replace_agents(self, agents: Dict[str, Agent | AgentPool]) -> None:
+        """Swap all registered agents for ``agents`` at once.
 
+        Tasks already running keep the replica they leased; tasks started
+        afterwards use the new agents.
+        """
+        pools = {name: self._connect(name, agent) for name, agent in agents.items()}
+        self.pools = pools
+        self.agents = {name: pool.primary for name, pool in pools.items()}
+
+    def _connect(self, name: str, agent: Agent | AgentPool) -> AgentPool:
+        """Return ``agent`` as a pool whose replicas are connected to the bus."""
+        pool = agent if isinstance(agent, AgentPool) else AgentPool([agent])
+        self.bus.register(name)
+        for replica in pool:
+            if "bus" in type(replica).model_fields and getattr(replica, "bus", None) is None:
+                replica.bus = self.bus
+        return pool
+
+    def fork(self) -> "Manager":
+        """Return a manager sharing agents, model and storage with ``self``.
+
+        The fork has its own task and result lists, so several objectives
+        can be run concurrently without rebuilding agents or LLM clients.
+        """
+        return Manager(
+            self.pools,
+            role=self.role,
+            goal=self.goal,
+            backstory=self.backstory,
+            llm=self.llm,
+            storage=self.storage,
+            residency=self.residency,
+            group_by_model=self.group_by_model,
+            limiter=self.limiter,
+            bus=self.bus,
+            executor=self._pool(),
+            sync_workers=self.sync_workers,
+            parallelism=self.parallelism,
+            task_timeout=self.task_timeout,
+            context=self.context.fork() if self.context is not None else None,
+            history_window=self.history_window,
+        )
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Return the bounded pool running synchronous agents."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.sync_workers, thread_name_prefix="agent-sync"
+            )
+        return self.executor
+
+    @traced("Manager.plan", "orchestrator")
     def plan(self, objective: str) -> List[str]:
-        plan_text = self.llm.invoke(objective)
-        self.tasks = [t.strip().lstrip("-0123456789. ") for t in plan_text.splitlines() if t.strip()]
-        return self.tasks
+        return list(self.stream_plan(objective))
+
+    def stream_plan(self, objective: str) -> Iterator[str]:
+        """Yield tasks for ``objective`` as soon as each plan line is generated."""
+        self.tasks = []
+        for task in iter_tasks(stream_text(self.llm, objective)):
+            self.tasks.append(task)
+            yield task
 
+    async def astream_plan(self, objective: str) -> AsyncIterator[str]:
+        """Asynchronous counterpart of :meth:`stream_plan`."""
+        self.tasks = []
+        async for task in aiter_tasks(astream_text(self.llm, objective)):
+            self.tasks.append(task)
+            yield task
+
+    @traced("Manager.act", "orchestrator")
     def act(self, objective: str) -> List[Tuple[str, str]]:
-        tasks = self.plan(objective)
+        """Plan ``objective`` and dispatch each task as soon as it is parsed.
+
+        Tasks are consumed from :meth:`stream_plan`, so the first agent
+        starts working while the model is still generating later steps.
+        With :attr:`group_by_model` the whole plan is read first and tasks
+        are executed grouped by their agent's model; results are still
+        returned in plan order.
+        """
+        steps = sorted(self._steps(objective))
+        self.results = [(task, response) for _, task, response in steps]
+        return self.results
+
+    def iter_act(self, objective: str) -> Iterator[Tuple[str, str]]:
+        """Yield ``(task, response)`` pairs of :meth:`act` as they complete."""
+        for _, task, response in self._steps(objective):
+            yield task, response
+
+    def _steps(self, objective: str) -> Iterator[Tuple[int, str, str]]:
         agent_names = list(self.agents.keys())
-        results: List[Tuple[str, str]] = []
-        for idx, task in enumerate(tasks):
-            agent = self.agents[agent_names[idx % len(agent_names)]]
-            response = agent.act(task)
+        pools = self.pools
+        if self.context is not None:
+            self.context.clear()
+        planned: Iterable[Tuple[int, str]] = enumerate(self.stream_plan(objective))
+        if self.group_by_model:
+            planned = self._group_by_model(list(planned), agent_names)
+        for idx, task in planned:
+            name = agent_names[idx % len(agent_names)]
+            pool = self.pools.get(name) or pools[name]
+            if self.residency is not None:
+                self.residency.note(pool.primary.llm)
+            try:
+                with ExitStack() as stack:
+                    stack.enter_context(task_scope(name, idx + 1))
+                    agent = stack.enter_context(pool.lease())
+                    host = self._limited_host(agent)
+                    if host is not None:
+                        stack.enter_context(self.limiter.slot(host))
+                    stack.enter_context(TASK_SECONDS.labels(agent=name).time())
+                    response = _act(agent, self._prompt(name, agent, task))
+            except Exception:
+                TASKS.labels(agent=name, status="failed").inc()
+                raise
+            TASKS.labels(agent=name, status="completed").inc()
+            if self.context is not None:
+                self.context.add(task, response)
             agent.observe(response)
-            results.append((task, response))
-        self.results = results
-        return results
+            self._share_changes(agent)
+            yield idx, task, response
+
+    def _group_by_model(
+        self, planned: List[Tuple[int, str]], agent_names: List[str]
+    ) -> List[Tuple[int, str]]:
+        """Reorder ``planned`` so tasks for the same model run back to back."""
+        from core.residency import ModelResidency
+
+        residency = self.residency or ModelResidency()
+        llms = [self.agents[agent_names[idx % len(agent_names)]].llm for idx, _ in planned]
+        return [planned[i] for i in residency.order(llms)]
+
+    @traced("Manager.aplan", "orchestrator")
+    async def aplan(self, objective: str) -> List[str]:
+        """Plan ``objective`` through the model's async streaming API."""
+        return [task async for task in self.astream_plan(objective)]
+
+    async def run(self, objective: str, *, deadline: float | None = None) -> List[Task]:
+        """Plan ``objective``, ask the supervisor, then execute every task.
+
+        The plan is sent to the supervisor channel as a ``"plan"`` message
+        and the first reply from ``"supervisor"`` decides whether to go
+        ahead; one of :data:`ABORT_COMMANDS` stops the run.  A
+        ``"progress"`` message follows every status change and the state is
+        persisted to :attr:`storage` when configured.
+
+        Unlike :meth:`act`, no task starts while the model is still
+        planning: the supervisor approves the plan as a whole, so it must
+        be complete before anything runs.  Once approved, every task is
+        known, and the scheduler can order them by priority and deadline.
+
+        Tasks get the UNIX timestamp ``deadline``, tightened by
+        :attr:`task_timeout`, and are executed by :meth:`schedule`.
+        """
+        descriptions = await self.aplan(objective)
+        tasks = [Task(id=i, description=d) for i, d in enumerate(descriptions, 1)]
+        self._notify("plan", tasks)
+        decision = await self.bus.recv_command()
+        self.messages.append(decision)
+        self.decisions.append(intern(decision.content))
+        await self._save(tasks)
+        if decision.content.strip().lower() in ABORT_COMMANDS or not self.agents:
+            return tasks
+        if self.task_timeout is not None:
+            timeout = time.time() + self.task_timeout
+            deadline = timeout if deadline is None else min(deadline, timeout)
+        for task in tasks:
+            task.deadline = deadline
+        return await self.schedule(tasks)
+
+    async def schedule(self, tasks: List[Task]) -> List[Task]:
+        """Execute ``tasks`` by priority until all of them are finished.
+
+        Each task runs on an idle replica of the agent at its plan
+        position, a replica handles one task at a time and up to
+        :attr:`parallelism` tasks (default: one per replica) run at once.
+        While tasks run, supervisor messages are applied: one of
+        :data:`ABORT_COMMANDS` cancels the task given as
+        ``metadata["task"]`` or every task, and ``"priority"`` with
+        ``metadata={"task": id, "priority": n}`` reorders pending tasks.
+        Cancelled tasks record the agent's partial output, if any.
+        """
+        agent_names = list(self.agents.keys())
+        if not agent_names:
+            return tasks
+        if self.context is not None:
+            self.context.clear()
+        # Agents replaced by a configuration reload are picked up by tasks
+        # starting later; agents removed meanwhile finish the plan.
+        pools = self.pools
+
+        def pool_of(name: str) -> AgentPool:
+            return self.pools.get(name) or pools[name]
+
+        position = {task.id: idx for idx, task in enumerate(tasks)}
+        order = list(range(len(tasks)))
+        if self.group_by_model:
+            planned = list(enumerate(t.description for t in tasks))
+            order = [idx for idx, _ in self._group_by_model(planned, agent_names)]
+
+        def agent_name(task: Task) -> str:
+            return agent_names[position[task.id] % len(agent_names)]
+
+        saves: List[asyncio.Future[None]] = []
+        save_lock = asyncio.Lock()
+
+        async def save() -> None:
+            async with save_lock:
+                await self._save(tasks)
+
+        def changed(task: Task) -> None:
+            self._notify("progress", tasks)
+            if task.status is not TaskStatus.IN_PROGRESS:
+                saves.append(asyncio.ensure_future(save()))
+
+        leased: Dict[int, Agent] = {}
+
+        def partial(task: Task) -> str | None:
+            output = getattr(leased.get(task.id), "partial_output", None)
+            return output() if callable(output) else None
+
+        async def execute(task: Task) -> Any:
+            name = agent_name(task)
+            with task_scope(name, task.id):
+                prompt = task.description
+                if self.context is not None:
+                    # Digests may be summarized by a model; keep that off the loop.
+                    prompt = await asyncio.to_thread(
+                        self._prompt, name, pool_of(name).primary, task.description
+                    )
+                async with pool_of(name).alease() as agent:
+                    leased[task.id] = agent
+                    response = await self._arun_agent(name, prompt, agent)
+            if self.context is not None:
+                self.context.add(task.description, response)
+            return response
+
+        scheduler = TaskScheduler(
+            execute,
+            parallelism=self.parallelism or sum(len(p) for p in pools.values()),
+            resource=agent_name,
+            capacity=lambda name: len(pool_of(name)),
+            on_change=changed,
+            partial=partial,
+        )
+        # Plan (or model-grouped) order breaks ties between equal priorities.
+        for idx in order:
+            if tasks[idx].status is TaskStatus.PENDING:
+                scheduler.add(tasks[idx])
+        listener = asyncio.ensure_future(self._supervise(scheduler))
+        try:
+            await scheduler.run()
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, *saves, return_exceptions=True)
+        self.results = [(t.description, t.result or "") for t in tasks]
+        return tasks
+
+    async def _supervise(self, scheduler: TaskScheduler) -> None:
+        """Apply supervisor commands received while tasks are running."""
+        while True:
+            message = await self.bus.recv_command()
+            self.messages.append(message)
+            self.decisions.append(intern(message.content))
+            command = message.content.strip().lower()
+            meta = message.metadata or {}
+            if command in ABORT_COMMANDS:
+                scheduler.cancel(meta.get("task"), "cancelled by supervisor")
+            elif command == "priority" and "task" in meta:
+                scheduler.reprioritize(meta["task"], int(meta.get("priority", 0)))
+
+    async def _arun_agent(self, name: str, prompt: str, agent: Agent | None = None) -> Any:
+        """Run agent ``name`` (or its replica ``agent``) on ``prompt``.
+
+        Synchronous agents run on the thread pool so the event loop never
+        blocks.
+        """
+        if agent is None:
+            async with self.pools[name].alease() as replica:
+                return await self._arun_agent(name, prompt, replica)
+        if self.residency is not None:
+            self.residency.note(agent.llm)
+        loop = asyncio.get_running_loop()
+        aact = _async_act(agent)
+        try:
+            async with AsyncExitStack() as stack:
+                host = self._limited_host(agent)
+                if host is not None:
+                    await stack.enter_async_context(self.limiter.aslot(host))
+                stack.enter_context(TASK_SECONDS.labels(agent=name).time())
+                if aact is not None:
+                    response = await aact(prompt)
+                else:
+                    response = await loop.run_in_executor(self._pool(), bind(agent.act), prompt)
+        except Exception:
+            TASKS.labels(agent=name, status="failed").inc()
+            raise
+        TASKS.labels(agent=name, status="completed").inc()
+        await loop.run_in_executor(self._pool(), bind(agent.observe), response)
+        self._share_changes(agent)
+        return response
+
+    def _prompt(self, name: str, agent: Agent, task: str) -> str:
+        """Return the prompt for ``task`` on ``agent`` registered as ``name``.
+
+        With a :attr:`context` window, model-backed agents receive their
+        role and a budgeted digest of earlier results along with the task.
+        """
+        if self.context is None or not getattr(agent, "calls_llm", True):
+            return task
+        return self.context.build(agent, task, name=name)
+
+    def _limited_host(self, agent: Any) -> str | None:
+        """Return the model host whose limit applies to ``agent``, if any."""
+        if self.limiter is None or not getattr(agent, "calls_llm", True):
+            return None
+        from core.residency import model_key
+
+        return model_key(agent.llm)[0]
+
+    def _notify(self, content: str, tasks: List[Task]) -> None:
+        message = Message(sender="manager", content=content, metadata={"tasks": tasks})
+        self.messages.append(message)
+        self.bus.send_to_supervisor(message)
+
+    async def _save(self, tasks: List[Task]) -> None:
+        if self.storage is None:
+            return
+        await asyncio.to_thread(
+            self.storage.save, tasks, decisions=self.decisions, messages=self.messages
+        )
+
+    def _share_changes(self, agent: Agent) -> None:
+        """Forward the files written by ``agent``'s last act to change trackers."""
+        paths = list(getattr(agent, "changed_paths", None) or ())
+        if not paths:
+            return
+        for pool in self.pools.values():
+            for other in pool:
+                note = getattr(other, "note_changes", None)
+                if note is not None:
+                    note(paths)
 
     def observe(self, results: List[Tuple[str, str]]) -> None:
         self.results = results
+
+
+def _act(agent: Any, prompt: str) -> Any:
+    """Run ``agent`` on ``prompt`` from synchronous code.
+
+    Agents whose ``act`` is a coroutine run to completion on an event loop
+    of their own; if the calling thread is already running a loop, that
+    happens on a helper thread.
+    """
+    if not inspect.iscoroutinefunction(agent.act):
+        return agent.act(prompt)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(agent.act(prompt))
+    with ThreadPoolExecutor(max_workers=1) as helper:
+        return helper.submit(bind(asyncio.run), agent.act(prompt)).result()
+
+
+def _async_act(agent: Any) -> Any:
+    """Return the coroutine function implementing ``agent``'s act, if any.
+
+    ``aact`` is only used when it is defined at least as deep in the class
+    hierarchy as ``act``, so a subclass overriding ``act`` alone is not
+    bypassed by an inherited ``aact``.
+    """
+    mro = type(agent).__mro__
+    act_owner = next((c for c in mro if "act" in vars(c)), object)
+    aact_owner = next((c for c in mro if "aact" in vars(c)), None)
+    if aact_owner is not None and issubclass(aact_owner, act_owner):
+        return agent.aact
+    if inspect.iscoroutinefunction(agent.act):
+        return agent.act
+    return None
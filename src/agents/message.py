@@ -0,0 +1,25 @@
+"""Message exchanged between the manager, agents and the supervisor."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True)
+class Message:
+    """Unit of communication carried by :class:`~core.bus.MessageBus`.
+
+    Parameters
+    ----------
+    sender:
+        Name of the emitting agent or ``"supervisor"``.
+    content:
+        Command or payload of the message.
+    metadata:
+        Optional structured data such as the current task list.
+    """
+
+    sender: str
+    content: str
+    metadata: Optional[Dict[str, Any]] = None
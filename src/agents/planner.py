@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import AsyncIterator, Iterator, List
 
 from langchain_ollama import OllamaLLM
 
+from core.tracing import traced
+
 from .base import Agent
+from .planning import aiter_tasks, astream_text, iter_tasks, stream_text
 
 
 class PlannerAgent(Agent):
@@ -36,12 +39,30 @@ class PlannerAgent(Agent):
         self.tasks = []
 
     def plan(self, objective: str) -> List[str]:
-        plan_text = self.llm.invoke(objective)
-        self.tasks = [t.strip().lstrip("-0123456789. ") for t in plan_text.splitlines() if t.strip()]
-        return self.tasks
+        return list(self.stream_plan(objective))
+
+    def stream_plan(self, objective: str) -> Iterator[str]:
+        """Yield tasks for ``objective`` as soon as each plan line is generated."""
+        self.tasks = []
+        for task in iter_tasks(stream_text(self.llm, objective)):
+            self.tasks.append(task)
+            yield task
 
+    async def astream_plan(self, objective: str) -> AsyncIterator[str]:
+        """Asynchronous counterpart of :meth:`stream_plan`."""
+        self.tasks = []
+        async for task in aiter_tasks(astream_text(self.llm, objective)):
+            self.tasks.append(task)
+            yield task
+
+    @traced()
     def act(self, objective: str) -> List[str]:
         return self.plan(objective)
 
+    @traced()
+    async def aact(self, objective: str) -> List[str]:
+        """Plan ``objective`` through the model's async streaming API."""
+        return [task async for task in self.astream_plan(objective)]
+
     def observe(self, tasks: List[str]) -> None:
         self.tasks = tasks
@@ -0,0 +1,77 @@
+"""Incremental parsing of plans streamed by an LLM.
+
+Plans are line oriented: one task per line, optionally prefixed by a
+bullet or a number.  The helpers below turn a stream of text chunks into
+tasks as soon as each line is complete, so callers can start executing
+the first task while the model is still generating the rest of the plan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+
+def clean_task(line: str) -> str:
+    """Strip whitespace and leading bullets or numbering from ``line``."""
+    return line.strip().lstrip("-0123456789. ")
+
+
+def iter_tasks(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield tasks from ``chunks`` as soon as each line is complete."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield clean_task(line)
+    if pending.strip():
+        yield clean_task(pending)
+
+
+async def aiter_tasks(chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Asynchronous counterpart of :func:`iter_tasks`."""
+    pending = ""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield clean_task(line)
+    if pending.strip():
+        yield clean_task(pending)
+
+
+def stream_text(llm: Any, prompt: str) -> Iterable[str]:
+    """Return the chunks of ``llm``'s answer, streaming when supported."""
+    stream = getattr(llm, "stream", None)
+    if stream is not None:
+        return stream(prompt)  # type: ignore[no-any-return]
+    return [llm.invoke(prompt)]
+
+
+async def ainvoke_text(llm: Any, prompt: str) -> str:
+    """Return ``llm``'s answer using its async API when available.
+
+    Models without ``ainvoke`` are called on a worker thread so the event
+    loop never blocks on model I/O.
+    """
+    ainvoke = getattr(llm, "ainvoke", None)
+    if ainvoke is not None:
+        return await ainvoke(prompt)  # type: ignore[no-any-return]
+    return await asyncio.to_thread(llm.invoke, prompt)
+
+
+async def astream_text(llm: Any, prompt: str) -> AsyncIterator[str]:
+    """Yield the chunks of ``llm``'s answer without blocking the loop."""
+    astream = getattr(llm, "astream", None)
+    if astream is not None:
+        async for chunk in astream(prompt):
+            yield chunk
+        return
+    ainvoke = getattr(llm, "ainvoke", None)
+    if ainvoke is not None:
+        yield await ainvoke(prompt)
+        return
+    yield await asyncio.to_thread(llm.invoke, prompt)
@@ -0,0 +1,131 @@
+"""Replicas of one agent type sharing the work of a plan."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Iterator, List, Optional, Sequence, Union
+
+from core.metrics import REGISTRY
+
+BUSY = REGISTRY.gauge("agents_replicas_busy", "Agent replicas currently working", ("agent",))
+
+_Waiter = Union["Future[int]", "tuple[asyncio.AbstractEventLoop, asyncio.Future[int]]"]
+
+
+class AgentPool:
+    """Independent instances of an agent handed out one task at a time.
+
+    Every replica keeps its own state (``last_written``, change hints,
+    results), so tasks spread over the pool do not interfere with each
+    other.  An idle replica is handed out least used first; while all of
+    them are busy, :meth:`lease` (threads) and :meth:`alease` (coroutines)
+    wait for one to be released, in arrival order.  This bounds the
+    objectives of batch runs and daemon jobs sharing a pool as well as the
+    tasks of a single plan.
+
+    Parameters
+    ----------
+    replicas:
+        Agent instances, typically built from the same configuration.
+    name:
+        Label of the pool in metrics.
+    """
+
+    def __init__(self, replicas: Sequence[Any], *, name: str = "") -> None:
+        if not replicas:
+            raise ValueError("AgentPool needs at least one replica")
+        self.replicas: List[Any] = list(replicas)
+        self.busy = [0] * len(self.replicas)
+        self.used = [0] * len(self.replicas)
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        if name:
+            BUSY.labels(agent=name).set_function(lambda: sum(self.busy))
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.replicas)
+
+    @property
+    def primary(self) -> Any:
+        """The first replica, representative of the pool's configuration."""
+        return self.replicas[0]
+
+    def _take(self) -> Optional[int]:
+        """Reserve the least used idle replica; called with the lock held."""
+        idle = [i for i, busy in enumerate(self.busy) if not busy]
+        if not idle:
+            return None
+        idx = min(idle, key=self.used.__getitem__)
+        self.busy[idx] = 1
+        self.used[idx] += 1
+        return idx
+
+    def acquire(self) -> int:
+        """Reserve an idle replica, waiting for one; return its index."""
+        with self._lock:
+            idx = self._take()
+            if idx is not None:
+                return idx
+            waiter: "Future[int]" = Future()
+            self._waiters.append(waiter)
+        return waiter.result()
+
+    async def aacquire(self) -> int:
+        """Asynchronous counterpart of :meth:`acquire`."""
+        with self._lock:
+            idx = self._take()
+            if idx is not None:
+                return idx
+            loop = asyncio.get_running_loop()
+            fut: "asyncio.Future[int]" = loop.create_future()
+            self._waiters.append((loop, fut))
+        return await fut
+
+    def release(self, idx: int) -> None:
+        """Hand replica ``idx`` to the next waiter or mark it idle."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, Future):
+                    self.used[idx] += 1
+                    waiter.set_result(idx)
+                    return
+                loop, fut = waiter
+                if fut.cancelled():
+                    continue
+                self.used[idx] += 1
+                loop.call_soon_threadsafe(self._resolve, fut, idx)
+                return
+            self.busy[idx] = 0
+
+    def _resolve(self, fut: "asyncio.Future[int]", idx: int) -> None:
+        if fut.cancelled():
+            # The waiter went away after being handed the replica; pass it on.
+            self.release(idx)
+        else:
+            fut.set_result(idx)
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """Hold an idle replica for the ``with`` block (threads)."""
+        idx = self.acquire()
+        try:
+            yield self.replicas[idx]
+        finally:
+            self.release(idx)
+
+    @asynccontextmanager
+    async def alease(self) -> AsyncIterator[Any]:
+        """Hold an idle replica for the ``async with`` block."""
+        idx = await self.aacquire()
+        try:
+            yield self.replicas[idx]
+        finally:
+            self.release(idx)
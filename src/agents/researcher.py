@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import ClassVar, Optional
 import aiohttp
 from langchain_ollama import OllamaLLM
 
+from core.cassette import aintercept
+from core.tracing import span, traced
+
 from .base import Agent
 
 
 class ResearcherAgent(Agent):
     """Agent that performs simple HTTP GET requests."""
 
+    # Fetches web pages rather than calling the model.
+    calls_llm: ClassVar[bool] = False
+
     last_response: Optional[str] = None
 
     def __init__(
@@ -38,20 +44,24 @@ class ResearcherAgent(Agent):
     def plan(self) -> str:
         return "ready"
 
+    @traced()
     async def act(self, url: str) -> str:
+        # Recorded or replayed when a cassette is installed.
+        text = await aintercept("http", url, lambda: self._fetch(url))
+        self.last_response = text
+        return text
+
+    async def _fetch(self, url: str) -> str:
         try:
             timeout = aiohttp.ClientTimeout(total=5)
             async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    text = await response.text()
-            text = text[:200]
-            self.last_response = text
-            return text
+                with span("http.get", "io", url=url):
+                    async with session.get(url) as response:
+                        response.raise_for_status()
+                        text = await response.text()
+            return text[:200]
         except Exception as exc:  # pragma: no cover - network errors
-            error = f"error: {exc}"
-            self.last_response = error
-            return error
+            return f"error: {exc}"
 
     def observe(self, result: str) -> None:
         self.last_response = result
@@ -2,20 +2,76 @@
 
 from __future__ import annotations
 
-import subprocess
 import asyncio
-from typing import Optional
+import dataclasses
+from pathlib import Path
+from typing import Any, ClassVar, Iterable, List, Optional, Set, Union
 
 from langchain_ollama import OllamaLLM
 
+from core.cassette import aintercept
+from core.depmap import DependencyMap, merkle_root
+from core.process import CommandResult, OutputBuffer, run_command
+from core.results import ResultCache, result_key
+from core.tracing import traced
+
 from .base import Agent
+from .message import Message
+
+
+def _is_pytest(argv: List[str]) -> bool:
+    """Return ``True`` if ``argv`` invokes pytest without explicit targets."""
+    if not argv:
+        return False
+    if Path(argv[0]).name in {"pytest", "py.test"}:
+        args = argv[1:]
+    elif argv[1:3] == ["-m", "pytest"]:
+        args = argv[3:]
+    else:
+        return False
+    return all(a.startswith("-") for a in args)
 
 
 class TesterAgent(Agent):
-    """Agent that runs shell commands such as pytest."""
+    """Agent that runs shell commands such as pytest.
+
+    When the command is a bare ``pytest`` invocation and ``incremental`` is
+    enabled, only the test modules affected by files changed since the last
+    green run are executed.  Changes are detected from file stats and
+    content hashes; paths reported through :meth:`note_changes` (the files
+    written by :class:`DeveloperAgent` or :class:`WriterAgent`) are always
+    re-hashed.
+
+    Commands run through :func:`core.process.run_command`: output lines are
+    forwarded to :attr:`bus` as ``"output"`` messages while the process
+    runs, only the last ``max_output`` bytes are retained, and the process
+    group is killed once ``timeout`` or ``idle_timeout`` seconds elapse.
+
+    With ``cache_results`` enabled, pytest outcomes are cached under a key
+    made of the command and a Merkle hash of the tracked files, so running
+    the same suite against an unchanged tree returns the previous verdict
+    and :attr:`last_result` without starting a process.
+    """
+
+    # Runs commands rather than model calls; not subject to LLM limits.
+    calls_llm: ClassVar[bool] = False
 
     __test__ = False  # prevent pytest from collecting as a test class
     last_result: Optional[str] = None
+    incremental: bool = True
+    root: Path = Path(".")
+    cache_path: Path = Path(".agents_cache/testmap.json")
+    results_path: Path = Path(".agents_cache/results.json")
+    cache_results: bool = True
+    result_cache: Any = None
+    changed_hints: Set[Path] = set()
+    dependency_map: Any = None
+    bus: Any = None
+    progress_channel: str = "supervisor"
+    timeout: Optional[float] = 900.0
+    idle_timeout: Optional[float] = 300.0
+    max_output: int = 64 * 1024
+    output_tail: Any = None
 
     def __init__(
         self,
@@ -37,24 +93,129 @@ class TesterAgent(Agent):
             allow_delegation=allow_delegation,
         )
         self.last_result = None
+        self.changed_hints = set()
+        self.dependency_map = None
+        self.result_cache = None
 
     def plan(self) -> str:
         return "ready"
 
+    def note_changes(self, paths: Iterable[Union[str, Path]]) -> None:
+        """Record ``paths`` as possibly modified since the last run."""
+        self.changed_hints.update(Path(p) for p in paths)
+
+    def _cache_file(self, path: Path) -> Path:
+        return path if path.is_absolute() else self.root / path
+
+    def _snapshot(self) -> dict[str, str]:
+        """Return the hashes of all tracked files, consuming change hints."""
+        if self.dependency_map is None:
+            self.dependency_map = DependencyMap(
+                self.root, cache_path=self._cache_file(self.cache_path)
+            )
+        snapshot = self.dependency_map.snapshot(self.changed_hints)
+        self.dependency_map.save()
+        self.changed_hints = set()
+        return snapshot
+
+    def _select(self, snapshot: dict[str, str]) -> Optional[List[str]]:
+        """Return the test files affected by changes since the last green run.
+
+        ``None`` means the whole suite must run.
+        """
+        depmap = self.dependency_map
+        graph = depmap.build(snapshot)
+        if not depmap.green:
+            return None
+        return depmap.affected(depmap.changed(snapshot), graph)
+
+    def partial_output(self) -> str | None:
+        """Return the tail of the output of the command currently running."""
+        if self.output_tail is None:
+            return None
+        return self.output_tail.text() or None
+
+    def _forward(self, stream: str, line: str) -> None:
+        """Publish one line of command output on :attr:`bus`."""
+        if self.output_tail is not None:
+            self.output_tail.append(line)
+        if self.bus is None:
+            return
+        self.bus.dispatch(
+            self.progress_channel,
+            Message(
+                sender="tester",
+                content="output",
+                metadata={"stream": stream, "line": line},
+            ),
+        )
+
+    def _replayed(self, data: dict) -> CommandResult:
+        """Rebuild a recorded command result and forward its output."""
+        result = CommandResult(**data)
+        for stream in ("stdout", "stderr"):
+            for line in getattr(result, stream).splitlines():
+                self._forward(stream, line)
+        return result
+
+    @traced()
     async def act(self, command: str = "pytest") -> str:
+        argv = command.split()
+        self.output_tail = None
+        snapshot: Optional[dict[str, str]] = None
+        key: Optional[str] = None
+        if _is_pytest(argv) and (self.incremental or self.cache_results):
+            snapshot = await asyncio.to_thread(self._snapshot)
+        if snapshot is not None and self.cache_results:
+            if self.result_cache is None:
+                self.result_cache = ResultCache(self._cache_file(self.results_path))
+            key = result_key(command, merkle_root(snapshot))
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                status, self.last_result = cached
+                return status
+        if snapshot is not None and self.incremental:
+            tests = await asyncio.to_thread(self._select, snapshot)
+            if tests == []:
+                self.last_result = "no affected tests"
+                return "success"
+            if tests is not None:
+                argv = argv + [str(self.dependency_map.root / t) for t in tests]  # type: ignore[union-attr]
+        self.output_tail = OutputBuffer(self.max_output)
         try:
-            result = await asyncio.to_thread(
-                subprocess.run,
-                command.split(),
-                capture_output=True,
-                text=True,
-                check=True,
+            # Recorded or replayed when a cassette is installed.
+            result = await aintercept(
+                "subprocess",
+                argv,
+                lambda: run_command(
+                    argv,
+                    on_line=self._forward,
+                    timeout=self.timeout,
+                    idle_timeout=self.idle_timeout,
+                    max_output=self.max_output,
+                ),
+                encode=dataclasses.asdict,
+                decode=self._replayed,
             )
-            self.last_result = result.stdout
-            return "success"
-        except subprocess.CalledProcessError as exc:  # pragma: no cover - failure path
-            self.last_result = exc.stderr
+        except OSError as exc:
+            self.last_result = f"error: {exc}"
             return "failure"
+        if result.ok:
+            status = "success"
+            self.last_result = result.stdout
+            if snapshot is not None and self.incremental:
+                self.dependency_map.mark_green(snapshot)  # type: ignore[union-attr]
+        else:
+            status = "failure"
+            self.last_result = result.stderr or result.stdout
+            if result.timed_out is not None:
+                limit = self.timeout if result.timed_out == "timeout" else self.idle_timeout
+                self.last_result += f"{result.timed_out}: killed after {limit}s\n"
+            if self.dependency_map is not None:
+                self.dependency_map.save()
+        if key is not None and result.timed_out is None:
+            self.result_cache.put(key, status, self.last_result)
+        return status
 
     def observe(self, result: str) -> None:
         self.last_result = result
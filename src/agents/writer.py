@@ -3,17 +3,30 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Union
+from typing import Any, List, Union
 
 from langchain_ollama import OllamaLLM
 
+from core.documents import DocumentIndex
+from core.files import default_output
+from core.metrics import LLM_SECONDS
+from core.tracing import span, traced
+
 from .base import Agent
+from .planning import ainvoke_text
 
 
 class WriterAgent(Agent):
-    """Agent that uses an LLM to generate documentation and save it."""
+    """Agent that uses an LLM to generate documentation and save it.
+
+    :attr:`documents` is a :class:`~core.documents.DocumentIndex`: it maps
+    each path to its content but only keeps size, mtime and hash resident,
+    loading content lazily from disk.
+    """
 
-    documents: Dict[Path, str] = {}
+    documents: Any = None
+    changed_paths: List[Path] = []
+    output: Any = None
 
     def __init__(
         self,
@@ -34,28 +47,49 @@ class WriterAgent(Agent):
             verbose=verbose,
             allow_delegation=allow_delegation,
         )
-        self.documents = {}
+        self.changed_paths = []
+        self.output = default_output()
+        self.documents = DocumentIndex(before_read=self.output.flush)
 
     def plan(self) -> str:
         return "ready"
 
+    @traced()
     def act(
         self,
         prompt: str,
         *,
         path: Union[str, Path] | None = None,
     ) -> str:
-        text = self.llm.invoke(prompt)
+        llm_seconds = LLM_SECONDS.labels(agent="writer")
+        with span("llm.invoke", "llm", agent="writer"), llm_seconds.time():
+            text = self.llm.invoke(prompt)
+        self.changed_paths = []
+        if path is not None:
+            p = Path(path)
+            self.output.put(p, text)
+            self.documents.add(p, text)
+            self.changed_paths = [p]
+        return text
+
+    @traced()
+    async def aact(
+        self,
+        prompt: str,
+        *,
+        path: Union[str, Path] | None = None,
+    ) -> str:
+        """Asynchronous counterpart of :meth:`act` using ``llm.ainvoke``."""
+        llm_seconds = LLM_SECONDS.labels(agent="writer")
+        with span("llm.invoke", "llm", agent="writer"), llm_seconds.time():
+            text = await ainvoke_text(self.llm, prompt)
+        self.changed_paths = []
         if path is not None:
             p = Path(path)
-            p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(text)
-            self.documents[p] = text
+            await self.output.awrite(p, text)
+            self.documents.add(p, text)
+            self.changed_paths = [p]
         return text
 
     def observe(self, path: Union[str, Path]) -> None:
-        p = Path(path)
-        try:
-            self.documents[p] = p.read_text()
-        except FileNotFoundError:  # pragma: no cover - file missing
-            self.documents[p] = ""
+        self.documents.track(path)
@@ -10,38 +10,63 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
+import importlib
 import logging
 import os
 import sys
+import time
+from collections.abc import MutableMapping
 from contextlib import suppress
 from pathlib import Path
-from typing import Any, Dict
-
-import yaml
-from pydantic import ValidationError
-from langchain_ollama import OllamaLLM
-
-from agents.developer import DeveloperAgent
-from agents.manager import Manager
-from agents.message import Message
-from agents.planner import PlannerAgent
-from agents.researcher import ResearcherAgent
-from agents.tester import TesterAgent
-from agents.writer import WriterAgent
-from config.schema import ConfigModel
-from core import policies
-from core.storage import Storage
-from supervisor import interface
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    from agents.manager import Manager
+    from config.schema import AgentConfig, ConfigModel, LLMConfig
+
+
+class _AgentTypes(MutableMapping):
+    """Mapping of config keys to agent classes imported on first lookup.
+
+    Values are either classes or ``"module:attribute"`` strings; strings
+    are resolved and replaced by the class when first accessed so that
+    only the agents named in a configuration are imported.
+    """
+
+    def __init__(self, specs: Dict[str, Any]) -> None:
+        self._specs = dict(specs)
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._specs[name]
+        if isinstance(value, str):
+            module, _, attr = value.partition(":")
+            value = getattr(importlib.import_module(module), attr)
+            self._specs[name] = value
+        return value
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._specs[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self._specs[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
 
 # Mapping from config keys to concrete agent classes
-AGENT_TYPES = {
-    "planner": PlannerAgent,
-    "developer": DeveloperAgent,
-    "writer": WriterAgent,
-    "tester": TesterAgent,
-    "researcher": ResearcherAgent,
-}
+AGENT_TYPES = _AgentTypes(
+    {
+        "planner": "agents.planner:PlannerAgent",
+        "developer": "agents.developer:DeveloperAgent",
+        "writer": "agents.writer:WriterAgent",
+        "tester": "agents.tester:TesterAgent",
+        "researcher": "agents.researcher:ResearcherAgent",
+    }
+)
 
 
 def build_manager(config: ConfigModel | Dict[str, Any]) -> Manager:
@@ -50,34 +75,153 @@ def build_manager(config: ConfigModel | Dict[str, Any]) -> Manager:
     The configuration should contain an ``agents`` mapping where each key
     corresponds to an agent type listed in :data:`AGENT_TYPES`.
     """
+    from agents.manager import Manager
+    from config.schema import ConfigModel
+    from core import cassette, policies
+    from core.limiter import AdaptiveLimiter
+    from core.residency import ModelResidency
+    from core.storage import Storage
 
     if not isinstance(config, ConfigModel):
         config = ConfigModel.model_validate(config)
 
-    agents_cfg = config.agents
-    instances: Dict[str, Any] = {}
-    for name, params in agents_cfg.items():
-        cls = AGENT_TYPES.get(name)
-        if cls is None:
-            raise ValueError(f"Unknown agent type: {name}")
-        llm_cfg = params.llm
-        llm = OllamaLLM(
-            model=llm_cfg.model,
-            base_url=llm_cfg.base_url,
-            temperature=llm_cfg.temperature,
+    instances = {name: _build_agent(name, params, config) for name, params in config.agents.items()}
+    policies.install(policies.PolicyEngine.from_config(config.policies))
+    storage = Storage(config.storage.path) if config.storage else None
+    residency = ModelResidency(
+        keep_alive=config.models.keep_alive, max_loaded=config.models.max_loaded
+    )
+    residency.register(getattr(agent, "primary", agent).llm for agent in instances.values())
+    limits = config.concurrency
+    limiter = None
+    if limits.adaptive:
+        limiter = AdaptiveLimiter(
+            initial=limits.initial,
+            min_limit=limits.min,
+            max_limit=limits.max,
+            latency_tolerance=limits.latency_tolerance,
+            max_error_rate=limits.max_error_rate,
+        )
+    manager = Manager(
+        instances,
+        storage=storage,
+        residency=residency,
+        group_by_model=config.models.group_tasks,
+        limiter=limiter,
+        parallelism=config.scheduling.parallelism,
+        task_timeout=config.scheduling.task_timeout,
+        history_window=config.supervision.history_window,
+    )
+    manager.llm = cassette.wrap(manager.llm)
+    if config.context.enabled:
+        from core.context import ContextWindow, llm_summarizer
+
+        ctx = config.context
+        manager.context = ContextWindow(
+            budgets=ctx.budgets,
+            prompt_share=ctx.prompt_share,
+            recent=ctx.recent,
+            digest_tokens=ctx.digest_tokens,
+            summarizer=llm_summarizer(manager.llm) if ctx.summarize else None,
         )
-        instances[name] = cls(
+    return manager
+
+
+def _build_agent(name: str, params: AgentConfig, config: ConfigModel) -> Any:
+    """Return the agent, or pool of replicas, configured by ``params``."""
+    from agents.pool import AgentPool
+
+    cls = AGENT_TYPES.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown agent type: {name}")
+    llm = _build_llm(params.llm, config)
+    # Replicas share the model client but nothing else.
+    replicas = [
+        cls(
             role=params.role,
             goal=params.goal,
             backstory=params.backstory,
             llm=llm,
         )
-    if config.policies.allowed_commands is not None:
-        policies.ALLOWED_COMMANDS = set(config.policies.allowed_commands)
-    if config.policies.network_access is not None:
-        policies.NETWORK_ACCESS = config.policies.network_access
-    storage = Storage(config.storage.path) if config.storage else None
-    return Manager(instances, storage=storage)
+        for _ in range(params.replicas)
+    ]
+    return AgentPool(replicas, name=name) if len(replicas) > 1 else replicas[0]
+
+
+def apply_config(manager: Manager, old: ConfigModel, new: ConfigModel) -> List[str]:
+    """Apply the differences between ``old`` and ``new`` to ``manager`` in place.
+
+    Only agents whose configuration (or shared model options) changed are
+    rebuilt, and policies are swapped atomically.  Tasks already running
+    keep the agent instance they started on.  Returns a description of
+    each change; sections that need a restart are logged and skipped.
+    """
+    from core import policies
+
+    changes: List[str] = []
+    llm_options = ("models", "routing")
+    rebuild_all = any(getattr(old, s) != getattr(new, s) for s in llm_options)
+    pools = {}
+    for name, params in new.agents.items():
+        if not rebuild_all and old.agents.get(name) == params:
+            pools[name] = manager.pools[name]
+            continue
+        pools[name] = _build_agent(name, params, new)
+        changes.append(f"{'rebuilt' if name in old.agents else 'added'} agent {name}")
+    changes += [f"removed agent {name}" for name in old.agents if name not in new.agents]
+    if changes:
+        manager.replace_agents(pools)
+        if manager.residency is not None:
+            manager.residency.register(manager.agents[n].llm for n in manager.agents)
+    if old.policies != new.policies:
+        policies.install(policies.PolicyEngine.from_config(new.policies))
+        changes.append("policies")
+    if old.scheduling != new.scheduling:
+        manager.parallelism = new.scheduling.parallelism
+        manager.task_timeout = new.scheduling.task_timeout
+        changes.append("scheduling")
+    if old.models.group_tasks != new.models.group_tasks:
+        manager.group_by_model = new.models.group_tasks
+    for section in ("storage", "metrics", "concurrency", "context"):
+        if getattr(old, section) != getattr(new, section):
+            logging.warning("configuration section %r changed; restart to apply", section)
+    if changes:
+        logging.info("configuration changes applied: %s", ", ".join(changes))
+    return changes
+
+
+def _build_llm(llm_cfg: LLMConfig, config: ConfigModel) -> Any:
+    """Return the model client for ``llm_cfg``.
+
+    Models with several ``endpoints`` get a :class:`core.routing.RoutedLLM`
+    balancing, hedging and failing over between them.  While a cassette is
+    installed, the client is wrapped by :func:`core.cassette.wrap`.
+    """
+    from langchain_ollama import OllamaLLM
+
+    options = {
+        "model": llm_cfg.model,
+        "temperature": llm_cfg.temperature,
+        "keep_alive": (
+            llm_cfg.keep_alive if llm_cfg.keep_alive is not None else config.models.keep_alive
+        ),
+    }
+    from core import cassette
+
+    if not llm_cfg.endpoints:
+        return cassette.wrap(OllamaLLM(base_url=llm_cfg.base_url, **options))
+    from core.routing import RoutedLLM
+
+    routing = config.routing
+    return cassette.wrap(
+        RoutedLLM.from_clients(
+            [(OllamaLLM(base_url=e.url, **options), e.weight) for e in llm_cfg.endpoints],
+            hedge_percentile=routing.hedge_percentile,
+            min_samples=routing.min_samples,
+            failure_threshold=routing.failure_threshold,
+            cooldown=routing.cooldown,
+        )
+    )
 
 
 def load_config(path: Path) -> ConfigModel:
@@ -86,28 +230,20 @@ def load_config(path: Path) -> ConfigModel:
     Parameters
     ----------
     path:
-        Path to the configuration file.
+        Path to the configuration file.  Results are cached by content,
+        see :func:`config.service.load_config`.
     """
+    from config.service import load_config as load_cached
 
-    text = path.read_text(encoding="utf-8")
-    if path.suffix in {".yaml", ".yml"}:
-        raw = yaml.safe_load(text)  # type: ignore[assignment]
-    elif path.suffix == ".json":
-        raw = json.loads(text)
-    else:
-        raise ValueError(f"Unsupported config format: {path.suffix}")
+    return load_cached(path)
 
-    try:
-        return ConfigModel.model_validate(raw)
-    except ValidationError as exc:
-        errors = "; ".join(
-            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
-        )
-        raise ValueError(f"Invalid configuration at {path}: {errors}") from exc
 
-
-async def run_supervised(manager: Manager, objective: str) -> list:
+async def run_supervised(
+    manager: Manager, objective: str, *, deadline: float | None = None
+) -> list:
     """Run ``manager`` with a simple supervisor interface."""
+    from agents.message import Message
+    from supervisor import interface
 
     async def supervisor_loop() -> None:
         while True:
@@ -123,21 +259,27 @@ async def run_supervised(manager: Manager, objective: str) -> list:
             elif msg.content == "progress":
                 tasks = msg.metadata.get("tasks", []) if msg.metadata else []
                 interface.display_progress(tasks)
+            elif msg.content == "output":
+                meta = msg.metadata or {}
+                interface.display_output(meta.get("stream", ""), meta.get("line", ""))
             else:
                 manager.bus.dispatch("supervisor", msg)
                 await asyncio.sleep(0)
 
     ui_task = asyncio.create_task(supervisor_loop())
     try:
-        return await manager.run(objective)
+        return await manager.run(objective, deadline=deadline)
     finally:
         ui_task.cancel()
         with suppress(asyncio.CancelledError):
             await ui_task
 
 
-async def run_basic(manager: Manager, objective: str) -> list:
+async def run_basic(
+    manager: Manager, objective: str, *, deadline: float | None = None
+) -> list:
     """Run ``manager`` without interactive supervision."""
+    from agents.message import Message
 
     async def auto_approve() -> None:
         await manager.bus.recv_from_supervisor()
@@ -145,14 +287,77 @@ async def run_basic(manager: Manager, objective: str) -> list:
 
     ui_task = asyncio.create_task(auto_approve())
     try:
-        return await manager.run(objective)
+        return await manager.run(objective, deadline=deadline)
     finally:
         ui_task.cancel()
         with suppress(asyncio.CancelledError):
             await ui_task
 
 
-def main() -> None:
+def run_batch_file(
+    manager: Manager,
+    source: str,
+    output: Path,
+    *,
+    parallelism: int = 4,
+    resume: bool = False,
+) -> Dict[str, int]:
+    """Run every objective of the JSON-lines file ``source`` through ``manager``.
+
+    Parameters
+    ----------
+    manager:
+        Manager whose agents and LLM clients are shared by all objectives.
+    source:
+        Input file, or ``"-"`` to read standard input.
+    output:
+        JSON-lines file receiving one result per objective in completion
+        order.
+    parallelism:
+        Number of objectives processed concurrently.
+    resume:
+        Append to ``output`` and skip objectives it records as completed
+        instead of truncating it.
+    """
+    from core.batch import completed_ids, read_items, run_batch
+
+    if source == "-":
+        items = list(read_items(sys.stdin))
+    else:
+        with open(source, encoding="utf-8") as fh:
+            items = list(read_items(fh))
+    skip = completed_ids(output) if resume else set()
+
+    def runner(objective: str) -> Any:
+        return manager.fork().act(objective)
+
+    with output.open("a" if resume else "w", encoding="utf-8") as out:
+        return asyncio.run(
+            run_batch(runner, items, out, parallelism=parallelism, skip=skip)
+        )
+
+
+def job_runner(manager: Manager) -> Any:
+    """Return a :data:`core.daemon.Runner` executing objectives on ``manager``.
+
+    Each job runs on a :meth:`Manager.fork` and emits a ``task`` event per
+    completed step.  Jobs use the synchronous task path rather than
+    :meth:`Manager.run`: forks share the message bus, whose queues cannot
+    serve event loops on several worker threads.  Coroutine agents are
+    awaited on an event loop of the job's own.
+    """
+
+    def run(objective: str, emit: Any) -> list:
+        results = []
+        for task, response in manager.fork().iter_act(objective):
+            results.append((task, response))
+            emit({"event": "task", "task": task, "response": response})
+        return results
+
+    return run
+
+
+def main(argv: list[str] | None = None) -> None:
     """Entry point for the ``ollama-crewai-agents`` script."""
 
     default_config = os.getenv("AGENTS_CONFIG", "config/agents.yaml")
@@ -171,24 +376,191 @@ def main() -> None:
         default=debug_default,
         help="Enable debug logging",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=os.getenv("AGENTS_TRACE"),
+        help="Record spans and write a Chrome/Perfetto trace to PATH",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Cancel tasks still unfinished SECONDS after the run starts",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=("cpu", "memory", "asyncio"),
+        default=[],
+        help="Profile the run (repeatable): cProfile, tracemalloc per task, "
+        "or event loop stalls",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=Path("profiles"),
+        help="Directory receiving the profiling reports",
+    )
+    parser.add_argument(
+        "--slow-callback",
+        type=float,
+        default=0.1,
+        metavar="SECONDS",
+        help="Event loop stalls reported by --profile asyncio",
+    )
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument(
+        "--record",
+        type=Path,
+        metavar="PATH",
+        help="Record model calls, fetches and test runs to a cassette file",
+    )
+    replay.add_argument(
+        "--replay",
+        type=Path,
+        metavar="PATH",
+        help="Serve model calls, fetches and test runs from a recorded cassette",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=0.0,
+        metavar="FACTOR",
+        help="Pace of --replay: 1 waits the recorded durations, 0 (default) none",
+    )
+    commands = parser.add_subparsers(dest="command")
+    batch = commands.add_parser(
+        "batch", help="Run objectives read from a JSON-lines file or stdin"
+    )
+    batch.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="JSON-lines file of objectives, '-' for stdin (default)",
+    )
+    batch.add_argument(
+        "-o", "--output", type=Path, required=True, help="JSON-lines result file"
+    )
+    batch.add_argument(
+        "-j",
+        "--parallelism",
+        type=int,
+        default=4,
+        help="Number of objectives run concurrently",
+    )
+    batch.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip objectives already completed in the output file",
+    )
+    serve = commands.add_parser(
+        "serve", help="Keep agents warm and accept objectives over a local HTTP API"
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    serve.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    serve.add_argument(
+        "--socket", metavar="PATH", help="Listen on a Unix socket instead of TCP"
+    )
+    serve.add_argument(
+        "-j", "--workers", type=int, default=1, help="Number of jobs run concurrently"
+    )
+    args = parser.parse_args(argv)
+
+    from config.service import ConfigService
+    from core.metrics import REGISTRY
+    from core.tracing import TRACER
 
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    service = ConfigService(Path(args.config))
     try:
-        cfg = load_config(Path(args.config))
-    except ValueError as exc:
+        cfg = service.load()
+    except (OSError, ValueError) as exc:
         print(exc, file=sys.stderr)
         raise SystemExit(1) from exc
+    tape = None
+    if args.record or args.replay:
+        from core import cassette
+
+        try:
+            tape = cassette.Cassette(
+                args.replay or args.record, replay=bool(args.replay), speed=args.replay_speed
+            )
+        except (OSError, ValueError) as exc:
+            print(f"Cannot read cassette: {exc}", file=sys.stderr)
+            raise SystemExit(1) from exc
+        cassette.install(tape)
     manager = build_manager(cfg)
-    objective = cfg.objective
-
+    if cfg.metrics.enabled:
+        REGISTRY.serve(cfg.metrics.port, cfg.metrics.host)
+    if cfg.models.warm_up and not args.replay:
+        timings = manager.residency.warm_up()
+        logging.info("warmed up models: %s", timings)
+
+    if args.trace:
+        TRACER.enable()
+    if args.command in {"batch", "serve"}:
+        # Long-running commands pick up configuration edits without restart.
+        service.subscribe(lambda old, new: apply_config(manager, old, new))
+        service.start()
+    if args.profile:
+        from core import profiling
+
+        profiling.start(args.profile, slow_callback=args.slow_callback)
+    try:
+        _run(args, cfg, manager)
+    finally:
+        service.stop()
+        if args.profile:
+            for path in profiling.stop(args.profile_dir):
+                logging.info("profile written to %s", path)
+        if tape is not None:
+            tape.save()
+            if tape.replaying:
+                logging.info("cassette replays: %s", dict(tape.stats))
+            else:
+                logging.info("recorded %d calls to %s", len(tape.entries), tape.path)
+        if args.trace:
+            TRACER.export(args.trace)
+        logging.info("model loads: %s", manager.residency.report())
+
+
+def _run(args: argparse.Namespace, cfg: ConfigModel, manager: Manager) -> None:
+    """Execute the sub-command selected by ``args``."""
+    if args.command == "batch":
+        try:
+            counts = run_batch_file(
+                manager,
+                args.input,
+                args.output,
+                parallelism=args.parallelism,
+                resume=args.resume,
+            )
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            raise SystemExit(1) from exc
+        logging.info("batch finished: %s", counts)
+        if counts["failed"]:
+            raise SystemExit(2)
+        return
+    if args.command == "serve":
+        from core import daemon
+
+        server = daemon.JobServer(job_runner(manager), workers=args.workers)
+        where = args.socket or f"http://{args.host}:{args.port}"
+        logging.info("serving jobs on %s", where)
+        with suppress(KeyboardInterrupt):
+            asyncio.run(
+                daemon.serve(server, host=args.host, port=args.port, socket_path=args.socket)
+            )
+        return
+    deadline = time.time() + args.deadline if args.deadline is not None else None
     if cfg.supervision.enabled:
-        tasks = asyncio.run(run_supervised(manager, objective))
+        tasks = asyncio.run(run_supervised(manager, cfg.objective, deadline=deadline))
     else:
-        tasks = asyncio.run(run_basic(manager, objective))
+        tasks = asyncio.run(run_basic(manager, cfg.objective, deadline=deadline))
     for task in tasks:
         logging.info("%s: %s", task.id, task.result or task.status.name)
 
-
 if __name__ == "__main__":  # pragma: no cover - manual execution only
     main()
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import json
+import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
 
 import yaml
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
 
 
 class PoliciesConfig(BaseModel):
@@ -15,9 +16,19 @@ class PoliciesConfig(BaseModel):
 
     allowed_commands: List[str] | None = None
     network_access: bool | None = None
+    denied_patterns: List[str] | None = None
 
     model_config = ConfigDict(extra="forbid")
 
+    @model_validator(mode="after")
+    def _check_patterns(self) -> "PoliciesConfig":
+        for pattern in self.denied_patterns or ():
+            try:
+                re.compile(pattern, re.IGNORECASE)
+            except re.error as exc:
+                raise ValueError(f"invalid denied pattern {pattern!r}: {exc}") from None
+        return self
+
 
 class StorageConfig(BaseModel):
     """Configuration of persistence storage."""
@@ -31,6 +42,89 @@ class SupervisionConfig(BaseModel):
     """Options for supervisor interaction."""
 
     enabled: bool = True
+    history_window: int = 500
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def _check_window(self) -> "SupervisionConfig":
+        if self.history_window < 1:
+            raise ValueError("history_window must be at least 1")
+        return self
+
+
+class MetricsConfig(BaseModel):
+    """Options for the Prometheus metrics endpoint."""
+
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9464
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ModelsConfig(BaseModel):
+    """Model residency options shared by all agents."""
+
+    warm_up: bool = False
+    keep_alive: int | str | None = None
+    max_loaded: int = 1
+    group_tasks: bool = False
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ConcurrencyConfig(BaseModel):
+    """Adaptive limit of concurrent model calls per host."""
+
+    adaptive: bool = False
+    initial: int = 2
+    min: int = 1
+    max: int = 16
+    latency_tolerance: float = 2.0
+    max_error_rate: float = 0.2
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class RoutingConfig(BaseModel):
+    """Hedging and circuit breaking for models with several endpoints."""
+
+    hedge_percentile: float | None = 95.0
+    min_samples: int = 20
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class EndpointConfig(BaseModel):
+    """An Ollama server and its share of the requests."""
+
+    url: str
+    weight: float = 1.0
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class SchedulingConfig(BaseModel):
+    """Parallelism and time limits of the task scheduler."""
+
+    parallelism: int | None = None
+    task_timeout: float | None = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ContextConfig(BaseModel):
+    """Passing earlier task results to later prompts within a token budget."""
+
+    enabled: bool = False
+    budgets: Dict[str, int] = {}
+    prompt_share: float = 0.5
+    recent: int = 1
+    digest_tokens: int = 64
+    summarize: bool = False
 
     model_config = ConfigDict(extra="forbid")
 
@@ -40,10 +134,23 @@ class LLMConfig(BaseModel):
 
     model: str
     base_url: str | None = None
+    endpoints: List[EndpointConfig] | None = None
     temperature: float | None = None
+    keep_alive: int | str | None = None
 
     model_config = ConfigDict(extra="forbid")
 
+    @model_validator(mode="after")
+    def _check_endpoints(self) -> "LLMConfig":
+        if self.endpoints is not None:
+            if self.base_url is not None:
+                raise ValueError("set either base_url or endpoints, not both")
+            if not self.endpoints:
+                raise ValueError("endpoints must not be empty")
+            if any(e.weight <= 0 for e in self.endpoints):
+                raise ValueError("endpoint weights must be positive")
+        return self
+
 
 class AgentConfig(BaseModel):
     """Configuration for a single agent."""
@@ -53,9 +160,16 @@ class AgentConfig(BaseModel):
     backstory: str
     llm: LLMConfig
     tools: List[str] | None = None
+    replicas: int = 1
 
     model_config = ConfigDict(extra="forbid")
 
+    @model_validator(mode="after")
+    def _check_replicas(self) -> "AgentConfig":
+        if self.replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        return self
+
 
 class ConfigModel(BaseModel):
     """Top-level application configuration."""
@@ -65,25 +179,46 @@ class ConfigModel(BaseModel):
     policies: PoliciesConfig = PoliciesConfig()
     storage: StorageConfig | None = None
     supervision: SupervisionConfig = SupervisionConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    models: ModelsConfig = ModelsConfig()
+    concurrency: ConcurrencyConfig = ConcurrencyConfig()
+    routing: RoutingConfig = RoutingConfig()
+    scheduling: SchedulingConfig = SchedulingConfig()
+    context: ContextConfig = ContextConfig()
 
     model_config = ConfigDict(extra="forbid")
 
 
-def load_config(path: Path) -> ConfigModel:
-    """Load and validate a YAML or JSON configuration file."""
+def parse_config(text: str, suffix: str) -> Any:
+    """Parse the YAML or JSON ``text`` of a file with extension ``suffix``.
+
+    Syntax errors are raised as :class:`ValueError`, like validation errors.
+    """
+    if suffix in {".yaml", ".yml"}:
+        try:
+            return yaml.safe_load(text)
+        except yaml.YAMLError as exc:
+            raise ValueError(f"Invalid YAML: {exc}") from exc
+    if suffix == ".json":
+        return json.loads(text)
+    raise ValueError(f"Unsupported config format: {suffix}")
 
-    text = path.read_text(encoding="utf-8")
-    if path.suffix in {".yaml", ".yml"}:
-        raw = yaml.safe_load(text)  # type: ignore[assignment]
-    elif path.suffix == ".json":
-        raw = json.loads(text)
-    else:
-        raise ValueError(f"Unsupported config format: {path.suffix}")
 
+def validate_config(raw: Any, source: Path | str = "<config>") -> ConfigModel:
+    """Validate parsed configuration data read from ``source``."""
     try:
         return ConfigModel.model_validate(raw)
-    except ValidationError as exc:  # pragma: no cover - exercised in tests
+    except ValidationError as exc:
         errors = "; ".join(
             f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
         )
-        raise ValueError(f"Invalid configuration: {errors}") from exc
+        raise ValueError(f"Invalid configuration at {source}: {errors}") from exc
+
+
+def load_config(path: Path) -> ConfigModel:
+    """Load and validate a YAML or JSON configuration file.
+
+    See :mod:`config.service` for a cached variant and hot reloading.
+    """
+    text = path.read_text(encoding="utf-8")
+    return validate_config(parse_config(text, path.suffix), path)
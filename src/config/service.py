@@ -0,0 +1,176 @@
+"""Cached configuration loading and change notifications.
+
+Validated configurations are cached by the hash of the file content: in
+memory, so reloading an unchanged file is free, and on disk as parsed
+JSON, so a restart with an unchanged YAML file skips the YAML parser.
+:class:`ConfigService` polls the file and hands every new configuration
+to its subscribers, which apply the differences in place (see
+:func:`cli.apply_config`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .schema import ConfigModel, parse_config, validate_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(".agents_cache/config")
+
+Subscriber = Callable[[ConfigModel, ConfigModel], None]
+
+_models: Dict[str, ConfigModel] = {}
+_models_lock = threading.Lock()
+
+
+def content_key(data: bytes, suffix: str) -> str:
+    """Return the cache key of a configuration file's content."""
+    return hashlib.sha256(suffix.encode() + b"\0" + data).hexdigest()
+
+
+def load_config(path: Path, *, cache_dir: Path | None = DEFAULT_CACHE_DIR) -> ConfigModel:
+    """Load and validate ``path``, reusing earlier results for the same content.
+
+    Parameters
+    ----------
+    path:
+        YAML or JSON configuration file.
+    cache_dir:
+        Directory of the on-disk cache of parsed files; ``None`` disables it.
+    """
+    data = path.read_bytes()
+    return _load(path, data, content_key(data, path.suffix), cache_dir)
+
+
+def _load(path: Path, data: bytes, key: str, cache_dir: Path | None) -> ConfigModel:
+    model = _models.get(key)
+    if model is not None:
+        return model
+    raw = None
+    cached = cache_dir / f"{key}.json" if cache_dir is not None else None
+    if cached is not None and cached.exists():
+        try:
+            raw = json.loads(cached.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            raw = None
+    if raw is None:
+        raw = parse_config(data.decode("utf-8"), path.suffix)
+    model = validate_config(raw, path)
+    if cached is not None and not cached.exists():
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(raw), encoding="utf-8")
+            os.replace(tmp, cached)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("not caching %s: %s", path, exc)
+    with _models_lock:
+        return _models.setdefault(key, model)
+
+
+class ConfigService:
+    """Current configuration of ``path``, reloaded when the file changes.
+
+    Parameters
+    ----------
+    path:
+        Configuration file.
+    interval:
+        Seconds between checks while :meth:`start` is watching.
+    cache_dir:
+        See :func:`load_config`.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        interval: float = 1.0,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+    ) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.cache_dir = cache_dir
+        self.current: Optional[ConfigModel] = None
+        self._key: Optional[str] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> ConfigModel:
+        """Return the configuration, loading it on first use."""
+        if self.current is None:
+            self.check()
+        assert self.current is not None
+        return self.current
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call ``callback(old, new)`` after each change of the configuration."""
+        self._subscribers.append(callback)
+
+    def check(self) -> bool:
+        """Reload the file if it changed; return ``True`` on a new configuration.
+
+        An invalid file is logged and ignored once a configuration is
+        loaded, so a typo does not take a running service down.
+        """
+        with self._lock:
+            st = self.path.stat()
+            stat = (st.st_mtime_ns, st.st_size)
+            if stat == self._stat and self.current is not None:
+                return False
+            data = self.path.read_bytes()
+            key = content_key(data, self.path.suffix)
+            self._stat = stat
+            if key == self._key:
+                return False
+            try:
+                new = _load(self.path, data, key, self.cache_dir)
+            except ValueError:
+                if self.current is None:
+                    raise
+                logger.exception("ignoring invalid configuration %s", self.path)
+                return False
+            old, self.current, self._key = self.current, new, key
+        if old is not None:
+            for callback in self._subscribers:
+                try:
+                    callback(old, new)
+                except Exception:  # noqa: BLE001 - keep watching
+                    logger.exception("applying configuration change failed")
+        return old is not None
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Watch the file on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="config-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if self.check():
+                    logger.info("reloaded configuration %s", self.path)
+            except OSError as exc:
+                logger.warning("cannot read configuration %s: %s", self.path, exc)
+            except Exception:  # noqa: BLE001 - keep watching
+                logger.exception("checking configuration %s failed", self.path)
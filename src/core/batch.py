@@ -0,0 +1,128 @@
+"""Run many JSON-lines jobs concurrently and stream their results.
+
+Input lines are either JSON strings or objects with an ``objective`` and
+an optional ``id`` (defaulting to the line number).  Each result is
+appended to the output file as soon as its job finishes, so the output is
+in completion order and survives interruption; a resumed batch skips
+every id already recorded as completed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Set, TextIO
+
+
+@dataclass(slots=True)
+class BatchItem:
+    """Single objective of a batch.
+
+    Parameters
+    ----------
+    id:
+        Identifier written to the output; used to resume.
+    objective:
+        Objective passed to the runner.
+    """
+
+    id: str
+    objective: str
+
+
+def read_items(lines: Iterable[str]) -> Iterator[BatchItem]:
+    """Parse JSON-lines ``lines`` into :class:`BatchItem` objects.
+
+    Blank lines are skipped.  A :class:`ValueError` names the offending
+    line when it is neither a string nor an object with ``objective``.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {number}: invalid JSON: {exc}") from exc
+        if isinstance(data, str):
+            yield BatchItem(str(number), data)
+        elif isinstance(data, dict) and isinstance(data.get("objective"), str):
+            yield BatchItem(str(data.get("id", number)), data["objective"])
+        else:
+            raise ValueError(f"line {number}: expected a string or an object with 'objective'")
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """Return ids recorded as completed in the output file at ``path``."""
+    done: Set[str] = set()
+    if not path.exists():
+        return done
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                data = json.loads(line)
+            except ValueError:  # torn last line of an interrupted run
+                continue
+            if data.get("status") == "completed":
+                done.add(str(data["id"]))
+    return done
+
+
+async def run_batch(
+    runner: Callable[[str], Any],
+    items: Iterable[BatchItem],
+    output: TextIO | IO[str],
+    *,
+    parallelism: int = 4,
+    skip: Set[str] | None = None,
+) -> Dict[str, int]:
+    """Run ``runner`` for every item with at most ``parallelism`` in flight.
+
+    ``runner`` is a blocking callable executed on a dedicated thread pool.
+    One JSON line is written to ``output`` per finished item and flushed
+    immediately.  Returns counts of ``completed``, ``failed`` and
+    ``skipped`` items.
+    """
+    skip = skip or set()
+    counts = {"completed": 0, "failed": 0, "skipped": 0}
+    pending: Iterator[BatchItem] = iter(items)
+    loop = asyncio.get_running_loop()
+
+    def next_item() -> BatchItem | None:
+        for item in pending:
+            if item.id in skip:
+                counts["skipped"] += 1
+                continue
+            return item
+        return None
+
+    async def worker(pool: ThreadPoolExecutor) -> None:
+        while (item := next_item()) is not None:
+            start = time.perf_counter()
+            record: Dict[str, Any] = {"id": item.id, "objective": item.objective}
+            try:
+                result = await loop.run_in_executor(pool, runner, item.objective)
+            except Exception as exc:  # noqa: BLE001 - reported in the output
+                record.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+                counts["failed"] += 1
+            else:
+                record.update(status="completed", result=result)
+                counts["completed"] += 1
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    workers = max(1, parallelism)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        tasks: List[asyncio.Task[None]] = [
+            asyncio.create_task(worker(pool)) for _ in range(workers)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    return counts
@@ -1,38 +1,95 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import Dict
 
 from agents.message import Message
 
+from .metrics import BUS_DEPTH, BUS_MESSAGES
+from .tracing import TRACER, span
+
+# Queue holding the messages the supervisor itself sends to its channel,
+# i.e. commands for the manager.
+COMMANDS = "supervisor.commands"
+
 
 class MessageBus:
-    """Simple asynchronous message bus based on ``asyncio`` queues."""
+    """Simple asynchronous message bus based on ``asyncio`` queues.
+
+    Messages to ``"supervisor"`` travel both ways: updates from agents are
+    read by the interface and commands sent by ``"supervisor"`` are read by
+    the manager.  Commands are kept on a queue of their own so that each
+    reader blocks on its own messages.
+    """
 
     def __init__(self) -> None:
         self._queues: Dict[str, asyncio.Queue[Message]] = {}
+        # id(message) -> enqueue time, only populated while tracing
+        self._sent_at: Dict[int, int] = {}
         # Pre-register supervisor channel for UI communications
         self.register("supervisor")
+        self.register(COMMANDS)
 
     def register(self, name: str) -> asyncio.Queue[Message]:
-        """Register ``name`` and return its message queue."""
-        queue: asyncio.Queue[Message] = asyncio.Queue()
-        self._queues[name] = queue
+        """Register ``name`` and return its message queue.
+
+        Registering an existing name returns its current queue.
+        """
+        queue = self._queues.get(name)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._queues[name] = queue
+            BUS_DEPTH.labels(target=name).set_function(queue.qsize)
         return queue
 
-    async def send(self, target: str, message: Message) -> None:
-        """Send ``message`` to ``target``'s queue."""
+    def _route(self, target: str, message: Message) -> asyncio.Queue[Message]:
+        if target == "supervisor" and message.sender == "supervisor":
+            target = COMMANDS
         queue = self._queues.get(target)
         if queue is None:
             raise KeyError(f"No queue registered for {target}")
-        await queue.put(message)
+        return queue
+
+    async def send(self, target: str, message: Message) -> None:
+        """Send ``message`` to ``target``'s queue."""
+        queue = self._route(target, message)
+        BUS_MESSAGES.labels(target=target).inc()
+        if not TRACER.enabled:
+            await queue.put(message)
+            return
+        with span("MessageBus.send", "bus", target=target):
+            self._sent_at[id(message)] = time.perf_counter_ns()
+            await queue.put(message)
 
     def dispatch(self, target: str, message: Message) -> None:
         """Synchronously send ``message`` to ``target`` if possible."""
-        queue = self._queues.get(target)
+        queue = self._route(target, message)
+        BUS_MESSAGES.labels(target=target).inc()
+        if not TRACER.enabled:
+            queue.put_nowait(message)
+            return
+        with span("MessageBus.dispatch", "bus", target=target):
+            self._sent_at[id(message)] = time.perf_counter_ns()
+            queue.put_nowait(message)
+
+    def _received(self, target: str, message: Message) -> None:
+        """Record how long ``message`` waited in ``target``'s queue."""
+        sent = self._sent_at.pop(id(message), None)
+        if sent is not None:
+            TRACER.record(
+                "bus.queue_wait", sent, time.perf_counter_ns(), "bus", {"target": target}
+            )
+
+    async def recv(self, name: str) -> Message:
+        """Receive the next message from ``name``'s queue."""
+        queue = self._queues.get(name)
         if queue is None:
-            raise KeyError(f"No queue registered for {target}")
-        queue.put_nowait(message)
+            raise KeyError(f"No queue registered for {name}")
+        message = await queue.get()
+        if self._sent_at:
+            self._received(name, message)
+        return message
 
     # -- Supervisor convenience API -----------------------------------
     def send_to_supervisor(self, message: Message) -> None:
@@ -46,20 +103,27 @@ class MessageBus:
         ----------
         include_supervisor:
             If ``True``, messages originating from the ``"supervisor"``
-            sender will be returned.  By default such messages are skipped
-            so that tests or interfaces waiting for updates from agents do
-            not accidentally consume their own commands.
+            sender will be returned.  By default such messages are left
+            for :meth:`recv_command` so that tests or interfaces waiting
+            for updates from agents do not accidentally consume their own
+            commands.
         """
-        queue = self._queues.get("supervisor")
-        if queue is None:
-            raise KeyError("No queue registered for supervisor")
-
-        while True:
-            message = await queue.get()
-            if not include_supervisor and message.sender == "supervisor":
-                # Put the supervisor's own message back and yield control so
-                # the intended recipient can consume it.
-                queue.put_nowait(message)
-                await asyncio.sleep(0)
-                continue
-            return message
+        if not include_supervisor:
+            return await self.recv("supervisor")
+        for name in ("supervisor", COMMANDS):
+            if not self._queues[name].empty():
+                return await self.recv(name)
+        getters = {
+            asyncio.ensure_future(self.recv(name)): name for name in ("supervisor", COMMANDS)
+        }
+        done, pending = await asyncio.wait(getters, return_when=asyncio.FIRST_COMPLETED)
+        for getter in pending:
+            getter.cancel()
+        first, *rest = sorted(done, key=lambda g: getters[g] != "supervisor")
+        for getter in rest:
+            self._queues[getters[getter]].put_nowait(getter.result())
+        return first.result()
+
+    async def recv_command(self) -> Message:
+        """Receive the next command the supervisor sent to its channel."""
+        return await self.recv(COMMANDS)
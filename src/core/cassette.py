@@ -0,0 +1,380 @@
+"""Record and replay the external calls of a run.
+
+A :class:`Cassette` records every model call, ``ResearcherAgent`` fetch
+and ``TesterAgent`` subprocess together with its timing into a gzipped
+JSON-lines file.  Replaying the cassette serves the recorded results
+without Ollama, network or subprocesses, either at recorded speed or as
+fast as possible, so the cost of the manager, scheduler and bus can be
+measured (see ``--profile``) and compared across versions on a real
+workload.
+
+Calls are matched by a hash of their request.  A request missing from the
+cassette, e.g. because an orchestrator change altered a prompt, gets the
+next unused recording of the same kind unless the cassette is ``strict``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import builtins
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from .metrics import REGISTRY
+
+REPLAYS = REGISTRY.counter(
+    "agents_cassette_replays", "Calls served from a cassette", ("kind", "match")
+)
+
+FORMAT_VERSION = 1
+
+_active: Optional["Cassette"] = None
+
+
+class CassetteMiss(LookupError):
+    """A replayed run made a call the cassette has no recording for."""
+
+
+def request_key(kind: str, request: Any) -> str:
+    """Return the hash identifying ``request`` of ``kind`` in a cassette."""
+    data = json.dumps([kind, request], sort_keys=True, default=str).encode()
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+class Cassette:
+    """Recorded external calls of one run.
+
+    Parameters
+    ----------
+    path:
+        Cassette file, written by :meth:`save` when recording and read
+        on creation when replaying.
+    replay:
+        Serve recorded results instead of performing the calls.
+    speed:
+        Replay pace: ``1.0`` waits the recorded duration of every call,
+        ``0`` returns immediately.
+    strict:
+        Raise :class:`CassetteMiss` instead of substituting the next
+        recording of the same kind for an unknown request.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        replay: bool = False,
+        speed: float = 0.0,
+        strict: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.replaying = replay
+        self.speed = speed
+        self.strict = strict
+        self.entries: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._by_key: Dict[Tuple[str, str], Deque[int]] = {}
+        self._by_kind: Dict[str, Deque[int]] = {}
+        self._used: set[int] = set()
+        self.stats: Counter[str] = Counter()
+        if replay:
+            self._load()
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            header = json.loads(fh.readline())
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}")
+            self.entries = [json.loads(line) for line in fh if line.strip()]
+        for idx, entry in enumerate(self.entries):
+            self._by_key.setdefault((entry["k"], entry["h"]), deque()).append(idx)
+            self._by_kind.setdefault(entry["k"], deque()).append(idx)
+
+    def save(self) -> None:
+        """Write the recorded calls to :attr:`path`."""
+        if self.replaying:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            entries = sorted(self.entries, key=lambda e: e["t"])
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            fh.write(json.dumps({"version": FORMAT_VERSION}) + "\n")
+            for entry in entries:
+                fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        kind: str,
+        request: Any,
+        started: float,
+        *,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record a call of ``kind`` that started at ``started`` (perf counter)."""
+        entry: Dict[str, Any] = {
+            "k": kind,
+            "h": request_key(kind, request),
+            "t": round(started - self._origin, 6),
+            "d": round(time.perf_counter() - started, 6),
+        }
+        if error is not None:
+            entry["e"] = [type(error).__name__, str(error)]
+        else:
+            entry["r"] = result
+        with self._lock:
+            self.entries.append(entry)
+
+    def take(self, kind: str, request: Any) -> Dict[str, Any]:
+        """Return the recording answering ``request`` and mark it used."""
+        key = (kind, request_key(kind, request))
+        with self._lock:
+            idx = self._pop(self._by_key.get(key))
+            match = "exact"
+            if idx is None and not self.strict:
+                idx = self._pop(self._by_kind.get(kind))
+                match = "substitute"
+            if idx is None:
+                self.stats["miss"] += 1
+                raise CassetteMiss(f"no recorded {kind} call for {request!r:.200}")
+            self._used.add(idx)
+            self.stats[match] += 1
+        REPLAYS.labels(kind=kind, match=match).inc()
+        return self.entries[idx]
+
+    def _pop(self, queue: Deque[int] | None) -> int | None:
+        while queue:
+            idx = queue.popleft()
+            if idx not in self._used:
+                return idx
+        return None
+
+    def delay(self, entry: Dict[str, Any]) -> float:
+        """Seconds to wait before answering with ``entry``."""
+        return entry["d"] * self.speed
+
+    @staticmethod
+    def outcome(entry: Dict[str, Any], decode: Callable[[Any], Any] = _same) -> Any:
+        """Return the recorded result of ``entry`` or raise its error."""
+        if "e" in entry:
+            name, message = entry["e"]
+            exc_type = getattr(builtins, name, None)
+            if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+                raise exc_type(message)
+            raise RuntimeError(f"{name}: {message}")
+        return decode(entry["r"])
+
+    # ------------------------------------------------------------------
+    def call(
+        self,
+        kind: str,
+        request: Any,
+        func: Callable[[], Any],
+        *,
+        encode: Callable[[Any], Any] = _same,
+        decode: Callable[[Any], Any] = _same,
+    ) -> Any:
+        """Run ``func`` and record its outcome, or replay the recorded one."""
+        if self.replaying:
+            entry = self.take(kind, request)
+            if self.speed:
+                time.sleep(self.delay(entry))
+            return self.outcome(entry, decode)
+        started = time.perf_counter()
+        try:
+            result = func()
+        except Exception as exc:
+            self.add(kind, request, started, error=exc)
+            raise
+        self.add(kind, request, started, result=encode(result))
+        return result
+
+    async def acall(
+        self,
+        kind: str,
+        request: Any,
+        func: Callable[[], Awaitable[Any]],
+        *,
+        encode: Callable[[Any], Any] = _same,
+        decode: Callable[[Any], Any] = _same,
+    ) -> Any:
+        """Asynchronous :meth:`call`."""
+        if self.replaying:
+            entry = self.take(kind, request)
+            if self.speed:
+                await asyncio.sleep(self.delay(entry))
+            return self.outcome(entry, decode)
+        started = time.perf_counter()
+        try:
+            result = await func()
+        except Exception as exc:
+            self.add(kind, request, started, error=exc)
+            raise
+        self.add(kind, request, started, result=encode(result))
+        return result
+
+
+def install(cassette: Cassette | None) -> None:
+    """Route intercepted calls of the process through ``cassette``."""
+    global _active
+    _active = cassette
+
+
+def active() -> Cassette | None:
+    """Return the installed cassette, if any."""
+    return _active
+
+
+def intercept(kind: str, request: Any, func: Callable[[], Any], **codec: Any) -> Any:
+    """Call ``func`` through the installed cassette, or directly without one."""
+    cassette = _active
+    if cassette is None:
+        return func()
+    return cassette.call(kind, request, func, **codec)
+
+
+async def aintercept(
+    kind: str, request: Any, func: Callable[[], Awaitable[Any]], **codec: Any
+) -> Any:
+    """Asynchronous :func:`intercept`."""
+    cassette = _active
+    if cassette is None:
+        return await func()
+    return await cassette.acall(kind, request, func, **codec)
+
+
+def wrap(llm: Any) -> Any:
+    """Return ``llm`` recorded by the installed cassette, if any."""
+    if _active is None or isinstance(llm, CassetteLLM):
+        return llm
+    return CassetteLLM(
+        inner=llm,
+        cassette=_active,
+        model=str(getattr(llm, "model", "")),
+        base_url=getattr(llm, "base_url", None),
+    )
+
+
+class CassetteLLM(LLM):
+    """LangChain LLM recording or replaying the calls of ``inner``.
+
+    Streams are recorded as their full text and replayed line by line,
+    paced over the recorded duration.
+    """
+
+    inner: Any
+    cassette: Any
+    model: str = ""
+    base_url: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def _request(self, prompt: str, stop: Optional[List[str]]) -> Dict[str, Any]:
+        return {"model": self.model, "prompt": prompt, "stop": stop}
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        return self.cassette.call(
+            "llm", self._request(prompt, stop), lambda: self.inner.invoke(prompt, stop=stop, **kwargs)
+        )
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        return await self.cassette.acall(
+            "llm",
+            self._request(prompt, stop),
+            lambda: self.inner.ainvoke(prompt, stop=stop, **kwargs),
+        )
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        request = self._request(prompt, stop)
+        if self.cassette.replaying:
+            entry = self.cassette.take("llm", request)
+            lines = _lines(self.cassette.outcome(entry))
+            for text in lines:
+                if self.cassette.speed:
+                    time.sleep(self.cassette.delay(entry) / len(lines))
+                yield GenerationChunk(text=text)
+            return
+        started = time.perf_counter()
+        chunks: List[str] = []
+        try:
+            for text in self.inner.stream(prompt, stop=stop, **kwargs):
+                chunks.append(text)
+                if run_manager is not None:
+                    run_manager.on_llm_new_token(text)
+                yield GenerationChunk(text=text)
+        except Exception as exc:
+            self.cassette.add("llm", request, started, error=exc)
+            raise
+        self.cassette.add("llm", request, started, result="".join(chunks))
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        request = self._request(prompt, stop)
+        if self.cassette.replaying:
+            entry = self.cassette.take("llm", request)
+            lines = _lines(self.cassette.outcome(entry))
+            for text in lines:
+                if self.cassette.speed:
+                    await asyncio.sleep(self.cassette.delay(entry) / len(lines))
+                yield GenerationChunk(text=text)
+            return
+        started = time.perf_counter()
+        chunks: List[str] = []
+        try:
+            async for text in self.inner.astream(prompt, stop=stop, **kwargs):
+                chunks.append(text)
+                if run_manager is not None:
+                    await run_manager.on_llm_new_token(text)
+                yield GenerationChunk(text=text)
+        except Exception as exc:
+            self.cassette.add("llm", request, started, error=exc)
+            raise
+        self.cassette.add("llm", request, started, result="".join(chunks))
+
+
+def _lines(text: str) -> List[str]:
+    return text.splitlines(keepends=True) or [text]
@@ -0,0 +1,217 @@
+"""Token-budgeted prompts for tasks chained on earlier results.
+
+When every task sees the results of the tasks before it, prompts grow
+with each step and long prompts dominate model latency.
+:class:`ContextWindow` builds each prompt from three parts:
+
+* a stable prefix (the agent's role, goal and backstory) that is
+  byte-identical across calls, so the server can reuse its prompt cache;
+* earlier results, the most recent ones verbatim and older ones shrunk
+  into short digests, dropped oldest first once the model's budget is
+  exhausted;
+* the task itself.
+
+Digests are extractive by default (leading lines cut at a token count) or
+produced by a summarizer such as :func:`llm_summarizer`.  They are cached
+by content, so the digest of a given result never changes and the prompt
+keeps a stable prefix as it rolls forward.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .metrics import REGISTRY
+
+PROMPT_TOKENS = REGISTRY.histogram(
+    "agents_prompt_tokens",
+    "Estimated tokens of prompts built by the context window",
+    ("agent",),
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+
+# Ollama's default context length when a model sets no ``num_ctx``.
+DEFAULT_CONTEXT = 2048
+
+Summarizer = Callable[[str, int], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a cheap estimate of the number of tokens in ``text``.
+
+    Roughly four bytes per token for English text and code; never less
+    than the number of whitespace separated words.
+    """
+    return max((len(text.encode()) + 3) // 4, len(text.split()))
+
+
+def truncate(text: str, tokens: int) -> str:
+    """Return the leading part of ``text`` fitting in about ``tokens``."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    kept: List[str] = []
+    used = 0
+    for line in text.strip().splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > tokens:
+            room = (tokens - used) * 4
+            if room > 16:
+                kept.append(line[:room].rstrip())
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept).rstrip() + " …"
+
+
+def llm_summarizer(llm: Any) -> Summarizer:
+    """Return a :data:`Summarizer` asking ``llm`` for a short summary."""
+
+    def summarize(text: str, tokens: int) -> str:
+        words = max(8, tokens * 3 // 4)
+        answer = llm.invoke(
+            f"Summarize the following in at most {words} words. "
+            f"Keep names, paths and numbers.\n\n{text}"
+        )
+        return truncate(str(answer).strip(), tokens)
+
+    return summarize
+
+
+@dataclass(slots=True)
+class Entry:
+    """A finished task and its result."""
+
+    task: str
+    result: str
+
+
+class ContextWindow:
+    """Build prompts for chained tasks within a per-model token budget.
+
+    Parameters
+    ----------
+    budgets:
+        Prompt token budget per model name.  Models not listed use their
+        ``num_ctx`` (or :data:`DEFAULT_CONTEXT`) times ``prompt_share``.
+    prompt_share:
+        Fraction of a model's context reserved for the prompt; the rest is
+        left for the answer.
+    recent:
+        Number of latest results included verbatim when they fit.
+    digest_tokens:
+        Size of the digest replacing an older result.
+    summarizer:
+        Produces digests; extractive :func:`truncate` when ``None``.
+    """
+
+    def __init__(
+        self,
+        *,
+        budgets: Mapping[str, int] | None = None,
+        prompt_share: float = 0.5,
+        recent: int = 1,
+        digest_tokens: int = 64,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.budgets = dict(budgets or {})
+        self.prompt_share = prompt_share
+        self.recent = recent
+        self.digest_tokens = digest_tokens
+        self.summarizer = summarizer
+        self.history: List[Entry] = []
+        self._prefixes: Dict[Tuple[str, str, str], str] = {}
+        self._digests: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def fork(self) -> "ContextWindow":
+        """Return a window with its own history sharing caches with ``self``."""
+        other = ContextWindow(
+            budgets=self.budgets,
+            prompt_share=self.prompt_share,
+            recent=self.recent,
+            digest_tokens=self.digest_tokens,
+            summarizer=self.summarizer,
+        )
+        other._prefixes = self._prefixes
+        other._digests = self._digests
+        other._lock = self._lock
+        return other
+
+    def clear(self) -> None:
+        """Forget the results of the previous objective."""
+        self.history = []
+
+    def add(self, task: str, result: Any) -> None:
+        """Record ``result`` of ``task`` for the following prompts."""
+        self.history.append(Entry(task, result if isinstance(result, str) else str(result)))
+
+    # ------------------------------------------------------------------
+    def budget(self, llm: Any) -> int:
+        """Return the prompt token budget for the model behind ``llm``."""
+        model = str(getattr(llm, "model", ""))
+        if model in self.budgets:
+            return self.budgets[model]
+        context = getattr(llm, "num_ctx", None) or DEFAULT_CONTEXT
+        return int(context * self.prompt_share)
+
+    def prefix(self, agent: Any) -> str:
+        """Return the stable prompt prefix describing ``agent``."""
+        key = (
+            str(getattr(agent, "role", "")),
+            str(getattr(agent, "goal", "")),
+            str(getattr(agent, "backstory", "")),
+        )
+        text = self._prefixes.get(key)
+        if text is None:
+            role, goal, backstory = key
+            text = self._prefixes.setdefault(
+                key, f"You are {role}. {backstory}\nYour goal: {goal}\n\n"
+            )
+        return text
+
+    def digest(self, result: str) -> str:
+        """Return the cached short form of ``result``."""
+        if estimate_tokens(result) <= self.digest_tokens:
+            return result
+        key = hashlib.sha1(result.encode()).hexdigest()
+        text = self._digests.get(key)
+        if text is None:
+            if self.summarizer is not None:
+                text = self.summarizer(result, self.digest_tokens)
+            else:
+                text = truncate(result, self.digest_tokens)
+            with self._lock:
+                text = self._digests.setdefault(key, text)
+        return text
+
+    def build(self, agent: Any, task: str, *, name: Optional[str] = None) -> str:
+        """Return the prompt for ``agent`` to perform ``task``."""
+        prefix = self.prefix(agent)
+        tail = f"Task: {task}\n"
+        room = self.budget(getattr(agent, "llm", None)) - estimate_tokens(prefix + tail)
+        parts: List[str] = []
+        # Walk back from the latest result; stop at the first that no
+        # longer fits so the kept section is a contiguous suffix.
+        for age, entry in enumerate(reversed(self.history)):
+            body = entry.result if age < self.recent else self.digest(entry.result)
+            part = f"- {entry.task}: {body}\n"
+            cost = estimate_tokens(part)
+            if cost > room and age < self.recent:
+                body = self.digest(entry.result)
+                part = f"- {entry.task}: {body}\n"
+                cost = estimate_tokens(part)
+            if cost > room:
+                break
+            parts.append(part)
+            room -= cost
+        context = ""
+        if parts:
+            context = "Results of earlier tasks:\n" + "".join(reversed(parts)) + "\n"
+        prompt = prefix + context + tail
+        PROMPT_TOKENS.labels(agent=name or str(getattr(agent, "role", ""))).observe(
+            estimate_tokens(prompt)
+        )
+        return prompt
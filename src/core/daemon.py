@@ -0,0 +1,273 @@
+"""Long-running job server keeping agents and model clients warm.
+
+Objectives are submitted over a local HTTP API, either on a TCP port bound
+to localhost or on a Unix socket, and executed by a fixed number of
+workers in priority order.  Progress events of every job can be streamed
+back as JSON lines while it runs.
+
+Endpoints
+---------
+``POST /jobs``
+    Body ``{"objective": str, "priority": int = 0, "id": str?}``; higher
+    priorities run first.  Returns the job with status ``202``.
+``GET /jobs`` and ``GET /jobs/{id}``
+    Job summaries.
+``GET /jobs/{id}/events``
+    JSON-lines stream of the job's events, ending with ``completed`` or
+    ``failed``.
+``GET /health``
+    Queue length and worker count.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# Receives the objective and a thread-safe callback emitting progress
+# events; returns the job result.
+Runner = Callable[[str, Callable[[Dict[str, Any]], None]], Any]
+
+TERMINAL = frozenset({"completed", "failed"})
+
+
+@dataclass
+class Job:
+    """Objective queued on the :class:`JobServer`.
+
+    Parameters
+    ----------
+    id:
+        Unique identifier.
+    objective:
+        Objective passed to the runner.
+    priority:
+        Jobs with higher values are started first.
+    """
+
+    id: str
+    objective: str
+    priority: int = 0
+    status: str = "queued"
+    result: Any = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Record ``event`` and wake up stream readers; loop thread only."""
+        self.events.append({"job": self.id, "ts": time.time(), **event})
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Event set by the next :meth:`emit`."""
+        return self._changed
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "objective": self.objective,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobServer:
+    """Priority queue of jobs executed by ``workers`` threads.
+
+    Parameters
+    ----------
+    runner:
+        Blocking callable executing one objective, see :data:`Runner`.
+    workers:
+        Number of jobs executed concurrently.
+    max_jobs:
+        Finished jobs retained for inspection; older ones are forgotten.
+    """
+
+    def __init__(self, runner: Runner, *, workers: int = 1, max_jobs: int = 1000) -> None:
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._queue: "asyncio.PriorityQueue[Tuple[int, int, Job]]" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task[None]] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------
+    def submit(self, objective: str, *, priority: int = 0, job_id: str | None = None) -> Job:
+        """Queue ``objective`` and return its :class:`Job`."""
+        job_id = job_id or uuid.uuid4().hex
+        if job_id in self.jobs:
+            raise ValueError(f"Duplicate job id: {job_id}")
+        job = Job(job_id, objective, priority)
+        self.jobs[job_id] = job
+        job.emit({"event": "queued", "priority": priority})
+        self._queue.put_nowait((-priority, next(self._seq), job))
+        self._forget_old()
+        return job
+
+    def _forget_old(self) -> None:
+        finished = [j for j in self.jobs.values() if j.status in TERMINAL]
+        for job in finished[: max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job.id]
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._pool is not None
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = "running"
+            job.started = time.time()
+            job.emit({"event": "started"})
+
+            def emit(event: Dict[str, Any], job: Job = job) -> None:
+                loop.call_soon_threadsafe(job.emit, event)
+
+            try:
+                job.result = await loop.run_in_executor(
+                    self._pool, self.runner, job.objective, emit
+                )
+            except Exception as exc:  # noqa: BLE001 - reported to the client
+                job.status = "failed"
+                job.error = f"{type(exc).__name__}: {exc}"
+            else:
+                job.status = "completed"
+            job.finished = time.time()
+            # Let progress events scheduled by the runner land first.
+            await asyncio.sleep(0)
+            job.emit({"event": job.status, "result": job.result, "error": job.error})
+            self._queue.task_done()
+
+    async def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; running jobs finish on their threads."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # -- HTTP API -------------------------------------------------------
+    def app(self) -> web.Application:
+        """Return the :mod:`aiohttp` application exposing the job API."""
+        app = web.Application()
+        app.add_routes(
+            [
+                web.get("/health", self._health),
+                web.get("/jobs", self._list),
+                web.post("/jobs", self._create),
+                web.get("/jobs/{id}", self._get),
+                web.get("/jobs/{id}/events", self._events),
+            ]
+        )
+
+        async def on_startup(_: web.Application) -> None:
+            await self.start()
+
+        async def on_cleanup(_: web.Application) -> None:
+            await self.stop()
+
+        app.on_startup.append(on_startup)
+        app.on_cleanup.append(on_cleanup)
+        return app
+
+    def _job(self, request: web.Request) -> Job:
+        job = self.jobs.get(request.match_info["id"])
+        if job is None:
+            raise web.HTTPNotFound(text="unknown job")
+        return job
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response({"queued": self._queue.qsize(), "workers": self.workers})
+
+    async def _list(self, request: web.Request) -> web.Response:
+        return web.json_response([j.summary() for j in self.jobs.values()], dumps=_dumps)
+
+    async def _get(self, request: web.Request) -> web.Response:
+        return web.json_response(self._job(request).summary(), dumps=_dumps)
+
+    async def _create(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+            objective = body["objective"]
+            priority = int(body.get("priority", 0))
+            if not isinstance(objective, str):
+                raise TypeError("objective must be a string")
+            job = self.submit(objective, priority=priority, job_id=body.get("id"))
+        except (ValueError, KeyError, TypeError) as exc:
+            raise web.HTTPBadRequest(text=f"invalid job: {exc}") from exc
+        return web.json_response(job.summary(), status=202, dumps=_dumps)
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        job = self._job(request)
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        sent = 0
+        while True:
+            changed = job.changed
+            batch = job.events[sent:]
+            sent += len(batch)
+            for event in batch:
+                await response.write((_dumps(event) + "\n").encode())
+            if job.events[sent - 1]["event"] in TERMINAL:
+                break
+            await changed.wait()
+        await response.write_eof()
+        return response
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, default=str)
+
+
+async def serve(
+    server: JobServer,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str | None = None,
+) -> None:
+    """Serve ``server``'s API until cancelled.
+
+    A Unix socket is used when ``socket_path`` is given, otherwise a TCP
+    port on ``host``.
+    """
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    if socket_path is not None:
+        site: web.BaseSite = web.UnixSite(runner, socket_path)
+    else:
+        site = web.TCPSite(runner, host, port)
+    await site.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
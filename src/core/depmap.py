@@ -0,0 +1,354 @@
+"""Static import analysis used to select the tests affected by a change.
+
+The :class:`DependencyMap` walks a project tree, parses every Python module
+with :mod:`ast` and records which project files each test module imports,
+directly or transitively.  Parsed imports, file stats and the content hashes
+of the last green test run are cached on disk so that subsequent runs only
+re-read files whose size or modification time changed.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Directories never scanned for Python modules.
+SKIP_DIRS: frozenset[str] = frozenset(
+    {".git", ".venv", "venv", "__pycache__", "node_modules", "build", "dist"}
+)
+
+# Files configuring pytest itself; any change requires a full run.
+PYTEST_CONFIG_FILES: frozenset[str] = frozenset(
+    {"pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini"}
+)
+
+
+def file_hash(path: Path) -> str | None:
+    """Return the SHA-256 digest of ``path`` or ``None`` if it is missing."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def is_test_file(path: Path) -> bool:
+    """Return ``True`` if ``path`` follows pytest's test module naming."""
+    name = path.name
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+class DependencyMap:
+    """Map test modules to the project source files they import.
+
+    Parameters
+    ----------
+    root:
+        Project root to scan.
+    cache_path:
+        Optional JSON file used to persist parsed imports, file stats and
+        the hashes recorded by the last green run.
+    source_dirs:
+        Directories, relative to ``root``, from which top-level imports are
+        resolved.  Mirrors the ``sys.path`` entries used by the test suite.
+    test_dirs:
+        Directories, relative to ``root``, whose non-Python files (fixtures,
+        data) are tracked and force a full run when they change.
+    """
+
+    def __init__(
+        self,
+        root: str | Path = ".",
+        *,
+        cache_path: str | Path | None = None,
+        source_dirs: Iterable[str] = (".", "src"),
+        test_dirs: Iterable[str] = ("tests",),
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.source_dirs = [self.root / d for d in source_dirs]
+        self.test_dirs = [self.root / d for d in test_dirs]
+        # relative path -> {"hash": str, "imports": [dotted names]}
+        self._parsed: Dict[str, Dict[str, object]] = {}
+        # relative path -> [mtime_ns, size, hash] from the last snapshot
+        self._stats: Dict[str, List[object]] = {}
+        # relative path -> hash recorded after the last green run
+        self.green: Dict[str, str] = {}
+        self._modules: Dict[str, str] = {}
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    def _load_cache(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            raw = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        self._parsed = raw.get("files", {})
+        self._stats = raw.get("stats", {})
+        self.green = raw.get("green", {})
+
+    def save(self) -> None:
+        """Persist parsed imports, stats and green hashes to :attr:`cache_path`."""
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"files": self._parsed, "stats": self._stats, "green": self.green}
+        self.cache_path.write_text(json.dumps(data))
+
+    # ------------------------------------------------------------------
+    def _rel(self, path: Path) -> str:
+        path = path if path.is_absolute() else self.root / path
+        try:
+            return path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def _walk(self, base: Path, pattern: str) -> List[Path]:
+        files: List[Path] = []
+        if not base.is_dir():
+            return files
+        for path in base.rglob(pattern):
+            parts = path.relative_to(self.root).parts
+            if any(p in SKIP_DIRS or p.startswith(".") for p in parts[:-1]):
+                continue
+            if path.is_file():
+                files.append(path)
+        return files
+
+    def python_files(self) -> List[Path]:
+        """Return all Python files below :attr:`root`."""
+        return sorted(self._walk(self.root, "*.py"))
+
+    def support_files(self) -> List[Path]:
+        """Return pytest config files and non-Python files in test dirs."""
+        files = [self.root / name for name in PYTEST_CONFIG_FILES]
+        files = [p for p in files if p.is_file()]
+        for base in self.test_dirs:
+            files.extend(p for p in self._walk(base, "*") if p.suffix not in {".py", ".pyc"})
+        return sorted(set(files))
+
+    def _index_modules(self, files: Iterable[Path]) -> None:
+        """Build the dotted module name -> file lookup table."""
+        modules: Dict[str, str] = {}
+        for base in self.source_dirs:
+            for path in files:
+                try:
+                    rel = path.relative_to(base)
+                except ValueError:
+                    continue
+                parts = list(rel.with_suffix("").parts)
+                if parts[-1] == "__init__":
+                    parts = parts[:-1]
+                if parts:
+                    modules.setdefault(".".join(parts), self._rel(path))
+        self._modules = modules
+
+    def _imports(self, path: Path, digest: str) -> List[str]:
+        """Return dotted names imported by ``path``, parsing only on change."""
+        rel = self._rel(path)
+        cached = self._parsed.get(rel)
+        if cached is not None and cached.get("hash") == digest:
+            return list(cached["imports"])  # type: ignore[arg-type]
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (OSError, SyntaxError, ValueError):
+            names: List[str] = []
+        else:
+            names = _collect_imports(tree, self._package_of(path))
+        self._parsed[rel] = {"hash": digest, "imports": names}
+        return names
+
+    def _package_of(self, path: Path) -> str:
+        for base in self.source_dirs:
+            try:
+                rel = path.relative_to(base)
+            except ValueError:
+                continue
+            return ".".join(rel.parent.parts)
+        return ""
+
+    def _resolve(self, name: str) -> Optional[str]:
+        """Map a dotted import to a project file, trying parent packages."""
+        while name:
+            found = self._modules.get(name)
+            if found is not None:
+                return found
+            name = name.rpartition(".")[0]
+        return None
+
+    # ------------------------------------------------------------------
+    def build(self, snapshot: Dict[str, str] | None = None) -> Dict[str, Set[str]]:
+        """Return a mapping of test file -> transitive project dependencies.
+
+        ``snapshot`` may provide content hashes from :meth:`snapshot` to
+        avoid reading files twice.  Modules are only re-parsed when their
+        hash differs from the cached one.  Every ``conftest.py`` and its
+        dependencies are attributed to the tests in its directory tree.
+        """
+        files = self.python_files()
+        self._index_modules(files)
+        hashes = snapshot if snapshot is not None else self.snapshot()
+        graph: Dict[str, Set[str]] = {}
+        for path in files:
+            rel = self._rel(path)
+            digest = hashes.get(rel)
+            if digest is None:
+                continue
+            deps = {
+                self._resolve(prefix)
+                for name in self._imports(path, digest)
+                for prefix in _prefixes(name)
+            }
+            deps.discard(None)
+            deps.discard(rel)
+            graph[rel] = deps  # type: ignore[assignment]
+        # Drop cache entries for files that no longer exist.
+        self._parsed = {k: v for k, v in self._parsed.items() if k in graph}
+
+        def closure(start: str) -> Set[str]:
+            seen: Set[str] = set()
+            stack = [start]
+            while stack:
+                for dep in graph.get(stack.pop(), ()):
+                    if dep not in seen:
+                        seen.add(dep)
+                        stack.append(dep)
+            return seen
+
+        conftests = {
+            Path(rel).parent: closure(rel) | {rel}
+            for rel in graph
+            if Path(rel).name == "conftest.py"
+        }
+        result: Dict[str, Set[str]] = {}
+        for path in files:
+            rel = self._rel(path)
+            if not is_test_file(path) or rel not in graph:
+                continue
+            deps = closure(rel)
+            for parent in Path(rel).parents:
+                deps |= conftests.get(parent, set())
+            result[rel] = deps
+        return result
+
+    def snapshot(self, hints: Iterable[str | Path] | None = None) -> Dict[str, str]:
+        """Return content hashes keyed by relative path for all tracked files.
+
+        Python files and :meth:`support_files` are included.  A file is only
+        re-read when its size or modification time differs from the previous
+        snapshot; ``hints`` name files that are re-hashed regardless, which
+        covers edits that keep both unchanged.
+        """
+        hinted = {self._rel(Path(h)) for h in hints or ()}
+        out: Dict[str, str] = {}
+        stats: Dict[str, List[object]] = {}
+        for path in [*self.python_files(), *self.support_files()]:
+            rel = self._rel(path)
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            cached = self._stats.get(rel)
+            if (
+                rel not in hinted
+                and cached is not None
+                and cached[0] == st.st_mtime_ns
+                and cached[1] == st.st_size
+            ):
+                digest: str | None = str(cached[2])
+            else:
+                digest = file_hash(path)
+            if digest is not None:
+                out[rel] = digest
+                stats[rel] = [st.st_mtime_ns, st.st_size, digest]
+        self._stats = stats
+        return out
+
+    def changed(self, snapshot: Dict[str, str]) -> Set[str]:
+        """Return paths in ``snapshot`` that differ from the last green run.
+
+        Files recorded as green but missing from ``snapshot`` are reported as
+        changed too.
+        """
+        changed = {k for k, v in snapshot.items() if self.green.get(k) != v}
+        changed.update(k for k in self.green if k not in snapshot)
+        return changed
+
+    def affected(self, changed: Iterable[str], graph: Dict[str, Set[str]]) -> Optional[List[str]]:
+        """Return the test files impacted by ``changed``.
+
+        ``None`` is returned when a change cannot be attributed to specific
+        tests and the whole suite has to run: a pytest config file, a
+        non-Python file under a test directory, or a Python module missing
+        from the import index (for example a deleted file).
+        """
+        known = set(self._modules.values())
+        selected: Set[str] = set()
+        for rel in changed:
+            if not rel.endswith(".py"):
+                return None
+            if rel not in known:
+                return None
+            if rel in graph:
+                selected.add(rel)
+            selected.update(t for t, deps in graph.items() if rel in deps)
+        return sorted(selected)
+
+    def mark_green(self, snapshot: Dict[str, str]) -> None:
+        """Record ``snapshot`` as the state of the last green run."""
+        self.green = dict(snapshot)
+        self.save()
+
+
+def merkle_root(snapshot: Dict[str, str]) -> str:
+    """Return a Merkle-style digest of ``snapshot`` (relative path -> hash).
+
+    Every directory hashes the sorted names and digests of its children, so
+    the root digest changes whenever any file is added, removed or edited.
+    """
+    tree: Dict[str, object] = {}
+    for rel, digest in snapshot.items():
+        node = tree
+        *dirs, name = rel.split("/")
+        for part in dirs:
+            node = node.setdefault(part, {})  # type: ignore[assignment]
+        node[name] = digest
+
+    def digest_of(node: Dict[str, object]) -> str:
+        h = hashlib.sha256()
+        for name in sorted(node):
+            child = node[name]
+            value = digest_of(child) if isinstance(child, dict) else str(child)
+            h.update(f"{name}\0{value}\n".encode())
+        return h.hexdigest()
+
+    return digest_of(tree)
+
+
+def _prefixes(name: str) -> List[str]:
+    """Return ``name`` and its parent packages, whose ``__init__`` also runs."""
+    parts = name.split(".")
+    return [".".join(parts[:i]) for i in range(len(parts), 0, -1)]
+
+
+def _collect_imports(tree: ast.AST, package: str) -> List[str]:
+    """Return the absolute dotted names imported in ``tree``."""
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                if node.level > 1:
+                    parts = parts[: len(parts) - node.level + 1]
+                base = ".".join([*parts, base] if base else parts)
+            if base:
+                names.append(base)
+            names.extend(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+    return names
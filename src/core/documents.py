@@ -0,0 +1,165 @@
+"""Bounded index of documents produced or observed by agents."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from .metrics import CACHE_REQUESTS
+
+PathLike = Union[str, Path]
+
+
+@dataclass(slots=True)
+class DocumentInfo:
+    """Metadata kept for every indexed document.
+
+    Parameters
+    ----------
+    path:
+        Location of the document.
+    size:
+        Size of the content in bytes.
+    mtime_ns:
+        Modification time when indexed, ``None`` if not yet on disk.
+    digest:
+        SHA-256 of the content.
+    """
+
+    path: Path
+    size: int
+    mtime_ns: Optional[int]
+    digest: str
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DocumentIndex(Mapping[Path, str]):
+    """Mapping of path -> content that only keeps metadata resident.
+
+    Content is loaded lazily from disk on access.  The most recently used
+    contents are kept in an LRU bounded by ``max_cached_chars`` characters
+    so repeated lookups of hot documents avoid disk reads.
+
+    Parameters
+    ----------
+    max_cached_chars:
+        Upper bound of the content cache, ``0`` disables it.
+    before_read:
+        Optional callback invoked before reading from disk, for example to
+        flush queued writes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_cached_chars: int = 1024 * 1024,
+        before_read: Callable[[], None] | None = None,
+    ) -> None:
+        self.max_cached_chars = max_cached_chars
+        self.before_read = before_read
+        self._info: Dict[Path, DocumentInfo] = {}
+        self._hot: "OrderedDict[Path, str]" = OrderedDict()
+        self._hot_chars = 0
+
+    # -- Mapping protocol ---------------------------------------------
+    def __getitem__(self, path: Path) -> str:
+        p = Path(path)
+        if p not in self._info:
+            raise KeyError(path)
+        text = self._hot.get(p)
+        if text is not None:
+            self._hot.move_to_end(p)
+            CACHE_REQUESTS.labels(cache="documents", result="hit").inc()
+            return text
+        CACHE_REQUESTS.labels(cache="documents", result="miss").inc()
+        if self.before_read is not None:
+            self.before_read()
+        try:
+            text = p.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return ""
+        self._cache(p, text)
+        return text
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self._info)
+
+    def __len__(self) -> int:
+        return len(self._info)
+
+    def __contains__(self, path: object) -> bool:
+        try:
+            return Path(path) in self._info  # type: ignore[arg-type]
+        except TypeError:
+            return False
+
+    # ------------------------------------------------------------------
+    def _cache(self, path: Path, text: str) -> None:
+        self._evict(path)
+        size = len(text)
+        if size > self.max_cached_chars:
+            return
+        self._hot[path] = text
+        self._hot_chars += size
+        while self._hot_chars > self.max_cached_chars:
+            _, old = self._hot.popitem(last=False)
+            self._hot_chars -= len(old)
+
+    def _evict(self, path: Path) -> None:
+        old = self._hot.pop(path, None)
+        if old is not None:
+            self._hot_chars -= len(old)
+
+    def info(self, path: PathLike) -> DocumentInfo:
+        """Return the metadata recorded for ``path``."""
+        return self._info[Path(path)]
+
+    def add(self, path: PathLike, text: str) -> DocumentInfo:
+        """Index ``text`` just written to ``path`` and keep it hot."""
+        p = Path(path)
+        data = text.encode()
+        try:
+            mtime: Optional[int] = p.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        info = DocumentInfo(p, len(data), mtime, hashlib.sha256(data).hexdigest())
+        self._info[p] = info
+        self._cache(p, text)
+        return info
+
+    def track(self, path: PathLike) -> DocumentInfo:
+        """Index the file at ``path`` without keeping its content.
+
+        Missing files are recorded as empty documents.
+        """
+        p = Path(path)
+        self._evict(p)
+        try:
+            st = p.stat()
+            info = DocumentInfo(p, st.st_size, st.st_mtime_ns, _hash_file(p))
+        except FileNotFoundError:
+            info = DocumentInfo(p, 0, None, hashlib.sha256(b"").hexdigest())
+        self._info[p] = info
+        return info
+
+    def discard(self, path: PathLike) -> None:
+        """Remove ``path`` from the index."""
+        p = Path(path)
+        self._info.pop(p, None)
+        self._evict(p)
+
+    @property
+    def cached_chars(self) -> int:
+        """Number of characters currently held by the LRU."""
+        return self._hot_chars
@@ -0,0 +1,200 @@
+"""Shared file output service used by agents that write generated files.
+
+Writes are deduplicated by content hash, performed atomically through a
+temporary file and :func:`os.replace`, and can be queued so that a single
+background thread flushes many small files as one batch instead of
+blocking the event loop on every write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .metrics import CACHE_REQUESTS
+from .tracing import span
+
+PathLike = Union[str, Path]
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileOutput:
+    """Deduplicating, atomic and batched file writer.
+
+    Parameters
+    ----------
+    max_workers:
+        Threads of the executor performing queued writes.
+    """
+
+    def __init__(self, *, max_workers: int = 1) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="file-output"
+        )
+        self._lock = threading.Lock()
+        # path -> (digest, mtime_ns, size) of the content last written
+        self._digests: Dict[Path, Tuple[str, int, int]] = {}
+        self._dirs: Set[Path] = set()
+        self._pending: Dict[Path, Tuple[bytes, List[Future[bool]]]] = {}
+        self._draining: Optional[Future[None]] = None
+        self.written = 0
+        self.skipped = 0
+        self.batches = 0
+
+    # ------------------------------------------------------------------
+    def _unchanged(self, path: Path, data: bytes, digest: str) -> bool:
+        """Return ``True`` if ``path`` already holds ``data``.
+
+        The digest of our last write is trusted while the file's mtime and
+        size are untouched; otherwise the file is re-read.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_size != len(data):
+            return False
+        known = self._digests.get(path)
+        if known is not None and known[1:] == (st.st_mtime_ns, st.st_size):
+            return known[0] == digest
+        try:
+            return _digest(path.read_bytes()) == digest
+        except OSError:
+            return False
+
+    def _remember(self, path: Path, digest: str) -> None:
+        st = path.stat()
+        self._digests[path] = (digest, st.st_mtime_ns, st.st_size)
+
+    def _write_now(self, path: Path, data: bytes) -> bool:
+        """Write ``data`` to ``path`` atomically unless it is unchanged."""
+        digest = _digest(data)
+        if self._unchanged(path, data, digest):
+            self._remember(path, digest)
+            self.skipped += 1
+            CACHE_REQUESTS.labels(cache="file_output", result="hit").inc()
+            return False
+        parent = path.parent
+        if parent not in self._dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(parent)
+        with span("file.write", "io", path=str(path)):
+            self._replace(path, parent, data)
+        self._remember(path, digest)
+        self.written += 1
+        CACHE_REQUESTS.labels(cache="file_output", result="miss").inc()
+        return True
+
+    def _replace(self, path: Path, parent: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _drain(self) -> None:
+        """Write every queued file; runs on the executor thread."""
+        while True:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+                if not batch:
+                    self._draining = None
+                    return
+                self.batches += 1
+            for path, (data, futures) in batch.items():
+                try:
+                    changed = self._write_now(path, data)
+                except BaseException as exc:  # pragma: no cover - I/O errors
+                    for fut in futures:
+                        fut.set_exception(exc)
+                else:
+                    for fut in futures:
+                        fut.set_result(changed)
+
+    # ------------------------------------------------------------------
+    def write(self, path: PathLike, text: str) -> bool:
+        """Synchronously write ``text`` to ``path``.
+
+        Returns ``False`` when the file already held identical content.
+        Pending queued writes to the same path are flushed first so the
+        newest content wins.
+        """
+        p = Path(path)
+        if p in self._pending:
+            self.flush()
+        return self._write_now(p, text.encode())
+
+    def submit(self, path: PathLike, text: str) -> Future[bool]:
+        """Queue ``text`` for ``path`` and return a future of the write.
+
+        Queued writes to the same path are coalesced; only the latest
+        content reaches the disk.
+        """
+        p = Path(path)
+        fut: Future[bool] = Future()
+        with self._lock:
+            previous = self._pending.get(p)
+            futures = previous[1] if previous is not None else []
+            futures.append(fut)
+            self._pending[p] = (text.encode(), futures)
+            if self._draining is None:
+                self._draining = self._executor.submit(self._drain)
+        return fut
+
+    async def awrite(self, path: PathLike, text: str) -> bool:
+        """Queue a write and wait for it without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(path, text))
+
+    def flush(self) -> None:
+        """Block until every queued write has reached the disk."""
+        while True:
+            with self._lock:
+                draining = self._draining
+            if draining is None:
+                return
+            draining.result()
+
+    async def aflush(self) -> None:
+        """Asynchronous counterpart of :meth:`flush`."""
+        await asyncio.to_thread(self.flush)
+
+    def put(self, path: PathLike, text: str) -> None:
+        """Write ``text`` without blocking a running event loop.
+
+        Inside a coroutine the write is queued for the background batch;
+        otherwise it is performed immediately.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.write(path, text)
+        else:
+            self.submit(path, text)
+
+
+_default: Optional[FileOutput] = None
+_default_lock = threading.Lock()
+
+
+def default_output() -> FileOutput:
+    """Return the process wide :class:`FileOutput` shared by agents."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = FileOutput()
+            atexit.register(_default.flush)
+        return _default
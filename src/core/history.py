@@ -0,0 +1,235 @@
+"""Bounded history of the messages exchanged with the supervisor.
+
+``"plan"`` and ``"progress"`` messages carry the whole task list.  Keeping
+them as they are makes a long supervised session grow with updates times
+tasks, so :class:`MessageHistory` stores each message as a record whose
+task list is replaced by the version of the task snapshot it saw.  A new
+version only stores the tasks that changed since the previous one.  Only
+the last ``window`` records stay in memory; older records are handed to a
+``spill`` callback, typically :meth:`core.storage.Storage.append_history`.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from agents.message import Message
+
+from .storage import task_from_dict, task_to_dict
+from .task import Task
+
+# Longer strings are payloads rather than commands and are not interned.
+INTERN_MAX = 256
+
+Spill = Callable[[List[Dict[str, Any]]], None]
+
+
+def intern(text: str) -> str:
+    """Return the interned ``text``, leaving long payloads alone."""
+    return sys.intern(text) if len(text) <= INTERN_MAX else text
+
+
+@dataclass(slots=True)
+class Record:
+    """One message with its task list replaced by a snapshot version.
+
+    Parameters
+    ----------
+    seq:
+        Position of the message in the history.
+    sender, content:
+        As in :class:`~agents.message.Message`, interned.
+    metadata:
+        The message metadata without ``"tasks"``.
+    version:
+        Version of the task snapshot the message carried, if any.
+    changed:
+        Tasks (as :func:`~core.storage.task_to_dict` dictionaries) that
+        changed in this version; only set on the first record of a version.
+    order:
+        Task ids of the snapshot when they differ from the previous version.
+    """
+
+    seq: int
+    sender: str
+    content: str
+    metadata: Optional[Dict[str, Any]] = None
+    version: Optional[int] = None
+    changed: Optional[List[Dict[str, Any]]] = None
+    order: Optional[List[int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"seq": self.seq, "sender": self.sender, "content": self.content}
+        for key in ("metadata", "version", "changed", "order"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        return cls(
+            seq=data["seq"],
+            sender=intern(data["sender"]),
+            content=intern(data["content"]),
+            metadata=data.get("metadata"),
+            version=data.get("version"),
+            changed=data.get("changed"),
+            order=data.get("order"),
+        )
+
+
+class _Snapshot:
+    """Task state rebuilt by applying records in order."""
+
+    __slots__ = ("tasks", "order")
+
+    def __init__(self) -> None:
+        self.tasks: Dict[int, Dict[str, Any]] = {}
+        self.order: List[int] = []
+
+    def copy(self) -> "_Snapshot":
+        other = _Snapshot()
+        other.tasks = dict(self.tasks)
+        other.order = list(self.order)
+        return other
+
+    def apply(self, record: Record) -> None:
+        for task in record.changed or ():
+            self.tasks[task["id"]] = task
+        if record.order is not None:
+            self.order = record.order
+
+    def message(self, record: Record) -> Message:
+        metadata = dict(record.metadata) if record.metadata else None
+        if record.version is not None:
+            metadata = metadata or {}
+            metadata["tasks"] = [task_from_dict(self.tasks[i]) for i in self.order]
+        return Message(sender=record.sender, content=record.content, metadata=metadata)
+
+
+def messages_from_records(records: Iterable[Dict[str, Any]]) -> List[Message]:
+    """Rebuild messages from serialised records, oldest first."""
+    snapshot = _Snapshot()
+    messages = []
+    for data in records:
+        record = Record.from_dict(data)
+        snapshot.apply(record)
+        messages.append(snapshot.message(record))
+    return messages
+
+
+class MessageHistory:
+    """Delta-encoded messages, the last ``window`` of them kept in memory.
+
+    Iterating yields :class:`~agents.message.Message` objects rebuilt from
+    the records in memory, with the task list as it was when each message
+    was sent.
+
+    Parameters
+    ----------
+    window:
+        Number of records kept in memory.
+    spill:
+        Called with the serialised records evicted from the window; they
+        are dropped when ``None``.
+    """
+
+    def __init__(self, window: int = 500, *, spill: Spill | None = None) -> None:
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.spill = spill
+        self.total = 0
+        self.version = 0
+        self._records: Deque[Record] = deque()
+        self._current = _Snapshot()
+        # Task state just before the oldest record in memory.
+        self._base = _Snapshot()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Message]:
+        with self._lock:
+            snapshot = self._base.copy()
+            records = list(self._records)
+        for record in records:
+            snapshot.apply(record)
+            yield snapshot.message(record)
+
+    def append(self, message: Message) -> Record:
+        """Record ``message`` and spill the records leaving the window."""
+        metadata = message.metadata
+        tasks: Optional[List[Task]] = None
+        if metadata and "tasks" in metadata:
+            tasks = metadata["tasks"]
+            metadata = {k: v for k, v in metadata.items() if k != "tasks"} or None
+        with self._lock:
+            record = Record(
+                seq=self.total,
+                sender=intern(message.sender),
+                content=intern(message.content),
+                metadata=metadata,
+            )
+            if tasks is not None:
+                self._version(record, tasks)
+            self.total += 1
+            self._records.append(record)
+            evicted = []
+            while len(self._records) > self.window:
+                old = self._records.popleft()
+                self._base.apply(old)
+                evicted.append(old)
+        if evicted and self.spill is not None:
+            self.spill([r.to_dict() for r in evicted])
+        return record
+
+    def _version(self, record: Record, tasks: List[Task]) -> None:
+        current = self._current
+        changed = []
+        for task in tasks:
+            data = task_to_dict(task)
+            if current.tasks.get(task.id) != data:
+                changed.append(data)
+        order = [task.id for task in tasks]
+        if order == current.order and changed == [] and self.version:
+            record.version = self.version
+            return
+        self.version += 1
+        record.version = self.version
+        record.changed = changed
+        if order != current.order:
+            record.order = order
+        current.apply(record)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return the serialised records in memory, oldest first."""
+        with self._lock:
+            return [r.to_dict() for r in self._records]
+
+    def tasks(self, version: int | None = None) -> List[Task]:
+        """Return the task snapshot of ``version`` (default: the latest).
+
+        Raises
+        ------
+        KeyError
+            If the version left the in-memory window.
+        """
+        if version is None or version == self.version:
+            with self._lock:
+                current = self._current.copy()
+            return [task_from_dict(current.tasks[i]) for i in current.order]
+        with self._lock:
+            snapshot = self._base.copy()
+            records = list(self._records)
+        for record in records:
+            snapshot.apply(record)
+            if record.version == version:
+                return [task_from_dict(snapshot.tasks[i]) for i in snapshot.order]
+        raise KeyError(version)
@@ -0,0 +1,254 @@
+"""Adaptive per-host concurrency limits for model calls.
+
+:class:`AdaptiveLimiter` applies additive-increase/multiplicative-decrease
+(AIMD) to the number of calls in flight against each Ollama host.  Every
+completed call updates an EWMA of its latency, a window used for the p95
+and an EWMA of the error rate.  The limit is cut when a call fails, the
+error rate rises or the p95 exceeds ``latency_tolerance`` times the
+host's baseline latency, and grows by about one slot per limit's worth of
+successful calls while the host is saturated and healthy.
+
+Slots can be taken from threads (:meth:`AdaptiveLimiter.slot`) and from
+coroutines (:meth:`AdaptiveLimiter.aslot`) against the same limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Union
+
+from .metrics import REGISTRY
+
+LIMIT = REGISTRY.gauge(
+    "agents_llm_concurrency_limit", "Adaptive concurrency limit per model host", ("host",)
+)
+INFLIGHT = REGISTRY.gauge(
+    "agents_llm_inflight", "Model calls in flight per host", ("host",)
+)
+
+_Waiter = Union[threading.Event, "tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]"]
+
+
+class HostLimit:
+    """Limit and latency statistics of a single host."""
+
+    def __init__(self, limiter: "AdaptiveLimiter") -> None:
+        self.limiter = limiter
+        self.limit = float(limiter.initial)
+        self.inflight = 0
+        self.ewma: float | None = None
+        self.baseline: float | None = None
+        self.error_rate = 0.0
+        self.latencies: Deque[float] = deque(maxlen=limiter.window)
+        self.last_decrease = 0.0
+        self.waiters: Deque[_Waiter] = deque()
+
+    @property
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def _observe(self, latency: float, error: bool) -> None:
+        lim = self.limiter
+        alpha = lim.alpha
+        self.error_rate = alpha * (1.0 if error else 0.0) + (1 - alpha) * self.error_rate
+        if not error:
+            self.latencies.append(latency)
+            self.ewma = latency if self.ewma is None else alpha * latency + (1 - alpha) * self.ewma
+            # The baseline follows improvements immediately and degradations
+            # slowly, so a permanently slower host is eventually accepted.
+            if self.baseline is None or self.ewma < self.baseline:
+                self.baseline = self.ewma
+            else:
+                self.baseline += (self.ewma - self.baseline) * lim.baseline_drift
+        saturated = self.inflight + 1 >= int(self.limit)
+        congested = (
+            error
+            or self.error_rate > lim.max_error_rate
+            or (
+                len(self.latencies) >= lim.min_samples
+                and self.baseline is not None
+                and self.p95 > self.baseline * lim.latency_tolerance
+            )
+        )
+        now = time.monotonic()
+        if congested:
+            # Cut at most once per typical call so a burst of slow
+            # completions from one overload does not collapse the limit.
+            if now - self.last_decrease >= (self.ewma or 0.0):
+                self.limit = max(lim.min_limit, self.limit * lim.backoff)
+                self.last_decrease = now
+        elif saturated:
+            self.limit = min(lim.max_limit, self.limit + 1 / self.limit)
+
+    def _grant(self) -> None:
+        """Hand free slots to waiters; called with the lock held."""
+        while self.waiters and self.inflight < int(self.limit):
+            waiter = self.waiters.popleft()
+            if isinstance(waiter, threading.Event):
+                self.inflight += 1
+                waiter.set()
+                continue
+            loop, fut = waiter
+            if fut.cancelled():
+                continue
+            self.inflight += 1
+            loop.call_soon_threadsafe(_resolve, fut, self)
+
+
+def _resolve(fut: "asyncio.Future[None]", host: HostLimit) -> None:
+    if fut.cancelled():
+        # The waiter went away after being granted a slot; pass it on.
+        host.limiter._release(host, None, False)
+    else:
+        fut.set_result(None)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter keyed by host.
+
+    Parameters
+    ----------
+    initial, min_limit, max_limit:
+        Starting value and bounds of each host's limit.
+    backoff:
+        Factor applied to the limit when the host is congested.
+    latency_tolerance:
+        The host counts as congested when its p95 latency exceeds its
+        baseline latency by this factor.
+    max_error_rate:
+        Error-rate EWMA above which the host counts as congested.
+    alpha:
+        Weight of a new sample in the latency and error EWMAs.
+    window:
+        Number of recent latencies used for the p95.
+    min_samples:
+        Samples needed before latency can trigger a decrease.
+    baseline_drift:
+        Fraction by which the baseline follows slower latencies per call.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.7,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.2,
+        alpha: float = 0.2,
+        window: int = 100,
+        min_samples: int = 10,
+        baseline_drift: float = 0.01,
+    ) -> None:
+        self.initial = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.alpha = alpha
+        self.window = window
+        self.min_samples = min_samples
+        self.baseline_drift = baseline_drift
+        self.hosts: Dict[str, HostLimit] = {}
+        self._lock = threading.Lock()
+
+    def host(self, name: str) -> HostLimit:
+        """Return the state of host ``name``, creating it on first use."""
+        state = self.hosts.get(name)
+        if state is None:
+            with self._lock:
+                state = self.hosts.get(name)
+                if state is None:
+                    state = self.hosts[name] = HostLimit(self)
+                    LIMIT.labels(host=name).set_function(lambda: state.limit)
+                    INFLIGHT.labels(host=name).set_function(lambda: state.inflight)
+        return state
+
+    def limit(self, name: str) -> int:
+        """Return the current whole-number limit of host ``name``."""
+        return int(self.host(name).limit)
+
+    # ------------------------------------------------------------------
+    def _release(self, state: HostLimit, latency: float | None, error: bool) -> None:
+        with self._lock:
+            state.inflight -= 1
+            if latency is not None:
+                state._observe(latency, error)
+            state._grant()
+
+    @contextmanager
+    def slot(self, name: str) -> Iterator[None]:
+        """Hold a slot of host ``name`` for the ``with`` block (threads)."""
+        state = self.host(name)
+        with self._lock:
+            if state.inflight < int(state.limit):
+                state.inflight += 1
+                event = None
+            else:
+                event = threading.Event()
+                state.waiters.append(event)
+        if event is not None:
+            event.wait()
+        yield from self._measure(state)
+
+    @asynccontextmanager
+    async def aslot(self, name: str) -> AsyncIterator[None]:
+        """Hold a slot of host ``name`` for the ``async with`` block."""
+        state = self.host(name)
+        fut: "asyncio.Future[None] | None" = None
+        with self._lock:
+            if state.inflight < int(state.limit):
+                state.inflight += 1
+            else:
+                loop = asyncio.get_running_loop()
+                fut = loop.create_future()
+                state.waiters.append((loop, fut))
+        if fut is not None:
+            await fut
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._release(state, time.perf_counter() - start, True)
+            raise
+        except BaseException:
+            # Cancelled or interrupted: not the host's fault, so no sample.
+            self._release(state, None, False)
+            raise
+        self._release(state, time.perf_counter() - start, False)
+
+    def _measure(self, state: HostLimit) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._release(state, time.perf_counter() - start, True)
+            raise
+        except BaseException:
+            # Cancelled or interrupted: not the host's fault, so no sample.
+            self._release(state, None, False)
+            raise
+        self._release(state, time.perf_counter() - start, False)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the limit and statistics of every host."""
+        return {
+            name: {
+                "limit": s.limit,
+                "inflight": s.inflight,
+                "ewma": s.ewma,
+                "p95": s.p95,
+                "error_rate": s.error_rate,
+            }
+            for name, s in list(self.hosts.items())
+        }
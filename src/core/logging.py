@@ -1,31 +1,238 @@
 from __future__ import annotations
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 LOG_FORMAT = "%(levelname)s|%(agent)s|%(task)s|%(message)s"
 
+# ``(agent, task id)`` of the task being executed, see :func:`task_context`.
+_TASK: contextvars.ContextVar[Optional[Tuple[str, Any]]] = contextvars.ContextVar(
+    "agent_task", default=None
+)
+
+
+@contextmanager
+def task_context(agent: str, task: Any) -> Iterator[None]:
+    """Mark the enclosed code as executing ``task`` on ``agent``.
+
+    The context follows asyncio tasks created inside the block and
+    callables run through :func:`contextvars.copy_context`.  Loggers from
+    :func:`get_logger` add the task id to records that do not carry one,
+    and :mod:`core.profiling` labels its reports with it.
+    """
+    token = _TASK.set((agent, task))
+    try:
+        yield
+    finally:
+        _TASK.reset(token)
+
+
+def current_task() -> Optional[Tuple[str, Any]]:
+    """Return the ``(agent, task id)`` set by :func:`task_context`, if any."""
+    return _TASK.get()
+
 
 class TaskLoggerAdapter(logging.LoggerAdapter):
     """Logger adapter that merges call-time ``extra`` with default context."""
 
     def process(self, msg: str, kwargs: dict) -> tuple[str, dict]:
-        extra = kwargs.get("extra", {})
-        extra.update(self.extra)
-        kwargs["extra"] = extra
+        extra = kwargs.get("extra")
+        current = _TASK.get()
+        if current is not None and (extra is None or "task" not in extra):
+            extra = {"task": current[1], **(extra or {})}
+        # ``Logger.makeRecord`` copies ``extra`` into the record, so the
+        # default context can be shared instead of copied on every call.
+        kwargs["extra"] = self.extra if extra is None else {**extra, **self.extra}
         return msg, kwargs
 
 
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "level": record.levelname,
+            "agent": getattr(record, "agent", record.name),
+            "task": getattr(record, "task", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class DebugThrottle(logging.Filter):
+    """Sample and rate limit ``DEBUG`` records per agent.
+
+    Parameters
+    ----------
+    sample:
+        Keep one out of ``sample`` debug records, per agent name.  A
+        mapping may give per-agent values, with ``"*"`` as the default.
+    rate:
+        Maximum debug records per second and agent, ``None`` for no limit.
+    """
+
+    def __init__(self, sample: int | Dict[str, int] = 1, rate: float | None = None) -> None:
+        super().__init__()
+        self.sample = sample if isinstance(sample, dict) else {"*": sample}
+        self.rate = rate
+        self._seen: Dict[str, int] = {}
+        self._buckets: Dict[str, List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        agent = getattr(record, "agent", record.name)
+        every = self.sample.get(agent, self.sample.get("*", 1))
+        if every > 1:
+            count = self._seen.get(agent, 0)
+            self._seen[agent] = count + 1
+            if count % every:
+                return False
+        if self.rate is not None:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(agent, [self.rate, now])
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[agent] = [tokens, now]
+                return False
+            self._buckets[agent] = [tokens - 1, now]
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Render tracebacks now so frames are not kept alive in the queue.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Pipeline:
+    """Queue shared by every agent logger and its background writer."""
+
+    def __init__(self, handlers: List[logging.Handler], throttle: DebugThrottle | None) -> None:
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.handler = _DeferredQueueHandler(self.queue)
+        if throttle is not None:
+            self.handler.addFilter(throttle)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+_pipeline: Optional[_Pipeline] = None
+_lock = threading.RLock()
+
+
+def configure_logging(
+    *,
+    json_path: str | None = None,
+    debug_sample: int | Dict[str, int] = 1,
+    debug_rate: float | None = None,
+    stream: bool = True,
+) -> None:
+    """(Re)configure the background logging pipeline.
+
+    Records emitted by :func:`get_logger` loggers are put on a queue and
+    written by a :class:`~logging.handlers.QueueListener` thread, so the
+    calling thread never blocks on I/O.
+
+    Parameters
+    ----------
+    json_path:
+        Optional file receiving JSON-lines records in addition to stderr.
+    debug_sample, debug_rate:
+        Sampling and rate limiting of debug records, see
+        :class:`DebugThrottle`.
+    stream:
+        Whether to write human readable records to stderr.
+    """
+    global _pipeline
+    handlers: List[logging.Handler] = []
+    if stream:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, defaults={"task": "-"}))
+        handlers.append(handler)
+    if json_path is not None:
+        file_handler = logging.FileHandler(json_path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    throttle = None
+    if debug_sample != 1 or debug_rate is not None:
+        throttle = DebugThrottle(debug_sample, debug_rate)
+    with _lock:
+        old = _pipeline
+        _pipeline = _Pipeline(handlers, throttle)
+        for name in list(logging.root.manager.loggerDict):
+            _attach(logging.getLogger(name), _pipeline.handler, only_existing=True)
+    if old is not None:
+        old.stop()
+
+
+def _attach(logger: logging.Logger, handler: logging.Handler, *, only_existing: bool = False) -> None:
+    """Replace any stale pipeline handler of ``logger`` with ``handler``."""
+    stale = [h for h in logger.handlers if isinstance(h, _DeferredQueueHandler)]
+    if only_existing and not stale:
+        return
+    for h in stale:
+        if h is not handler:
+            logger.removeHandler(h)
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _pipeline
+    with _lock:
+        old, _pipeline = _pipeline, None
+    if old is not None:
+        old.stop()
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(agent: str, level: int = logging.INFO) -> TaskLoggerAdapter:
     """Return a structured logger for ``agent``.
 
     The logger emits entries containing the log level, agent name and
     task identifier. Additional task information can be supplied at log
-    call time via the ``extra`` argument.
+    call time via the ``extra`` argument.  Records go through the queue
+    pipeline set up by :func:`configure_logging`, which is started with
+    default settings on first use.  Agent loggers do not propagate to the
+    root logger, whose handlers would write synchronously.
     """
+    with _lock:
+        if _pipeline is None:
+            configure_logging()
+        assert _pipeline is not None
+        handler = _pipeline.handler
     logger = logging.getLogger(agent)
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(handler)
+    if not logger.handlers or any(isinstance(h, _DeferredQueueHandler) for h in logger.handlers):
+        _attach(logger, handler)
+        logger.propagate = False
     logger.setLevel(level)
     return TaskLoggerAdapter(logger, {"agent": agent})
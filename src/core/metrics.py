@@ -0,0 +1,319 @@
+"""Prometheus-style metrics registry with an optional scrape endpoint.
+
+Counters and histograms never take a lock on the hot path: every thread
+updates its own cell and cells are only summed when the registry is
+rendered.  Metrics are exposed in the Prometheus text format, either via
+:meth:`Registry.render` or an HTTP endpoint bound to localhost.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+# Default latency buckets in seconds, suited to LLM and tool calls.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Cells:
+    """Per-thread storage of ``size`` floats.
+
+    Each thread writes only to its own list, so updates need no lock.  A
+    lock is taken once per thread to register its cell.
+    """
+
+    __slots__ = ("size", "_local", "_cells", "_lock")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self.size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        out = [0.0] * self.size
+        for cell in list(self._cells):
+            for i, value in enumerate(cell):
+                out[i] += value
+        return out
+
+
+M = TypeVar("M", bound="_Metric")
+
+
+class _Metric(ABC):
+    """Base class of metric families, optionally partitioned by labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+
+    @abstractmethod
+    def _new_child(self: M) -> M:
+        """Return an unlabelled metric of the same kind, name and help."""
+
+    def labels(self: M, **labels: str) -> M:
+        """Return the child metric for the given label values."""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _series(self) -> Iterator[Tuple[LabelValues, "_Metric"]]:
+        if self.labelnames:
+            yield from list(self._children.items())
+        else:
+            yield (), self
+
+    @abstractmethod
+    def _samples(self, labels: str) -> Iterator[str]:
+        """Yield the exposition lines of this series with ``labels``."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(child._samples(_format_labels(self.labelnames, values)))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._cells = _Cells(1)
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.help)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        yield f"{self.name}_total{labels} {_num(self.value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed when scraped."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.help)
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the value with ``fn`` on every read."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        yield f"{self.name}{labels} {_num(self.value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets.
+
+    Parameters
+    ----------
+    buckets:
+        Sorted upper bounds; ``+Inf`` is always appended.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # one cell per bucket, +Inf, then the sum
+        self._cells = _Cells(len(self.buckets) + 2)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.mine()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return int(sum(self._cells.totals()[:-1]))
+
+    @property
+    def sum(self) -> float:
+        return self._cells.totals()[-1]
+
+    def _samples(self, labels: str) -> Iterator[str]:
+        totals = self._cells.totals()
+        running = 0.0
+        inner = labels[1:-1] + "," if labels else ""
+        for bound, count in zip((*self.buckets, math.inf), totals):
+            running += count
+            le = "+Inf" if bound == math.inf else repr(float(bound))
+            yield f'{self.name}_bucket{{{inner}le="{le}"}} {_num(running)}'
+        yield f"{self.name}_count{labels} {_num(running)}"
+        yield f"{self.name}_sum{labels} {_num(totals[-1])}"
+
+
+class Registry:
+    """Collection of named metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: Type[M], name: str, *args: Any, **kwargs: Any) -> M:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(name, cls(name, *args, **kwargs))
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        return "\n".join(m.render() for m in list(self._metrics.values())) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Expose :meth:`render` on ``http://host:port/metrics``.
+
+        The server runs on a daemon thread; call ``shutdown()`` on the
+        returned server to stop it.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?")[0] not in {"/", "/metrics"}:
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = (f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+#: Process wide registry used by the instrumented components.
+REGISTRY = Registry()
+
+TASKS = REGISTRY.counter(
+    "agents_tasks", "Tasks dispatched by the manager", ("agent", "status")
+)
+TASK_SECONDS = REGISTRY.histogram(
+    "agents_task_seconds", "Duration of a single agent act", ("agent",)
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "agents_llm_seconds", "Latency of language model calls", ("agent",)
+)
+BUS_MESSAGES = REGISTRY.counter(
+    "agents_bus_messages", "Messages put on the message bus", ("target",)
+)
+BUS_DEPTH = REGISTRY.gauge(
+    "agents_bus_queue_depth", "Messages waiting in a bus queue", ("target",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "agents_cache_requests", "Cache lookups by outcome", ("cache", "result")
+)
+STORAGE_SECONDS = REGISTRY.histogram(
+    "agents_storage_seconds", "Duration of storage operations", ("op",)
+)
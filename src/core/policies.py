@@ -2,10 +2,14 @@
 
 Defines a simple whitelist based command policy and a network
 restriction check used by the :class:`~agents.manager.Manager`.
+:class:`PolicyEngine` compiles a rule set once so that checks stay cheap
+as the number of rules grows.
 """
 from __future__ import annotations
 
-from typing import Iterable
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Pattern
 
 # Default whitelist of allowed command keywords.  These cover the
 # commands used in the test suite and represent typical safe actions.
@@ -22,6 +26,8 @@ ALLOWED_COMMANDS: set[str] = {
 # containing an obvious URL will be rejected.
 NETWORK_ACCESS: bool = False
 
+_URL_RE: Pattern[str] = re.compile(r"https?://", re.IGNORECASE)
+
 def is_command_allowed(description: str, *, allowed: Iterable[str] | None = None) -> bool:
     """Return ``True`` if ``description`` starts with an allowed command.
 
@@ -36,7 +42,12 @@ def is_command_allowed(description: str, *, allowed: Iterable[str] | None = None
     words = description.strip().split()
     if not words:
         return True
-    whitelist = set(allowed) if allowed is not None else ALLOWED_COMMANDS
+    if allowed is None:
+        whitelist: Iterable[str] = ALLOWED_COMMANDS
+    elif isinstance(allowed, (set, frozenset)):
+        whitelist = allowed
+    else:
+        whitelist = frozenset(allowed)
     return words[0].lower() in whitelist
 
 def is_network_allowed(description: str, *, network_allowed: bool | None = None) -> bool:
@@ -48,9 +59,100 @@ def is_network_allowed(description: str, *, network_allowed: bool | None = None)
     allowed = NETWORK_ACCESS if network_allowed is None else network_allowed
     if allowed:
         return True
-    lowered = description.lower()
-    return "http://" not in lowered and "https://" not in lowered
+    return _URL_RE.search(description) is None
+
+
+class PolicyEngine:
+    """Compiled, immutable policy rule set.
+
+    Parameters
+    ----------
+    allowed_commands:
+        Whitelisted first words, matched case-insensitively.  ``None``
+        allows any command.
+    network_access:
+        Whether descriptions containing URLs are permitted.
+    denied_patterns:
+        Regular expressions rejecting any matching description.
+    cache_size:
+        Number of recent verdicts kept in an LRU.
+
+    URL detection and every deny pattern are folded into a single
+    precompiled regular expression, and verdicts are cached, so a
+    repeated description is not matched again.
+    """
+
+    def __init__(
+        self,
+        allowed_commands: Iterable[str] | None = None,
+        *,
+        network_access: bool = False,
+        denied_patterns: Iterable[str] = (),
+        cache_size: int = 4096,
+    ) -> None:
+        self.allowed_commands: Optional[frozenset[str]] = (
+            frozenset(c.lower() for c in allowed_commands)
+            if allowed_commands is not None
+            else None
+        )
+        self.network_access = network_access
+        self.denied_patterns: tuple[str, ...] = tuple(denied_patterns)
+        alternatives = [f"(?:{p})" for p in self.denied_patterns]
+        if not network_access:
+            alternatives.append(_URL_RE.pattern)
+        self._matcher: Optional[Pattern[str]] = (
+            re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        )
+        self._cached = lru_cache(maxsize=cache_size)(self._evaluate)
+
+    @classmethod
+    def from_config(cls, config: Any) -> "PolicyEngine":
+        """Build an engine from a :class:`~config.schema.PoliciesConfig`.
+
+        Unset options fall back to :data:`ALLOWED_COMMANDS` and
+        :data:`NETWORK_ACCESS`.
+        """
+        allowed = config.allowed_commands
+        network = config.network_access
+        return cls(
+            allowed if allowed is not None else ALLOWED_COMMANDS,
+            network_access=network if network is not None else NETWORK_ACCESS,
+            denied_patterns=getattr(config, "denied_patterns", None) or (),
+        )
+
+    def _evaluate(self, description: str) -> bool:
+        if self.allowed_commands is not None:
+            words = description.split(None, 1)
+            if words and words[0].lower() not in self.allowed_commands:
+                return False
+        return self._matcher is None or self._matcher.search(description) is None
+
+    def check(self, description: str) -> bool:
+        """Return ``True`` if ``description`` satisfies every rule."""
+        return self._cached(description)
+
+    def check_many(self, descriptions: Iterable[str]) -> List[bool]:
+        """Return the verdict for each of ``descriptions``."""
+        check = self._cached
+        return [check(d) for d in descriptions]
+
+
+_engine: Optional[PolicyEngine] = None
+
+
+def install(engine: PolicyEngine | None) -> None:
+    """Use ``engine`` for :func:`check_policy`.
+
+    Passing ``None`` rebuilds the default engine from the module globals on
+    the next check.
+    """
+    global _engine
+    _engine = engine
+
 
 def check_policy(description: str) -> bool:
     """Validate ``description`` against command and network policies."""
-    return is_command_allowed(description) and is_network_allowed(description)
+    global _engine
+    if _engine is None:
+        _engine = PolicyEngine(ALLOWED_COMMANDS, network_access=NETWORK_ACCESS)
+    return _engine.check(description)
@@ -0,0 +1,179 @@
+"""Asynchronous subprocess runner with streaming output and timeouts."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional
+
+from .tracing import span
+
+# Callback receiving ``(stream, line)`` for every line of output.
+LineCallback = Callable[[str, str], None]
+
+# Bytes read at once when a line exceeds the stream reader limit.
+CHUNK_SIZE = 64 * 1024
+
+
+class OutputBuffer:
+    """Ring buffer retaining the last ``max_bytes`` of line oriented output."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lines: Deque[str] = deque()
+        self._size = 0
+        self.dropped = 0
+
+    def append(self, line: str) -> None:
+        """Add ``line`` and evict the oldest lines beyond the byte budget."""
+        size = len(line.encode()) + 1
+        if size > self.max_bytes:
+            line = line.encode()[-self.max_bytes + 1 :].decode(errors="ignore")
+            size = len(line.encode()) + 1
+        self._lines.append(line)
+        self._size += size
+        while self._size > self.max_bytes and self._lines:
+            old = self._lines.popleft()
+            self._size -= len(old.encode()) + 1
+            self.dropped += 1
+
+    def text(self) -> str:
+        """Return the retained output as a single string."""
+        return "".join(f"{line}\n" for line in self._lines)
+
+
+@dataclass(slots=True)
+class CommandResult:
+    """Outcome of :func:`run_command`.
+
+    Parameters
+    ----------
+    returncode:
+        Exit status of the process, negative if it was killed.
+    stdout:
+        Tail of the standard output retained by the ring buffer.
+    stderr:
+        Tail of the standard error retained by the ring buffer.
+    timed_out:
+        ``"timeout"`` or ``"idle"`` when the process was killed for
+        exceeding the wall-clock or idle limit, otherwise ``None``.
+    """
+
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    timed_out: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and self.timed_out is None
+
+
+def _kill_group(proc: asyncio.subprocess.Process) -> None:
+    """Kill ``proc`` together with every process of its session."""
+    if proc.returncode is not None:
+        return
+    with suppress(ProcessLookupError, PermissionError):
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:  # pragma: no cover - Windows
+            proc.kill()
+
+
+async def run_command(
+    argv: List[str],
+    *,
+    on_line: LineCallback | None = None,
+    timeout: float | None = None,
+    idle_timeout: float | None = None,
+    max_output: int = 64 * 1024,
+    cwd: str | None = None,
+) -> CommandResult:
+    """Run ``argv`` and stream its output line by line.
+
+    Parameters
+    ----------
+    argv:
+        Program and arguments, executed without a shell.
+    on_line:
+        Optional callback invoked with ``("stdout" | "stderr", line)``.
+    timeout:
+        Maximum wall-clock duration in seconds.
+    idle_timeout:
+        Maximum number of seconds without any output.
+    max_output:
+        Number of bytes of each stream retained in the result.
+    cwd:
+        Working directory of the process.
+
+    The process runs in its own session so that the whole process group can
+    be killed on timeout or when the awaiting task is cancelled.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True,
+    )
+    loop = asyncio.get_running_loop()
+    start = last = loop.time()
+    buffers = {"stdout": OutputBuffer(max_output), "stderr": OutputBuffer(max_output)}
+
+    async def pump(stream: asyncio.StreamReader, name: str) -> None:
+        nonlocal last
+        while True:
+            try:
+                raw = await stream.readline()
+            except ValueError:  # line longer than the reader limit
+                raw = await stream.read(CHUNK_SIZE)
+            if not raw:
+                return
+            last = loop.time()
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            buffers[name].append(line)
+            if on_line is not None:
+                on_line(name, line)
+
+    assert proc.stdout is not None and proc.stderr is not None
+
+    async def finish() -> int:
+        await asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"))
+        return await proc.wait()
+
+    with span("subprocess", "io", argv=" ".join(argv)):
+        work = asyncio.ensure_future(finish())
+        timed_out: Optional[str] = None
+        try:
+            while not work.done():
+                now = loop.time()
+                deadlines = {}
+                if timeout is not None:
+                    deadlines["timeout"] = start + timeout - now
+                if idle_timeout is not None:
+                    deadlines["idle"] = last + idle_timeout - now
+                reason = min(deadlines, key=deadlines.__getitem__) if deadlines else None
+                if reason is not None and deadlines[reason] <= 0:
+                    timed_out = reason
+                    _kill_group(proc)
+                    break
+                delay = deadlines[reason] if reason is not None else None
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(asyncio.shield(work), delay)
+            returncode = await work
+        except BaseException:
+            _kill_group(proc)
+            work.cancel()
+            with suppress(BaseException):
+                await work
+            raise
+    return CommandResult(
+        returncode=returncode,
+        stdout=buffers["stdout"].text(),
+        stderr=buffers["stderr"].text(),
+        timed_out=timed_out,
+    )
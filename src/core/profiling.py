@@ -0,0 +1,374 @@
+"""Opt-in CPU, memory and event loop profiling labelled by agent and task.
+
+The profilers are started by the CLI's ``--profile`` option.  Work is
+attributed to the ``(agent, task id)`` of :func:`core.logging.task_context`:
+the manager wraps each task in :func:`task_scope` and callables handed to
+worker threads in :func:`bind`, so reports point at the agent code that
+ran.  While no profiler is active, both only set the logging context.
+
+``cpu``
+    :mod:`cProfile` of the main thread plus one profile per task executed
+    on a worker thread, written as a combined ``cpu.prof`` (readable with
+    :mod:`pstats` or snakeviz) and a ``cpu.txt`` report sorted by
+    cumulative time.
+``memory``
+    :mod:`tracemalloc` snapshots at task boundaries; ``memory.txt`` lists
+    the lines allocating most during each task and at the end of the run.
+``asyncio``
+    Event loop callbacks running longer than a threshold, i.e. stalls of
+    every other coroutine, in ``asyncio.txt``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .logging import _TASK, current_task, task_context
+
+KINDS = ("cpu", "memory", "asyncio")
+
+_profilers: List["Profiler"] = []
+
+
+def label(agent: str, task: Any) -> str:
+    """Return the report section name of ``task`` on ``agent``."""
+    return f"{agent}/task {task}"
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class Profiler:
+    """Base class of the profilers driven by :func:`task_scope`."""
+
+    name = ""
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def enter(self, section: str, nested: bool) -> Any:
+        """Note the start of a task in the current thread; return a token.
+
+        ``nested`` is true on a worker thread continuing a task already
+        entered on the event loop.
+        """
+        return None
+
+    def exit(self, token: Any) -> None:
+        pass
+
+    def report(self) -> str:
+        return ""
+
+    def write(self, directory: Path) -> List[Path]:
+        """Write the reports to ``directory`` and return their paths."""
+        path = directory / f"{self.name}.txt"
+        path.write_text(self.report(), encoding="utf-8")
+        return [path]
+
+
+class CpuProfiler(Profiler):
+    """Deterministic profile, split per task where threads allow it.
+
+    Coroutines of different tasks interleave on the event loop thread, so
+    that thread is reported as a whole.  Synchronous agents run one task
+    at a time per thread and get a profile of their own.
+
+    Parameters
+    ----------
+    top:
+        Functions listed per section of the text report.
+    """
+
+    name = "cpu"
+
+    def __init__(self, top: int = 25) -> None:
+        self.top = top
+        self.main = cProfile.Profile()
+        self.thread: Optional[threading.Thread] = None
+        self.sections: Dict[str, pstats.Stats] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.thread = threading.current_thread()
+        self.main.enable()
+
+    def stop(self) -> None:
+        self.main.disable()
+        self._merge("main thread", self.main)
+
+    def enter(self, section: str, nested: bool) -> Any:
+        if _in_event_loop():
+            return None
+        resume = threading.current_thread() is self.thread
+        if resume:
+            self.main.disable()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread with a single profiler.
+            if resume:
+                self.main.enable()
+            return None
+        return section, profile, resume
+
+    def exit(self, token: Any) -> None:
+        if token is None:
+            return
+        section, profile, resume = token
+        profile.disable()
+        self._merge(section, profile)
+        if resume:
+            self.main.enable()
+
+    def _merge(self, section: str, profile: cProfile.Profile) -> None:
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:  # nothing was recorded
+            return
+        with self._lock:
+            if section in self.sections:
+                self.sections[section].add(stats)
+            else:
+                self.sections[section] = stats
+
+    def report(self) -> str:
+        out = io.StringIO()
+        for section, stats in sorted(self.sections.items()):
+            out.write(f"== {section} ({stats.total_tt:.3f}s) ==\n")
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(self.top)
+        return out.getvalue()
+
+    def write(self, directory: Path) -> List[Path]:
+        paths = super().write(directory)
+        if self.sections:
+            combined = pstats.Stats()
+            combined.add(*self.sections.values())
+            combined.dump_stats(directory / "cpu.prof")
+            paths.append(directory / "cpu.prof")
+        return paths
+
+
+class MemoryProfiler(Profiler):
+    """Allocation growth per task from :mod:`tracemalloc` snapshots.
+
+    Concurrent tasks share the heap, so a task's section also shows what
+    other tasks allocated meanwhile; run with ``-j 1`` or
+    ``scheduling.parallelism: 1`` for exact attribution.
+
+    Parameters
+    ----------
+    top:
+        Source lines listed per task.
+    frames:
+        Traceback depth stored per allocation.
+    """
+
+    name = "memory"
+
+    _ignore = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self, top: int = 10, frames: int = 1) -> None:
+        self.top = top
+        self.frames = frames
+        self.sections: List[Tuple[str, List[tracemalloc.StatisticDiff]]] = []
+        self.origin: Optional[tracemalloc.Snapshot] = None
+        self.peak: Optional[int] = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._ignore)
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        self.origin = self._snapshot()
+
+    def stop(self) -> None:
+        if self.origin is None or not tracemalloc.is_tracing():
+            return
+        diff = self._snapshot().compare_to(self.origin, "lineno")
+        self.peak = tracemalloc.get_traced_memory()[1]
+        with self._lock:
+            self.sections.append(("end of run", diff[: self.top]))
+        if self._started:
+            tracemalloc.stop()
+
+    def enter(self, section: str, nested: bool) -> Any:
+        if nested or not tracemalloc.is_tracing():
+            return None
+        return section, self._snapshot()
+
+    def exit(self, token: Any) -> None:
+        if token is None or not tracemalloc.is_tracing():
+            return
+        section, before = token
+        diff = self._snapshot().compare_to(before, "lineno")
+        with self._lock:
+            self.sections.append((section, diff[: self.top]))
+
+    def report(self) -> str:
+        lines = []
+        if self.peak is not None:
+            lines.append(f"peak traced memory: {self.peak / 1024:.1f} KiB\n")
+        for section, diff in self.sections:
+            growth = sum(stat.size_diff for stat in diff)
+            lines.append(f"== {section} (top {len(diff)}: {growth / 1024:+.1f} KiB) ==")
+            lines.extend(str(stat) for stat in diff)
+            lines.append("")
+        return "\n".join(lines)
+
+
+class AsyncioProfiler(Profiler):
+    """Record event loop callbacks running longer than ``threshold`` seconds.
+
+    Unlike ``loop.slow_callback_duration`` in asyncio debug mode, stalls
+    are reported with the agent and task whose context the callback ran
+    in, and without debug mode's overhead on every call.
+    """
+
+    name = "asyncio"
+
+    def __init__(self, threshold: float = 0.1) -> None:
+        self.threshold = threshold
+        self.stalls: List[Tuple[float, str, str]] = []
+        self._original: Optional[Callable[..., Any]] = None
+
+    def start(self) -> None:
+        original = self._original = asyncio.events.Handle._run
+        record = self._record
+
+        def _run(handle: asyncio.events.Handle) -> None:
+            start = time.perf_counter()
+            try:
+                original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                if elapsed >= self.threshold:
+                    record(handle, elapsed)
+
+        asyncio.events.Handle._run = _run  # type: ignore[method-assign]
+
+    def stop(self) -> None:
+        if self._original is not None:
+            asyncio.events.Handle._run = self._original  # type: ignore[method-assign]
+            self._original = None
+
+    def _record(self, handle: asyncio.events.Handle, elapsed: float) -> None:
+        context = getattr(handle, "_context", None)
+        current = context.get(_TASK) if context is not None else None
+        where = label(*current) if current is not None else "-"
+        self.stalls.append((elapsed, where, _describe(handle)))
+
+    def report(self) -> str:
+        stalls = sorted(self.stalls, reverse=True)
+        lines = [f"{len(stalls)} callbacks blocked the loop >= {self.threshold:.3f}s"]
+        totals: Dict[str, float] = {}
+        for elapsed, where, _ in stalls:
+            totals[where] = totals.get(where, 0.0) + elapsed
+        for where, total in sorted(totals.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {total:8.3f}s  {where}")
+        lines.append("")
+        lines.extend(f"{elapsed:8.3f}s  {where}  {what}" for elapsed, where, what in stalls)
+        return "\n".join(lines) + "\n"
+
+
+def _describe(handle: asyncio.events.Handle) -> str:
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", repr(coro))
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def create(kind: str, *, slow_callback: float = 0.1) -> Profiler:
+    """Return a profiler for ``kind``, one of :data:`KINDS`."""
+    if kind == "cpu":
+        return CpuProfiler()
+    if kind == "memory":
+        return MemoryProfiler()
+    if kind == "asyncio":
+        return AsyncioProfiler(slow_callback)
+    raise ValueError(f"Unknown profile kind: {kind}")
+
+
+def start(kinds: Sequence[str], *, slow_callback: float = 0.1) -> List[Profiler]:
+    """Start profilers of ``kinds`` for the rest of the process."""
+    profilers = [create(kind, slow_callback=slow_callback) for kind in dict.fromkeys(kinds)]
+    for profiler in profilers:
+        profiler.start()
+        _profilers.append(profiler)
+    return profilers
+
+
+def stop(directory: Path | None = None) -> List[Path]:
+    """Stop every profiler and write its reports to ``directory``."""
+    profilers = list(_profilers)
+    _profilers.clear()
+    for profiler in reversed(profilers):
+        profiler.stop()
+    if directory is None:
+        return []
+    directory.mkdir(parents=True, exist_ok=True)
+    return [path for profiler in profilers for path in profiler.write(directory)]
+
+
+@contextmanager
+def task_scope(agent: str, task: Any) -> Iterator[None]:
+    """Attribute the enclosed work to ``task`` on ``agent``."""
+    with task_context(agent, task), _entered(label(agent, task), nested=False):
+        yield
+
+
+@contextmanager
+def _entered(name: str, nested: bool) -> Iterator[None]:
+    profilers = list(_profilers)
+    tokens = [p.enter(name, nested) for p in profilers]
+    try:
+        yield
+    finally:
+        for profiler, token in zip(reversed(profilers), reversed(tokens)):
+            profiler.exit(token)
+
+
+def bind(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Return ``func`` bound to the current task for a worker thread."""
+    context = contextvars.copy_context()
+    current = current_task()
+    if current is None or not _profilers:
+        return functools.partial(context.run, func)
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with _entered(label(*current), nested=True):
+            return func(*args, **kwargs)
+
+    return functools.partial(context.run, run)
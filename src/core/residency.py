@@ -0,0 +1,172 @@
+"""Track which Ollama models are loaded and keep them warm.
+
+Ollama loads a model on its first request and evicts it after the
+``keep_alive`` period or when another model needs the memory.  On a host
+that fits only a few models, round-robin dispatch across agents using
+different models reloads them over and over.  :class:`ModelResidency`
+warms the configured models at startup, passes keep-alive hints, tracks
+the models presumably resident on each host and counts reloads.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import requests
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+KeepAlive = Union[int, str, None]
+
+DEFAULT_HOST = "http://localhost:11434"
+
+MODEL_LOADS = REGISTRY.counter(
+    "agents_model_loads", "Model loads seen by the residency tracker", ("model", "kind")
+)
+
+
+def model_key(llm: Any) -> Tuple[str, str]:
+    """Return ``(host, model)`` identifying the model served for ``llm``."""
+    host = getattr(llm, "base_url", None) or os.getenv("OLLAMA_HOST") or DEFAULT_HOST
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/"), str(getattr(llm, "model", llm))
+
+
+class ModelResidency:
+    """Residency tracker and warm-up helper for Ollama hosts.
+
+    Parameters
+    ----------
+    keep_alive:
+        Keep-alive hint sent with warm-up requests, e.g. ``"30m"`` or ``-1``.
+    max_loaded:
+        Number of models a host is assumed to keep loaded at once.
+    timeout:
+        Seconds allowed for a single warm-up request.
+    """
+
+    def __init__(
+        self, *, keep_alive: KeepAlive = None, max_loaded: int = 1, timeout: float = 300.0
+    ) -> None:
+        self.keep_alive = keep_alive
+        self.max_loaded = max(1, max_loaded)
+        self.timeout = timeout
+        self.models: List[Tuple[str, str]] = []
+        # host -> models in least recently used order
+        self._resident: Dict[str, "OrderedDict[str, None]"] = {}
+        self.loads = 0
+        self.reloads = 0
+        self._seen: set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def register(self, llms: Iterable[Any]) -> None:
+        """Add the models used by ``llms`` to the set managed here.
+
+        Clients routed over several endpoints register every endpoint.
+        """
+        for llm in llms:
+            for client in getattr(llm, "clients", None) or [llm]:
+                key = model_key(client)
+                if key not in self.models:
+                    self.models.append(key)
+
+    def note(self, llm: Any) -> bool:
+        """Record that ``llm`` is about to be used.
+
+        Returns ``True`` if the model was presumably not resident and will
+        be (re)loaded by the host.
+        """
+        host, model = key = model_key(llm)
+        with self._lock:
+            resident = self._resident.setdefault(host, OrderedDict())
+            if model in resident:
+                resident.move_to_end(model)
+                return False
+            resident[model] = None
+            while len(resident) > self.max_loaded:
+                resident.popitem(last=False)
+            self.loads += 1
+            reload = key in self._seen
+            self._seen.add(key)
+            if reload:
+                self.reloads += 1
+        MODEL_LOADS.labels(model=model, kind="reload" if reload else "initial").inc()
+        return True
+
+    def resident(self, host: str) -> List[str]:
+        """Return the models presumed loaded on ``host``, most recent last."""
+        return list(self._resident.get(host.rstrip("/"), ()))
+
+    # ------------------------------------------------------------------
+    def _warm(self, key: Tuple[str, str]) -> Optional[float]:
+        host, model = key
+        body: Dict[str, Any] = {"model": model, "prompt": "", "stream": False}
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
+        start = perf_counter()
+        try:
+            response = requests.post(f"{host}/api/generate", json=body, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            logger.warning("warm-up of %s on %s failed: %s", model, host, exc)
+            return None
+        return perf_counter() - start
+
+    def warm_up(self, models: Sequence[Tuple[str, str]] | None = None) -> Dict[str, float]:
+        """Load ``models`` (default: all registered) in parallel.
+
+        Returns the seconds each successful warm-up took, keyed by
+        ``"host/model"``.  At most :attr:`max_loaded` models per host are
+        warmed since more would only evict each other.
+        """
+        keys = list(models if models is not None else self.models)
+        per_host: Dict[str, int] = {}
+        selected = []
+        for host, model in keys:
+            if per_host.get(host, 0) < self.max_loaded:
+                per_host[host] = per_host.get(host, 0) + 1
+                selected.append((host, model))
+        timings: Dict[str, float] = {}
+        if not selected:
+            return timings
+        with ThreadPoolExecutor(max_workers=len(selected), thread_name_prefix="warm-up") as pool:
+            for key, seconds in zip(selected, pool.map(self._warm, selected)):
+                if seconds is not None:
+                    timings[f"{key[0]}/{key[1]}"] = seconds
+                    host, model = key
+                    self._resident.setdefault(host, OrderedDict())[model] = None
+                    self._seen.add(key)
+        return timings
+
+    def order(self, llms: Sequence[Any]) -> List[int]:
+        """Return indices of ``llms`` grouped by model to minimise reloads.
+
+        Groups keep their first-appearance order except that models already
+        resident on their host come first; the order inside a group is
+        preserved.
+        """
+        keys = [model_key(llm) for llm in llms]
+        first: Dict[Tuple[str, str], int] = {}
+        for idx, key in enumerate(keys):
+            first.setdefault(key, idx)
+
+        def rank(idx: int) -> Tuple[int, int, int]:
+            key = keys[idx]
+            warm = key[1] in self._resident.get(key[0], ())
+            return (0 if warm else 1, first[key], idx)
+
+        return sorted(range(len(keys)), key=rank)
+
+    def report(self) -> Dict[str, int]:
+        """Return load and reload counts."""
+        return {"loads": self.loads, "reloads": self.reloads}
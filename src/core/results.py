@@ -0,0 +1,64 @@
+"""Cache of command results keyed on the command and the source tree."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+
+
+def result_key(command: str, tree_hash: str) -> str:
+    """Return the cache key for ``command`` run against ``tree_hash``."""
+    return hashlib.sha256(f"{command}\0{tree_hash}".encode()).hexdigest()
+
+
+class ResultCache:
+    """Small LRU of ``(status, output)`` pairs persisted as JSON.
+
+    Parameters
+    ----------
+    path:
+        Optional file the cache is loaded from and saved to.
+    max_entries:
+        Number of results kept; the least recently used are evicted.
+    """
+
+    def __init__(self, path: str | Path | None = None, *, max_entries: int = 32) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                raw = {}
+            for key, value in raw.items():
+                self._entries[key] = (value[0], value[1])
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """Return the cached ``(status, output)`` for ``key`` if present."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels(cache="results", result="miss").inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        CACHE_REQUESTS.labels(cache="results", result="hit").inc()
+        return entry
+
+    def put(self, key: str, status: str, output: str) -> None:
+        """Store a result and persist the cache."""
+        self._entries[key] = (status, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps({k: list(v) for k, v in self._entries.items()}))
@@ -0,0 +1,456 @@
+"""Load balancing, hedging and failover across several Ollama servers.
+
+:class:`EndpointPool` sends each request to the healthy endpoint with the
+fewest outstanding requests relative to its weight.  When a request takes
+longer than the configured percentile of recent latencies, a hedged
+duplicate is sent to a second endpoint; the first answer wins and the
+other request is cancelled.  A failed request fails over to another
+endpoint, and an endpoint failing ``failure_threshold`` times in a row is
+ejected for ``cooldown`` seconds before a single probe request may close
+its circuit again.
+
+:class:`RoutedLLM` exposes a pool as a LangChain LLM, so agents use it
+exactly like :class:`langchain_ollama.OllamaLLM`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Collection,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from .metrics import REGISTRY
+
+HEDGES = REGISTRY.counter(
+    "agents_llm_hedges", "Hedged model requests by the endpoint that answered first", ("winner",)
+)
+CIRCUIT_OPEN = REGISTRY.gauge(
+    "agents_llm_endpoint_open", "1 while an endpoint is ejected by its circuit breaker", ("host",)
+)
+
+
+class NoHealthyEndpoint(RuntimeError):
+    """Raised when every endpoint of a pool is ejected."""
+
+
+class Endpoint:
+    """One model server with its load and health statistics."""
+
+    def __init__(self, client: Any, weight: float = 1.0) -> None:
+        if weight <= 0:
+            raise ValueError(f"Endpoint weight must be positive: {weight}")
+        self.client = client
+        self.url = str(getattr(client, "base_url", None) or "")
+        self.weight = weight
+        self.outstanding = 0
+        self.served = 0
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half-open"`` (probe in flight)."""
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+
+class EndpointPool:
+    """Endpoints serving the same model.
+
+    Parameters
+    ----------
+    endpoints:
+        ``(client, weight)`` pairs; each client provides ``invoke``,
+        ``ainvoke``, ``stream`` and ``astream`` like ``OllamaLLM``.
+    hedge_percentile:
+        Percentile (0-100) of recent latencies after which a hedged
+        request is sent.  ``None`` disables hedging.
+    min_samples:
+        Latencies needed before hedging starts.
+    window:
+        Number of recent latencies kept.
+    failure_threshold:
+        Consecutive failures that eject an endpoint.
+    cooldown:
+        Seconds an ejected endpoint waits before a probe request.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Tuple[Any, float]],
+        *,
+        hedge_percentile: float | None = 95.0,
+        min_samples: int = 20,
+        window: int = 200,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = [Endpoint(client, weight) for client, weight in endpoints]
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        for ep in self.endpoints:
+            CIRCUIT_OPEN.labels(host=ep.url).set_function(
+                lambda ep=ep: 0 if ep.opened_at is None else 1
+            )
+
+    # ------------------------------------------------------------------
+    def _pick(self, exclude: Collection[Endpoint] = ()) -> Endpoint | None:
+        """Reserve the least loaded available endpoint not in ``exclude``."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                ep
+                for ep in self.endpoints
+                if ep not in exclude
+                and (
+                    ep.opened_at is None
+                    or (not ep.probing and now - ep.opened_at >= self.cooldown)
+                )
+            ]
+            if not candidates:
+                return None
+            ep = min(
+                candidates,
+                key=lambda e: (e.outstanding / e.weight, e.served / e.weight),
+            )
+            ep.outstanding += 1
+            ep.served += 1
+            if ep.opened_at is not None:
+                ep.probing = True
+            return ep
+
+    def _finish(self, ep: Endpoint, latency: float | None, error: bool) -> None:
+        """Release ``ep``; ``latency`` is ``None`` for cancelled requests."""
+        with self._lock:
+            ep.outstanding -= 1
+            probe, ep.probing = ep.probing, False
+            if error:
+                ep.failures += 1
+                if probe or ep.failures >= self.failure_threshold:
+                    ep.opened_at = time.monotonic()
+            elif latency is not None:
+                ep.failures = 0
+                ep.opened_at = None
+                self.latencies.append(latency)
+
+    def hedge_delay(self) -> float | None:
+        """Return the seconds after which a request is hedged, if enabled."""
+        if self.hedge_percentile is None or len(self.endpoints) < 2:
+            return None
+        samples = sorted(self.latencies)
+        if len(samples) < self.min_samples:
+            return None
+        rank = math.ceil(self.hedge_percentile / 100 * len(samples))
+        return samples[min(max(rank, 1), len(samples)) - 1]
+
+    def _first(self) -> Endpoint:
+        ep = self._pick()
+        if ep is None:
+            raise NoHealthyEndpoint(
+                "all endpoints ejected: " + ", ".join(e.url for e in self.endpoints)
+            )
+        return ep
+
+    # -- synchronous requests -----------------------------------------
+    def _attempt(self, ep: Endpoint, call: Callable[[Any], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = call(ep.client)
+        except Exception:
+            self._finish(ep, None, True)
+            raise
+        self._finish(ep, time.perf_counter() - start, False)
+        return result
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=4 * len(self.endpoints), thread_name_prefix="llm-hedge"
+                    )
+        return self._executor
+
+    def call(self, call: Callable[[Any], Any]) -> Any:
+        """Return ``call(client)`` from the first endpoint to answer.
+
+        Threads cannot be interrupted, so a losing request keeps running
+        in the background and only its result is discarded.
+        """
+        tried = [self._first()]
+        delay = self.hedge_delay()
+        if delay is None:
+            # No hedging: run inline and fail over sequentially.
+            while True:
+                try:
+                    return self._attempt(tried[-1], call)
+                except Exception:
+                    ep = self._pick(tried)
+                    if ep is None:
+                        raise
+                    tried.append(ep)
+
+        primary = tried[0]
+        futures = {self._pool().submit(self._attempt, primary, call): primary}
+        done, pending = wait(futures, timeout=delay)
+        hedged = False
+        if not done:
+            ep = self._pick(tried)
+            if ep is not None:
+                tried.append(ep)
+                hedge = self._pool().submit(self._attempt, ep, call)
+                futures[hedge] = ep
+                pending.add(hedge)
+                hedged = True
+        error: BaseException | None = None
+        while True:
+            for fut in done:
+                if fut.exception() is None:
+                    for loser in pending:
+                        if loser.cancel():
+                            self._finish(futures[loser], None, False)
+                    if hedged:
+                        _count_hedge(futures[fut] is primary)
+                    return fut.result()
+                error = fut.exception()
+            if not pending:
+                ep = self._pick(tried)
+                if ep is None:
+                    assert error is not None
+                    raise error
+                tried.append(ep)
+                retry = self._pool().submit(self._attempt, ep, call)
+                futures[retry] = ep
+                pending.add(retry)
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def stream(self, call: Callable[[Any], Iterator[Any]]) -> Iterator[Any]:
+        """Yield the chunks of ``call(client)``.
+
+        Streams are not hedged; a request failing before its first chunk
+        fails over to another endpoint.
+        """
+        tried: List[Endpoint] = []
+        ep: Endpoint | None = self._first()
+        while ep is not None:
+            tried.append(ep)
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in call(ep.client):
+                    started = True
+                    yield chunk
+            except Exception:
+                self._finish(ep, None, True)
+                ep = None if started else self._pick(tried)
+                if ep is None:
+                    raise
+                continue
+            except BaseException:
+                self._finish(ep, None, False)
+                raise
+            self._finish(ep, time.perf_counter() - start, False)
+            return
+
+    # -- asynchronous requests ----------------------------------------
+    async def _aattempt(self, ep: Endpoint, call: Callable[[Any], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await call(ep.client)
+        except asyncio.CancelledError:
+            raise  # released by the callback added in _spawn
+        except Exception:
+            self._finish(ep, None, True)
+            raise
+        self._finish(ep, time.perf_counter() - start, False)
+        return result
+
+    def _spawn(self, ep: Endpoint, call: Callable[[Any], Any]) -> "asyncio.Task[Any]":
+        task = asyncio.ensure_future(self._aattempt(ep, call))
+
+        def release(task: "asyncio.Task[Any]") -> None:
+            # Also covers tasks cancelled before they started running.
+            if task.cancelled():
+                self._finish(ep, None, False)
+
+        task.add_done_callback(release)
+        return task
+
+    async def acall(self, call: Callable[[Any], Any]) -> Any:
+        """Asynchronous :meth:`call`; the losing request is cancelled."""
+        primary = self._first()
+        tried = [primary]
+        tasks = {self._spawn(primary, call): primary}
+        delay = self.hedge_delay()
+        pending = set(tasks)
+        done: set[asyncio.Future[Any]] = set()
+        hedged = False
+        if delay is not None:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                ep = self._pick(tried)
+                if ep is not None:
+                    tried.append(ep)
+                    task = self._spawn(ep, call)
+                    tasks[task] = ep
+                    pending.add(task)
+                    hedged = True
+        error: BaseException | None = None
+        try:
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if hedged:
+                            _count_hedge(tasks[task] is primary)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    ep = self._pick(tried)
+                    if ep is None:
+                        assert error is not None
+                        raise error
+                    tried.append(ep)
+                    task = self._spawn(ep, call)
+                    tasks[task] = ep
+                    pending.add(task)
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, call: Callable[[Any], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Asynchronous :meth:`stream`."""
+        tried: List[Endpoint] = []
+        ep: Endpoint | None = self._first()
+        while ep is not None:
+            tried.append(ep)
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in call(ep.client):
+                    started = True
+                    yield chunk
+            except Exception:
+                self._finish(ep, None, True)
+                ep = None if started else self._pick(tried)
+                if ep is None:
+                    raise
+                continue
+            except BaseException:
+                self._finish(ep, None, False)
+                raise
+            self._finish(ep, time.perf_counter() - start, False)
+            return
+
+    def snapshot(self) -> List[dict[str, Any]]:
+        """Return the state of every endpoint."""
+        return [
+            {
+                "url": ep.url,
+                "weight": ep.weight,
+                "outstanding": ep.outstanding,
+                "served": ep.served,
+                "state": ep.state,
+            }
+            for ep in self.endpoints
+        ]
+
+
+def _count_hedge(primary_won: bool) -> None:
+    HEDGES.labels(winner="primary" if primary_won else "hedge").inc()
+
+
+class RoutedLLM(LLM):
+    """LangChain LLM sending requests through an :class:`EndpointPool`."""
+
+    pool: Any
+    model: str = ""
+    base_url: Optional[str] = None
+
+    @classmethod
+    def from_clients(cls, endpoints: Sequence[Tuple[Any, float]], **options: Any) -> "RoutedLLM":
+        """Build an LLM over ``(client, weight)`` pairs."""
+        pool = EndpointPool(endpoints, **options)
+        first = pool.endpoints[0].client
+        return cls(pool=pool, model=str(getattr(first, "model", "")), base_url=pool.endpoints[0].url)
+
+    @property
+    def clients(self) -> List[Any]:
+        """Clients of every endpoint, e.g. for warm-up."""
+        return [ep.client for ep in self.pool.endpoints]
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-ollama"
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        return self.pool.call(lambda client: client.invoke(prompt, stop=stop, **kwargs))
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        return await self.pool.acall(lambda client: client.ainvoke(prompt, stop=stop, **kwargs))
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        for text in self.pool.stream(lambda client: client.stream(prompt, stop=stop, **kwargs)):
+            if run_manager is not None:
+                run_manager.on_llm_new_token(text)
+            yield GenerationChunk(text=text)
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[GenerationChunk]:
+        async for text in self.pool.astream(
+            lambda client: client.astream(prompt, stop=stop, **kwargs)
+        ):
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(text)
+            yield GenerationChunk(text=text)
@@ -0,0 +1,197 @@
+"""Priority scheduling of tasks with deadlines and cancellation.
+
+:class:`TaskScheduler` starts pending tasks highest priority first (ties
+go to the earliest deadline, then to the order they were added) as soon
+as a slot and the task's resource are free, so an urgent task only waits
+for the work already occupying its agent.  Tasks whose deadline passes
+are cancelled, whether still queued or running; cancelling a running
+task cancels its coroutine, which in turn kills any subprocess it
+awaits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .task import Task, TaskStatus
+
+Execute = Callable[[Task], Awaitable[Any]]
+
+
+class TaskScheduler:
+    """Run :class:`Task` objects through ``execute`` by priority.
+
+    Parameters
+    ----------
+    execute:
+        Coroutine function running one task and returning its result.
+    parallelism:
+        Maximum number of tasks running at once.
+    resource:
+        Returns the resource a task needs, e.g. its agent type.  By default
+        tasks are independent.
+    capacity:
+        Number of tasks that may use a resource at once; 1 by default.
+    on_change:
+        Called with the task after every status change.
+    partial:
+        Called with a cancelled task to obtain the partial result recorded
+        on it, if any.
+    """
+
+    def __init__(
+        self,
+        execute: Execute,
+        *,
+        parallelism: int = 1,
+        resource: Callable[[Task], Hashable] | None = None,
+        capacity: Callable[[Hashable], int] | None = None,
+        on_change: Callable[[Task], None] | None = None,
+        partial: Callable[[Task], Optional[str]] | None = None,
+    ) -> None:
+        self.execute = execute
+        self.parallelism = max(1, parallelism)
+        self.resource = resource or id
+        self.capacity = capacity or (lambda resource: 1)
+        self.on_change = on_change
+        self.partial = partial
+        self._heap: List[Tuple[int, float, int, Task]] = []
+        self._seq = itertools.count()
+        self._running: Dict["asyncio.Task[Any]", Task] = {}
+        self._cancel: Dict[int, str] = {}
+        self._wakeup = asyncio.Event()
+
+    # ------------------------------------------------------------------
+    def add(self, task: Task) -> None:
+        """Queue ``task`` for execution."""
+        deadline = task.deadline if task.deadline is not None else math.inf
+        heapq.heappush(self._heap, (-task.priority, deadline, next(self._seq), task))
+        self._wakeup.set()
+
+    def reprioritize(self, task_id: int, priority: int) -> bool:
+        """Change the priority of pending task ``task_id``."""
+        for entry in self._heap:
+            task = entry[-1]
+            if task.id == task_id and task.status is TaskStatus.PENDING:
+                task.priority = priority
+                # Stale heap entries are skipped by ``_next``.
+                self.add(task)
+                return True
+        return False
+
+    def cancel(self, task_id: int | None = None, reason: str = "cancelled") -> None:
+        """Cancel task ``task_id``, or every unfinished task when ``None``."""
+        tasks = [e[-1] for e in self._heap] + list(self._running.values())
+        for task in tasks:
+            if task_id is None or task.id == task_id:
+                self._cancel.setdefault(task.id, reason)
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    def _finish(self, task: Task, status: TaskStatus, result: Optional[str]) -> None:
+        task.status = status
+        task.result = result
+        if self.on_change is not None:
+            self.on_change(task)
+
+    def _cancelled(self, task: Task, reason: str) -> None:
+        partial = self.partial(task) if self.partial is not None else None
+        result = f"cancelled: {reason}"
+        if partial:
+            result += f"\n{partial}"
+        self._finish(task, TaskStatus.CANCELLED, result)
+
+    def _next(self) -> Task | None:
+        """Pop the most urgent runnable task, skipping busy resources."""
+        busy = Counter(self.resource(t) for t in self._running.values())
+        blocked = []
+        found = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            task = entry[-1]
+            if task.status is not TaskStatus.PENDING or -entry[0] != task.priority:
+                continue  # finished or superseded by reprioritize
+            resource = self.resource(task)
+            if busy[resource] >= self.capacity(resource):
+                blocked.append(entry)
+                continue
+            found = task
+            break
+        for entry in blocked:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def _expire(self, now: float) -> float:
+        """Apply cancellations and deadlines; return the next deadline."""
+        nearest = math.inf
+        for task in [e[-1] for e in self._heap if e[-1].status is TaskStatus.PENDING]:
+            reason = self._cancel.get(task.id)
+            if reason is None and task.deadline is not None and task.deadline <= now:
+                reason = "deadline exceeded"
+            if reason is not None:
+                self._cancelled(task, reason)
+            elif task.deadline is not None:
+                nearest = min(nearest, task.deadline)
+        for fut, task in self._running.items():
+            if fut.done():
+                continue
+            reason = self._cancel.get(task.id)
+            if reason is None and task.deadline is not None and task.deadline <= now:
+                reason = self._cancel[task.id] = "deadline exceeded"
+            if reason is not None:
+                fut.cancel()
+            elif task.deadline is not None:
+                nearest = min(nearest, task.deadline)
+        return nearest
+
+    def _collect(self, fut: "asyncio.Task[Any]") -> None:
+        task = self._running.pop(fut)
+        if fut.cancelled():
+            self._cancelled(task, self._cancel.get(task.id, "cancelled"))
+        elif fut.exception() is not None:
+            exc = fut.exception()
+            self._finish(task, TaskStatus.FAILED, f"{type(exc).__name__}: {exc}")
+        else:
+            response = fut.result()
+            self._finish(
+                task, TaskStatus.DONE, response if isinstance(response, str) else str(response)
+            )
+
+    async def run(self) -> None:
+        """Execute queued tasks until none is pending or running."""
+        try:
+            while True:
+                nearest = self._expire(time.time())
+                while len(self._running) < self.parallelism:
+                    task = self._next()
+                    if task is None:
+                        break
+                    task.status = TaskStatus.IN_PROGRESS
+                    if self.on_change is not None:
+                        self.on_change(task)
+                    self._running[asyncio.ensure_future(self.execute(task))] = task
+                if not self._running:
+                    return
+                self._wakeup.clear()
+                waker = asyncio.ensure_future(self._wakeup.wait())
+                timeout = None if nearest == math.inf else max(0.0, nearest - time.time())
+                done, _ = await asyncio.wait(
+                    [waker, *self._running], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                waker.cancel()
+                for fut in done:
+                    if fut is not waker:
+                        self._collect(fut)
+        finally:
+            for fut in list(self._running):
+                fut.cancel()
+            if self._running:
+                await asyncio.wait(list(self._running))
+            for fut in list(self._running):
+                self._collect(fut)
@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
 
 from agents.message import Message
 
+from .metrics import STORAGE_SECONDS
 from .task import Task, TaskStatus
+from .tracing import traced
+
+if TYPE_CHECKING:  # pragma: no cover - circular at runtime
+    from .history import MessageHistory
 
 
 def task_to_dict(task: Task) -> Dict[str, Any]:
@@ -18,6 +24,8 @@ def task_to_dict(task: Task) -> Dict[str, Any]:
         "description": task.description,
         "status": task.status.value,
         "result": task.result,
+        "priority": task.priority,
+        "deadline": task.deadline,
     }
 
 
@@ -28,22 +36,47 @@ def task_from_dict(data: Dict[str, Any]) -> Task:
         description=data["description"],
         status=TaskStatus(data["status"]),
         result=data.get("result"),
+        priority=data.get("priority", 0),
+        deadline=data.get("deadline"),
     )
 
 
 class Storage:
-    """Simple JSON based storage for tasks and agent communication."""
+    """Simple JSON based storage for tasks and agent communication.
+
+    Message history evicted from a :class:`core.history.MessageHistory`
+    window is appended to a JSON-lines file next to :attr:`path`, which is
+    started afresh by the first history written through this instance.
+    """
 
     def __init__(self, path: str | Path) -> None:
         self.path = Path(path)
+        self.history_path = self.path.with_suffix(".history.jsonl")
+        self._history_lock = threading.Lock()
+        self._history_started = False
+
+    def _start_history(self) -> None:
+        if not self._history_started:
+            self.history_path.write_text("", encoding="utf-8")
+            self._history_started = True
+
+    @traced("Storage.append_history", "io")
+    def append_history(self, records: List[Dict[str, Any]]) -> None:
+        """Append serialised message records evicted from memory."""
+        lines = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with self._history_lock, STORAGE_SECONDS.labels(op="append").time():
+            self._start_history()
+            with self.history_path.open("a", encoding="utf-8") as fh:
+                fh.write(lines)
 
     # ------------------------------------------------------------------
+    @traced("Storage.save", "io")
     def save(
         self,
         tasks: List[Task],
         agent_states: Dict[str, Dict[str, Any]] | None = None,
-        decisions: List[str] | None = None,
-        messages: List[Message] | None = None,
+        decisions: Sequence[str] | None = None,
+        messages: List[Message] | MessageHistory | None = None,
     ) -> None:
         """Persist framework state to disk.
 
@@ -56,7 +89,9 @@ class Storage:
         decisions:
             Decisions exchanged between supervisor and manager.
         messages:
-            Messages exchanged between supervisor and manager.
+            Messages exchanged between supervisor and manager.  The records
+            of a :class:`~core.history.MessageHistory` are stored as they
+            are, its spilled records stay in :attr:`history_path`.
         """
 
         def message_to_dict(message: Message) -> Dict[str, Any]:
@@ -70,15 +105,23 @@ class Storage:
                 "metadata": metadata,
             }
 
-        data = {
+        data: Dict[str, Any] = {
             "tasks": [task_to_dict(t) for t in tasks],
             "agents": agent_states or {},
-            "decisions": decisions or [],
-            "messages": [message_to_dict(m) for m in messages or []],
+            "decisions": list(decisions or ()),
         }
-        self.path.write_text(json.dumps(data, indent=2))
+        records = getattr(messages, "records", None)
+        if callable(records):
+            with self._history_lock:
+                self._start_history()
+            data["history"] = records()
+        else:
+            data["messages"] = [message_to_dict(m) for m in messages or []]
+        with STORAGE_SECONDS.labels(op="save").time():
+            self.path.write_text(json.dumps(data, indent=2))
 
     # ------------------------------------------------------------------
+    @traced("Storage.load", "io")
     def load(
         self,
         ) -> Tuple[
@@ -102,9 +145,21 @@ class Storage:
 
         if not self.path.exists():
             return [], {}, [], []
-        raw = json.loads(self.path.read_text())
+        with STORAGE_SECONDS.labels(op="load").time():
+            raw = json.loads(self.path.read_text())
         tasks = [task_from_dict(t) for t in raw.get("tasks", [])]
         agents = raw.get("agents", {})
         decisions = raw.get("decisions", [])
-        messages = [message_from_dict(m) for m in raw.get("messages", [])]
+        if "history" in raw:
+            from .history import messages_from_records
+
+            spilled: List[Dict[str, Any]] = []
+            if self.history_path.exists():
+                with self.history_path.open(encoding="utf-8") as fh:
+                    spilled = [json.loads(line) for line in fh if line.strip()]
+            # A record evicted while saving can be in both files.
+            by_seq = {r["seq"]: r for r in spilled + raw["history"]}
+            messages = messages_from_records(by_seq[k] for k in sorted(by_seq))
+        else:
+            messages = [message_from_dict(m) for m in raw.get("messages", [])]
         return tasks, agents, decisions, messages
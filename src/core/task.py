@@ -8,6 +8,7 @@ class TaskStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     DONE = "done"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 @dataclass(slots=True)
@@ -24,8 +25,14 @@ class Task:
         Current processing state of the task.
     result:
         Optional result produced after execution.
+    priority:
+        Tasks with higher values are started first.
+    deadline:
+        Optional UNIX timestamp after which the task is cancelled.
     """
     id: int
     description: str
     status: TaskStatus = TaskStatus.PENDING
     result: Optional[str] = None
+    priority: int = 0
+    deadline: Optional[float] = None
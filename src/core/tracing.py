@@ -0,0 +1,170 @@
+"""Lightweight span tracing with Chrome/Perfetto trace export.
+
+Spans record monotonic start times and durations into a bounded in-memory
+ring buffer.  Tracing is disabled by default; while disabled,
+:func:`span` returns a shared no-op context manager and :func:`traced`
+wrappers only test a boolean before calling through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NULL: ContextManager[None] = nullcontext()
+
+
+def _track_id() -> int:
+    """Return an identifier for the current asyncio task or thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.tracer.record(self.name, self.start, time.perf_counter_ns(), self.cat, self.args)
+
+
+class Tracer:
+    """Collects completed spans in a ring buffer.
+
+    Parameters
+    ----------
+    capacity:
+        Maximum number of spans retained; older spans are dropped.
+    """
+
+    def __init__(self, capacity: int = 100_000) -> None:
+        self.enabled = False
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, capacity: int | None = None) -> None:
+        """Start recording spans, optionally resizing the buffer."""
+        if capacity is not None:
+            self.events = deque(self.events, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def span(self, name: str, cat: str = "orchestrator", **args: Any) -> ContextManager[Any]:
+        """Return a context manager timing ``name``."""
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name, cat, args)
+
+    def record(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        cat: str = "orchestrator",
+        args: Dict[str, Any] | None = None,
+    ) -> None:
+        """Record a completed span measured with :func:`time.perf_counter_ns`."""
+        if not self.enabled:
+            return
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start_ns - self._origin) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": _track_id(),
+                "args": args or {},
+            }
+        )
+
+    def spans(self, name: str | None = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over recorded spans, optionally filtered by ``name``."""
+        return (e for e in list(self.events) if name is None or e["name"] == name)
+
+    def export(self, path: str | Path) -> None:
+        """Write the recorded spans as a Chrome trace event JSON file."""
+        events: List[Dict[str, Any]] = list(self.events)
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+#: Process wide tracer used by the instrumented components.
+TRACER = Tracer()
+
+
+def span(name: str, cat: str = "orchestrator", **args: Any) -> ContextManager[Any]:
+    """Time a block with the global :data:`TRACER`."""
+    if not TRACER.enabled:
+        return _NULL
+    return _Span(TRACER, name, cat, args)
+
+
+def traced(name: Optional[str] = None, cat: str = "agent") -> Callable[[F], F]:
+    """Decorate a function or coroutine function to run inside a span.
+
+    ``name`` defaults to the function's qualified name; for methods the
+    concrete class name of ``self`` is used instead so subclasses are
+    distinguished.
+    """
+
+    def decorate(func: F) -> F:
+        label = name or func.__qualname__
+        method = name is None and "." in func.__qualname__
+        short = func.__name__
+
+        def span_name(args: tuple[Any, ...]) -> str:
+            if method and args:
+                return f"{type(args[0]).__name__}.{short}"
+            return label
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not TRACER.enabled:
+                    return await func(*args, **kwargs)
+                with _Span(TRACER, span_name(args), cat, {}):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with _Span(TRACER, span_name(args), cat, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -26,3 +26,8 @@ def display_progress(tasks: Iterable[Task]) -> None:
     """
     for task in tasks:
         print(f"{task.id}. {task.description} - {task.status.name}")
+
+
+def display_output(stream: str, line: str) -> None:
+    """Display one ``line`` of command output streamed by an agent."""
+    print(f"[{stream}] {line}")
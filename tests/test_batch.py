@@ -0,0 +1,100 @@
+import asyncio
+import io
+import json
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import cli
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from core.batch import BatchItem, completed_ids, read_items, run_batch
+
+
+def test_read_items_accepts_strings_and_objects():
+    lines = ['"first"', "", '{"id": "x", "objective": "second"}']
+    assert list(read_items(lines)) == [BatchItem("1", "first"), BatchItem("x", "second")]
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_items(['"ok"', '{"goal": 1}']))
+
+
+def test_results_stream_in_completion_order_with_bounded_parallelism():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def runner(objective):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(float(objective))
+        with lock:
+            active -= 1
+        return objective
+
+    items = [BatchItem("slow", "0.2"), BatchItem("fast", "0.01"), BatchItem("mid", "0.05")]
+    out = io.StringIO()
+    counts = asyncio.run(run_batch(runner, items, out, parallelism=2))
+    ids = [json.loads(line)["id"] for line in out.getvalue().splitlines()]
+    assert ids == ["fast", "mid", "slow"]
+    assert counts == {"completed": 3, "failed": 0, "skipped": 0}
+    assert peak == 2
+
+
+def test_failures_are_recorded_and_retried_on_resume(tmp_path):
+    source = tmp_path / "in.jsonl"
+    source.write_text('"good"\n"bad"\n')
+    output = tmp_path / "out.jsonl"
+    calls = []
+
+    class FakeManager:
+        fail = True
+
+        def fork(self):
+            return self
+
+        def act(self, objective):
+            calls.append(objective)
+            if objective == "bad" and self.fail:
+                raise RuntimeError("boom")
+            return [(objective, "done")]
+
+    manager = FakeManager()
+    counts = cli.run_batch_file(manager, str(source), output)
+    assert counts == {"completed": 1, "failed": 1, "skipped": 0}
+    failed = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {r["id"]: r["status"] for r in failed} == {"1": "completed", "2": "failed"}
+    assert completed_ids(output) == {"1"}
+
+    manager.fail = False
+    calls.clear()
+    counts = cli.run_batch_file(manager, str(source), output, resume=True)
+    assert calls == ["bad"]
+    assert counts == {"completed": 1, "failed": 0, "skipped": 1}
+    assert completed_ids(output) == {"1", "2"}
+
+
+class AsyncDeveloper(DeveloperAgent):
+    async def act(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+        self.changed_paths = []
+        await asyncio.sleep(0)
+        return prompt.upper()
+
+
+def test_async_agents_are_awaited(tmp_path):
+    source = tmp_path / "in.jsonl"
+    source.write_text('"goal"\n')
+    output = tmp_path / "out.jsonl"
+    manager = Manager({"developer": AsyncDeveloper()})
+    manager.llm = FakeListLLM(responses=["1. one\n2. two"])
+    assert cli.run_batch_file(manager, str(source), output)["completed"] == 1
+    (record,) = [json.loads(line) for line in output.read_text().splitlines()]
+    assert record["result"] == [["one", "ONE"], ["two", "TWO"]]
@@ -0,0 +1,47 @@
+import json
+import pathlib
+import sys
+import urllib.request
+
+# Ensure src directory and repository root on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.run import compare, percentile, run_scenario
+
+
+def test_fake_server_plans_requested_number_of_steps():
+    with FakeOllama(latency=0, tokens_per_second=0) as fake:
+        req = urllib.request.Request(
+            f"{fake.url}/api/generate",
+            data=json.dumps({"model": "m", "prompt": "PLAN 3", "stream": False}).encode(),
+        )
+        with urllib.request.urlopen(req) as resp:
+            body = json.loads(resp.read())
+    assert body["response"].splitlines() == ["1. step 1", "2. step 2", "3. step 3"]
+
+
+def test_scenario_runs_through_build_manager(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "")
+    with FakeOllama(latency=0, tokens_per_second=0, response_tokens=4) as fake:
+        result = run_scenario(
+            {"name": "t", "tasks": 5, "agents": ["developer", "writer"]}, fake.url
+        )
+        # one planning request plus one per task
+        assert fake.requests == 6
+    assert result["completed"] == 5
+    assert result["throughput"] > 0
+    assert result["p50"] <= result["p95"] <= result["p99"]
+
+
+def test_percentile_and_regression_detection():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+    base = {"scenarios": [{"name": "s", "throughput": 10.0, "p50": 1, "p95": 1, "p99": 1, "peak_rss_kb": 100}]}
+    same = {"scenarios": [dict(base["scenarios"][0])]}
+    slow = {"scenarios": [{**base["scenarios"][0], "throughput": 5.0, "p95": 2}]}
+    assert compare(same, base) == []
+    problems = compare(slow, base)
+    assert any("throughput" in p for p in problems)
+    assert any("p95" in p for p in problems)
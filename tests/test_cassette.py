@@ -0,0 +1,125 @@
+import asyncio
+import gzip
+import pathlib
+import sys
+import time
+
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.researcher import ResearcherAgent
+from agents.tester import TesterAgent
+from core import cassette
+from core.cassette import Cassette, CassetteMiss
+
+
+class OfflineLLM(FakeListLLM):
+    def _call(self, *args, **kwargs):
+        raise AssertionError("replay must not reach the model")
+
+
+@pytest.fixture(autouse=True)
+def uninstalled():
+    yield
+    cassette.install(None)
+
+
+def test_llm_calls_replay_without_the_model(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    tape = Cassette(path)
+    cassette.install(tape)
+    llm = cassette.wrap(FakeListLLM(responses=["1. plan\n2. code\n", "done"]))
+    planned = "".join(llm.stream("objective"))
+    answer = asyncio.run(llm.ainvoke("task"))
+    tape.save()
+    assert gzip.open(path, "rt").readline().startswith('{"version"')
+
+    replay = Cassette(path, replay=True)
+    cassette.install(replay)
+    llm = cassette.wrap(OfflineLLM(responses=[]))
+    # Replayed streams arrive line by line.
+    assert list(llm.stream("objective")) == ["1. plan\n", "2. code\n"]
+    assert llm.invoke("task") == answer == "done"
+    assert planned == "1. plan\n2. code\n"
+
+
+def test_unknown_requests_are_substituted_unless_strict(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    tape = Cassette(path)
+    tape.call("llm", {"prompt": "a"}, lambda: "first")
+    tape.call("llm", {"prompt": "b"}, lambda: "second")
+    with pytest.raises(OSError):
+        tape.call("http", "http://x", lambda: (_ for _ in ()).throw(OSError("down")))
+    tape.save()
+
+    replay = Cassette(path, replay=True)
+    assert replay.call("llm", {"prompt": "b"}, None) == "second"
+    assert replay.call("llm", {"prompt": "changed"}, None) == "first"
+    with pytest.raises(CassetteMiss):
+        replay.call("llm", {"prompt": "a"}, None)
+    with pytest.raises(OSError, match="down"):
+        replay.call("http", "http://x", None)
+    assert replay.stats == {"exact": 2, "substitute": 1, "miss": 1}
+
+    strict = Cassette(path, replay=True, strict=True)
+    with pytest.raises(CassetteMiss):
+        strict.call("llm", {"prompt": "changed"}, None)
+
+
+def test_replay_speed(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    tape = Cassette(path)
+    tape.call("llm", "p", lambda: time.sleep(0.2) or "slow")
+    tape.save()
+
+    async def replay(speed):
+        start = time.perf_counter()
+        await Cassette(path, replay=True, speed=speed).acall("llm", "p", None)
+        return time.perf_counter() - start
+
+    assert asyncio.run(replay(1.0)) >= 0.2
+    assert asyncio.run(replay(0)) < 0.05
+
+
+def test_agents_replay_fetches_and_commands(tmp_path, monkeypatch):
+    path = tmp_path / "run.jsonl.gz"
+    tape = Cassette(path)
+    cassette.install(tape)
+
+    async def fetch(self, url):
+        return f"page {url}"
+
+    monkeypatch.setattr(ResearcherAgent, "_fetch", fetch)
+    researcher, tester = ResearcherAgent(), TesterAgent()
+    command = f"{sys.executable} -c print('ok')"
+    assert asyncio.run(researcher.act("http://example")) == "page http://example"
+    assert asyncio.run(tester.act(command)) == "success"
+    tape.save()
+
+    cassette.install(Cassette(path, replay=True))
+
+    async def offline(*args, **kwargs):
+        raise AssertionError("replay must not run commands")
+
+    monkeypatch.setattr(ResearcherAgent, "_fetch", offline)
+    monkeypatch.setattr("agents.tester.run_command", offline)
+    researcher, tester = ResearcherAgent(), TesterAgent()
+    assert asyncio.run(researcher.act("http://example")) == "page http://example"
+    assert asyncio.run(tester.act(command)) == "success"
+    assert tester.last_result == "ok\n"
+    assert tester.partial_output() == "ok\n"
+
+
+def test_build_manager_wraps_model_clients(tmp_path, monkeypatch):
+    from cli import build_manager
+
+    monkeypatch.setenv("OLLAMA_HOST", "")
+    cassette.install(Cassette(tmp_path / "run.jsonl.gz"))
+    agent = {"role": "r", "goal": "g", "backstory": "b", "llm": {"model": "codellama"}}
+    manager = build_manager({"agents": {"developer": agent}})
+    assert isinstance(manager.llm, cassette.CassetteLLM)
+    llm = manager.agents["developer"].llm
+    assert isinstance(llm, cassette.CassetteLLM) and llm.model == "codellama"
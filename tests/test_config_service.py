@@ -0,0 +1,104 @@
+import pathlib
+import sys
+
+import pytest
+import yaml
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import config.schema as schema
+import config.service as service
+from cli import apply_config, build_manager
+from config.service import ConfigService, load_config
+from core import policies
+
+AGENT = {"role": "r", "goal": "g", "backstory": "b", "llm": {"model": "m"}}
+
+
+def write(path, data):
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(service, "_models", {})
+    monkeypatch.setenv("OLLAMA_HOST", "")
+
+
+def test_validated_config_is_cached_by_content(tmp_path, monkeypatch):
+    path = tmp_path / "agents.yaml"
+    write(path, {"agents": {"writer": AGENT}})
+    cache = tmp_path / "cache"
+    first = load_config(path, cache_dir=cache)
+    assert load_config(path, cache_dir=cache) is first
+    assert len(list(cache.glob("*.json"))) == 1
+
+    # A new process reuses the parsed file and skips the YAML parser.
+    monkeypatch.setattr(service, "_models", {})
+
+    def no_yaml(text, suffix):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(service, "parse_config", no_yaml)
+    again = load_config(path, cache_dir=cache)
+    assert again == first and again is not first
+
+
+def test_invalid_config_names_the_file(tmp_path):
+    path = tmp_path / "bad.yaml"
+    write(path, {"agents": {"writer": {"role": "r"}}})
+    with pytest.raises(ValueError, match="bad.yaml"):
+        schema.load_config(path)
+    other = tmp_path / "agents.toml"
+    other.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_config(other, cache_dir=None)
+
+
+def test_service_notifies_changes_and_ignores_invalid_edits(tmp_path):
+    path = tmp_path / "agents.yaml"
+    write(path, {"agents": {"writer": AGENT}})
+    svc = ConfigService(path, cache_dir=None)
+    seen = []
+    svc.subscribe(lambda old, new: seen.append((old, new)))
+    first = svc.load()
+    assert svc.check() is False
+
+    write(path, {"agents": {"writer": {**AGENT, "goal": "new"}}})
+    assert svc.check() is True
+    assert seen[0][0] is first and seen[0][1].agents["writer"].goal == "new"
+
+    path.write_text("agents: {writer: {role: r}}", encoding="utf-8")
+    assert svc.check() is False
+    path.write_text("agents: {writer: [role: r", encoding="utf-8")
+    assert svc.check() is False
+    assert svc.current.agents["writer"].goal == "new"
+
+
+def test_apply_config_rebuilds_only_changed_agents(tmp_path):
+    old = schema.ConfigModel.model_validate(
+        {"agents": {"developer": AGENT, "writer": AGENT}, "policies": {"allowed_commands": ["ls"]}}
+    )
+    manager = build_manager(old)
+    developer = manager.agents["developer"]
+    writer = manager.agents["writer"]
+    assert not policies.check_policy("pytest -q")
+
+    new = schema.ConfigModel.model_validate(
+        {
+            "agents": {"developer": AGENT, "writer": {**AGENT, "goal": "docs", "replicas": 2}},
+            "policies": {"allowed_commands": ["pytest"]},
+        }
+    )
+    with manager.pools["writer"].lease() as running:
+        changes = apply_config(manager, old, new)
+        # the task in flight keeps its instance
+        assert running is writer
+    assert changes == ["rebuilt agent writer", "policies"]
+    assert manager.agents["developer"] is developer
+    assert manager.agents["writer"] is not writer
+    assert manager.agents["writer"].goal == "docs"
+    assert len(manager.pools["writer"]) == 2
+    assert policies.check_policy("pytest -q")
+    policies.install(None)
@@ -0,0 +1,117 @@
+import asyncio
+import pathlib
+import sys
+from types import SimpleNamespace
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from agents.message import Message
+from agents.tester import TesterAgent
+from core.context import ContextWindow, estimate_tokens, truncate
+
+
+def agent(model="llama3", num_ctx=None):
+    return SimpleNamespace(
+        role="Writer",
+        goal="Write docs",
+        backstory="Careful.",
+        llm=SimpleNamespace(model=model, num_ctx=num_ctx),
+    )
+
+
+def test_estimate_and_truncate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("a b c d e") == 5
+    text = "\n".join(f"line {i} " + "x" * 40 for i in range(50))
+    short = truncate(text, 30)
+    assert short.startswith("line 0")
+    assert short.endswith(" …")
+    assert estimate_tokens(short) <= 32
+    assert truncate("tiny", 30) == "tiny"
+
+
+def test_prompt_tokens_stay_flat_with_stable_prefix():
+    window = ContextWindow(budgets={"llama3": 600}, digest_tokens=40)
+    writer = agent()
+    sizes = []
+    prompts = []
+    for i in range(30):
+        prompt = window.build(writer, f"step {i}")
+        prompts.append(prompt)
+        sizes.append(estimate_tokens(prompt))
+        window.add(f"step {i}", f"result {i}\n" + "word " * 300)
+    assert max(sizes) <= 600
+    assert max(sizes[10:]) - min(sizes[10:]) < 60
+    prefix = window.prefix(writer)
+    assert all(p.startswith(prefix) for p in prompts)
+    # the latest result is kept verbatim, older ones as digests
+    assert prompts[-1].count("word ") > 250
+    assert "result 28" in prompts[-1] and "result 0" not in prompts[-1]
+
+
+def test_budget_follows_model_context():
+    window = ContextWindow(prompt_share=0.5)
+    assert window.budget(agent(num_ctx=8192).llm) == 4096
+    assert window.budget(agent().llm) == 1024
+    assert ContextWindow(budgets={"llama3": 300}).budget(agent().llm) == 300
+
+
+def test_summaries_are_cached():
+    calls = []
+
+    def summarize(text, tokens):
+        calls.append(text)
+        return "summary"
+
+    window = ContextWindow(budgets={"llama3": 2000}, summarizer=summarize, recent=0)
+    window.add("a", "long " * 200)
+    first = window.build(agent(), "b")
+    second = window.fork()
+    second.add("a", "long " * 200)
+    assert second.build(agent(), "b") == first
+    assert "- a: summary" in first
+    assert len(calls) == 1
+
+
+class StubLLM:
+    model = "llama3"
+
+    def __init__(self, output):
+        self.output = output
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.output
+
+
+def test_manager_chains_results_into_model_prompts():
+    developer = DeveloperAgent()
+    developer.llm = StubLLM("def f(): pass")
+    tester = TesterAgent()
+    manager = Manager({"developer": developer, "tester": tester}, context=ContextWindow())
+    manager.llm = StubLLM("1. write f\n2. echo ok\n3. document f")
+    manager.parallelism = 1
+
+    async def approve_plan():
+        await manager.bus.recv_from_supervisor()
+        manager.bus.send_to_supervisor(Message(sender="supervisor", content="approve"))
+
+    async def run():
+        approve = asyncio.create_task(approve_plan())
+        try:
+            return await manager.run("objective")
+        finally:
+            approve.cancel()
+
+    asyncio.run(run())
+    first, third = developer.llm.prompts
+    assert first.startswith("You are Developer.")
+    assert first.endswith("Task: write f\n")
+    assert "- write f: def f(): pass" in third
+    assert "- echo ok: success" in third
+    assert manager.results[1] == ("echo ok", "success")
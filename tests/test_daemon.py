@@ -0,0 +1,101 @@
+import asyncio
+import json
+import pathlib
+import sys
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.language_models.fake import FakeListLLM
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+import cli
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from core.daemon import JobServer
+
+
+def test_jobs_run_by_priority_and_stream_progress():
+    gate = threading.Event()
+    order = []
+
+    def runner(objective, emit):
+        if objective == "blocker":
+            gate.wait(5)
+        order.append(objective)
+        emit({"event": "task", "task": objective})
+        return objective.upper()
+
+    async def main():
+        server = JobServer(runner, workers=1)
+        async with TestClient(TestServer(server.app())) as client:
+            await client.post("/jobs", json={"objective": "blocker", "id": "b"})
+            await asyncio.sleep(0.05)
+            await client.post("/jobs", json={"objective": "low", "priority": 0})
+            resp = await client.post("/jobs", json={"objective": "high", "priority": 5, "id": "h"})
+            assert resp.status == 202
+            gate.set()
+            events = await client.get("/jobs/h/events")
+            lines = [json.loads(line) for line in (await events.text()).splitlines()]
+            job = await (await client.get("/jobs/h")).json()
+            bad = await client.post("/jobs", json={"priority": 1})
+            missing = await client.get("/jobs/nope")
+            return lines, job, bad.status, missing.status
+
+    lines, job, bad, missing = asyncio.run(main())
+    assert order[:2] == ["blocker", "high"]
+    assert [e["event"] for e in lines] == ["queued", "started", "task", "completed"]
+    assert lines[-1]["result"] == "HIGH"
+    assert job["status"] == "completed"
+    assert (bad, missing) == (400, 404)
+
+
+def test_failed_job_reports_error():
+    def runner(objective, emit):
+        raise RuntimeError("no model")
+
+    async def main():
+        server = JobServer(runner)
+        async with TestClient(TestServer(server.app())) as client:
+            await client.post("/jobs", json={"objective": "x", "id": "f"})
+            text = await (await client.get("/jobs/f/events")).text()
+            return json.loads(text.splitlines()[-1])
+
+    last = asyncio.run(main())
+    assert last["event"] == "failed"
+    assert last["error"] == "RuntimeError: no model"
+
+
+def test_job_runner_emits_task_events():
+    class FakeManager:
+        def fork(self):
+            return self
+
+        def iter_act(self, objective):
+            yield from [("a", "1"), ("b", "2")]
+
+    events = []
+    result = cli.job_runner(FakeManager())("goal", events.append)
+    assert result == [("a", "1"), ("b", "2")]
+    assert [e["task"] for e in events] == ["a", "b"]
+
+
+def test_job_runner_awaits_async_agents():
+    class AsyncDeveloper(DeveloperAgent):
+        async def act(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            self.changed_paths = []
+            await asyncio.sleep(0)
+            return prompt.upper()
+
+    manager = Manager({"developer": AsyncDeveloper()})
+    manager.llm = FakeListLLM(responses=["1. one\n2. two"])
+    events = []
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.extend(cli.job_runner(manager)("goal", events.append))
+    )
+    worker.start()
+    worker.join()
+    assert results == [("one", "ONE"), ("two", "TWO")]
+    assert [e["response"] for e in events] == ["ONE", "TWO"]
@@ -0,0 +1,117 @@
+import os
+import pathlib
+import sys
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from core.depmap import DependencyMap, merkle_root
+
+
+def make_tree(root: pathlib.Path) -> None:
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "__init__.py").write_text("")
+    (root / "src" / "pkg" / "a.py").write_text("from .b import B\n")
+    (root / "src" / "pkg" / "b.py").write_text("B = 1\n")
+    (root / "src" / "c.py").write_text("C = 1\n")
+    (root / "tests").mkdir()
+    (root / "tests" / "test_a.py").write_text("from pkg.a import B\n")
+    (root / "tests" / "test_c.py").write_text("import c\n")
+
+
+def green_map(root: pathlib.Path, **kwargs) -> tuple[DependencyMap, dict]:
+    depmap = DependencyMap(root, **kwargs)
+    snapshot = depmap.snapshot()
+    graph = depmap.build(snapshot)
+    depmap.mark_green(snapshot)
+    return depmap, graph
+
+
+def select(depmap: DependencyMap, hints=None):
+    snapshot = depmap.snapshot(hints)
+    graph = depmap.build(snapshot)
+    return depmap.affected(depmap.changed(snapshot), graph)
+
+
+def test_relative_imports_are_resolved(tmp_path):
+    make_tree(tmp_path)
+    _, graph = green_map(tmp_path)
+    assert graph["tests/test_a.py"] == {
+        "src/pkg/__init__.py",
+        "src/pkg/a.py",
+        "src/pkg/b.py",
+    }
+    assert graph["tests/test_c.py"] == {"src/c.py"}
+
+
+def test_only_tests_importing_change_are_selected(tmp_path):
+    make_tree(tmp_path)
+    depmap, _ = green_map(tmp_path)
+    (tmp_path / "src" / "pkg" / "b.py").write_text("B = 2\n")
+    assert select(depmap) == ["tests/test_a.py"]
+
+
+def test_unhinted_changes_are_detected(tmp_path):
+    make_tree(tmp_path)
+    depmap, _ = green_map(tmp_path)
+    (tmp_path / "src" / "pkg" / "b.py").write_text("B = 22\n")
+    (tmp_path / "src" / "c.py").write_text("C = 22\n")
+    hints = [tmp_path / "src" / "c.py"]
+    assert select(depmap, hints) == ["tests/test_a.py", "tests/test_c.py"]
+
+
+def test_hints_catch_edits_with_unchanged_stats(tmp_path):
+    make_tree(tmp_path)
+    depmap, _ = green_map(tmp_path)
+    target = tmp_path / "src" / "c.py"
+    st = target.stat()
+    target.write_text("C = 2\n")
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert select(depmap) == []
+    assert select(depmap, [target]) == ["tests/test_c.py"]
+
+
+def test_cache_is_reloaded_by_fresh_instance(tmp_path):
+    make_tree(tmp_path)
+    cache = tmp_path / ".agents_cache" / "testmap.json"
+    green_map(tmp_path, cache_path=cache)
+    fresh = DependencyMap(tmp_path, cache_path=cache)
+    assert fresh.green
+    assert select(fresh) == []
+    (tmp_path / "src" / "c.py").write_text("C = 3\n")
+    assert select(fresh) == ["tests/test_c.py"]
+
+
+def test_conftest_dependencies_reach_tests(tmp_path):
+    make_tree(tmp_path)
+    (tmp_path / "src" / "helper.py").write_text("H = 1\n")
+    (tmp_path / "tests" / "conftest.py").write_text("import helper\n")
+    depmap, _ = green_map(tmp_path)
+    (tmp_path / "src" / "helper.py").write_text("H = 2\n")
+    assert select(depmap) == ["tests/test_a.py", "tests/test_c.py"]
+
+
+def test_unknown_module_forces_full_run(tmp_path):
+    make_tree(tmp_path)
+    depmap, _ = green_map(tmp_path)
+    (tmp_path / "src" / "c.py").unlink()
+    assert select(depmap) is None
+
+
+def test_support_files_force_full_run(tmp_path):
+    make_tree(tmp_path)
+    (tmp_path / "pytest.ini").write_text("[pytest]\n")
+    (tmp_path / "tests" / "data.json").write_text("{}")
+    depmap, _ = green_map(tmp_path)
+    (tmp_path / "tests" / "data.json").write_text('{"a": 1}')
+    assert select(depmap) is None
+    depmap.mark_green(depmap.snapshot())
+    (tmp_path / "pytest.ini").write_text("[pytest]\naddopts = -q\n")
+    assert select(depmap) is None
+
+
+def test_merkle_root_tracks_content_and_layout():
+    base = merkle_root({"a/x.py": "1", "b.py": "2"})
+    assert base == merkle_root({"b.py": "2", "a/x.py": "1"})
+    assert base != merkle_root({"a/x.py": "1", "b.py": "3"})
+    assert base != merkle_root({"x.py": "1", "b.py": "2"})
@@ -0,0 +1,58 @@
+import pathlib
+import sys
+import threading
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from core.files import FileOutput
+
+
+def test_write_skips_identical_content(tmp_path):
+    output = FileOutput()
+    target = tmp_path / "nested" / "out.txt"
+
+    assert output.write(target, "hello") is True
+    mtime = target.stat().st_mtime_ns
+    assert output.write(target, "hello") is False
+    assert target.stat().st_mtime_ns == mtime
+    assert output.write(target, "changed") is True
+    assert target.read_text() == "changed"
+    assert [p.name for p in target.parent.iterdir()] == ["out.txt"]
+
+
+def test_write_detects_external_edits(tmp_path):
+    output = FileOutput()
+    target = tmp_path / "out.txt"
+    output.write(target, "hello")
+    target.write_text("other")
+    assert output.write(target, "hello") is True
+    assert target.read_text() == "hello"
+
+
+def test_submit_batches_and_coalesces(tmp_path):
+    output = FileOutput()
+    gate = threading.Event()
+    output._executor.submit(gate.wait)
+    futures = [output.submit(tmp_path / f"f{i}.txt", str(i)) for i in range(50)]
+    futures.append(output.submit(tmp_path / "f0.txt", "latest"))
+    gate.set()
+    output.flush()
+
+    assert all(f.done() for f in futures)
+    assert (tmp_path / "f0.txt").read_text() == "latest"
+    assert (tmp_path / "f49.txt").read_text() == "49"
+    assert output.written == 50
+    assert output.batches == 1
+
+
+@pytest.mark.asyncio
+async def test_put_queues_inside_event_loop(tmp_path):
+    output = FileOutput()
+    target = tmp_path / "async.txt"
+    output.put(target, "queued")
+    await output.aflush()
+    assert target.read_text() == "queued"
+    assert await output.awrite(target, "queued") is False
@@ -0,0 +1,103 @@
+import pathlib
+import sys
+import tracemalloc
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.message import Message
+from core.history import MessageHistory
+from core.storage import Storage
+from core.task import Task, TaskStatus
+
+
+def progress(tasks):
+    return Message(sender="manager", content="progress", metadata={"tasks": tasks})
+
+
+def test_snapshots_are_versioned_deltas():
+    tasks = [Task(1, "a"), Task(2, "b"), Task(3, "c")]
+    history = MessageHistory()
+    first = history.append(progress(tasks))
+    assert first.version == 1 and len(first.changed) == 3 and first.order == [1, 2, 3]
+
+    tasks[1].status = TaskStatus.DONE
+    tasks[1].result = "done"
+    second = history.append(progress(tasks))
+    assert second.version == 2 and [t["id"] for t in second.changed] == [2]
+    assert second.order is None
+    # an unchanged list refers to the same version without a delta
+    third = history.append(progress(tasks))
+    assert third.version == 2 and third.changed is None
+
+    statuses = [[t.status for t in m.metadata["tasks"]] for m in history]
+    assert statuses[0] == [TaskStatus.PENDING] * 3
+    assert statuses[1][1] is TaskStatus.DONE
+    assert history.tasks(1)[1].result is None
+    assert history.tasks()[1].result == "done"
+
+
+def test_window_spills_older_records():
+    spilled = []
+    history = MessageHistory(3, spill=spilled.extend)
+    tasks = [Task(1, "a")]
+    for i in range(5):
+        tasks[0].result = str(i)
+        history.append(progress(tasks))
+    assert len(history) == 3 and history.total == 5
+    assert [r["seq"] for r in spilled] == [0, 1]
+    assert [m.metadata["tasks"][0].result for m in history] == ["2", "3", "4"]
+    with pytest.raises(KeyError):
+        history.tasks(1)
+
+
+def test_sender_and_content_are_interned():
+    history = MessageHistory()
+    for _ in range(2):
+        history.append(Message(sender="".join(["super", "visor"]), content="".join(["appr", "ove"])))
+    first, second = history._records
+    assert first.sender is second.sender and first.content is second.content
+
+
+def test_storage_round_trip_includes_spilled_history(tmp_path):
+    storage = Storage(tmp_path / "state.json")
+    history = MessageHistory(2, spill=storage.append_history)
+    tasks = [Task(1, "a"), Task(2, "b")]
+    history.append(Message(sender="manager", content="plan", metadata={"tasks": tasks}))
+    history.append(Message(sender="supervisor", content="approve"))
+    for status in (TaskStatus.IN_PROGRESS, TaskStatus.DONE):
+        tasks[0].status = status
+        history.append(progress(tasks))
+    storage.save(tasks, decisions=["approve"], messages=history)
+
+    assert len(storage.history_path.read_text().splitlines()) == 2
+    _, _, _, messages = storage.load()
+    assert [m.content for m in messages] == ["plan", "approve", "progress", "progress"]
+    assert [m.metadata["tasks"][0].status for m in messages if m.metadata] == [
+        TaskStatus.PENDING,
+        TaskStatus.IN_PROGRESS,
+        TaskStatus.DONE,
+    ]
+
+
+def test_memory_stays_flat_over_long_sessions():
+    tasks = [Task(i, f"task {i}") for i in range(50)]
+    history = MessageHistory(100)
+
+    def run(updates):
+        for i in range(updates):
+            tasks[i % 50].result = f"{i % 7}"
+            history.append(progress(tasks))
+
+    tracemalloc.start()
+    try:
+        run(500)
+        early = tracemalloc.get_traced_memory()[0]
+        run(2000)
+        late = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert history.total == 2500 and len(history) == 100
+    assert late - early < 64 * 1024
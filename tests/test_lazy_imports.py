@@ -0,0 +1,34 @@
+import pathlib
+import subprocess
+import sys
+
+SRC = pathlib.Path(__file__).resolve().parents[1] / "src"
+# Ensure src directory on path
+sys.path.append(str(SRC))
+
+
+def _loaded_after(code: str) -> set:
+    script = f"import sys; sys.path.insert(0, {str(SRC)!r}); {code}; print(' '.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+def test_cli_import_defers_heavy_dependencies():
+    loaded = _loaded_after("import cli")
+    for heavy in ("crewai", "langchain_ollama", "aiohttp", "pydantic", "yaml", "agents.developer"):
+        assert heavy not in loaded
+
+
+def test_agent_types_resolve_only_requested_agents():
+    loaded = _loaded_after("import cli; cli.AGENT_TYPES['developer']")
+    assert "agents.developer" in loaded
+    assert "agents.researcher" not in loaded
+
+
+def test_agents_package_attributes_resolve_lazily():
+    import agents
+    from agents.writer import WriterAgent
+
+    assert agents.WriterAgent is WriterAgent
+    assert "WriterAgent" in dir(agents)
+    assert sorted(agents.__all__) == sorted(agents._LAZY)
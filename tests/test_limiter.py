@@ -0,0 +1,142 @@
+import asyncio
+import pathlib
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.manager import Manager
+from agents.tester import TesterAgent
+from core.limiter import AdaptiveLimiter
+from core.metrics import REGISTRY
+
+HOST = "http://gpu:11434"
+
+
+def complete(limiter, latency, *, error=False, saturated=True):
+    """Simulate a call finishing while the host is (not) at its limit."""
+    state = limiter.host(HOST)
+    state.inflight = int(state.limit) if saturated else 1
+    limiter._release(state, latency, error)
+    state.inflight = 0
+    return state
+
+
+def test_limit_grows_while_saturated():
+    limiter = AdaptiveLimiter(initial=1, max_limit=4)
+    for _ in range(20):
+        complete(limiter, 0.1)
+    assert limiter.limit(HOST) == 4
+    limiter = AdaptiveLimiter(initial=2)
+    for _ in range(20):
+        complete(limiter, 0.1, saturated=False)
+    assert limiter.limit(HOST) == 2
+
+
+def test_errors_cut_the_limit():
+    limiter = AdaptiveLimiter(initial=8)
+    with pytest.raises(RuntimeError):
+        with limiter.slot(HOST):
+            raise RuntimeError("boom")
+    assert limiter.limit(HOST) == 5
+    assert limiter.snapshot()[HOST]["error_rate"] > 0
+
+
+def test_cancelled_calls_are_not_errors():
+    limiter = AdaptiveLimiter(initial=8)
+
+    async def call():
+        async with limiter.aslot(HOST):
+            await asyncio.sleep(1)
+
+    async def main():
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    with pytest.raises(KeyboardInterrupt):
+        with limiter.slot(HOST):
+            raise KeyboardInterrupt
+    state = limiter.host(HOST)
+    assert state.limit == 8 and state.error_rate == 0.0
+    assert state.inflight == 0 and not state.latencies
+
+
+def test_latency_spike_cuts_the_limit():
+    limiter = AdaptiveLimiter(initial=8, min_samples=5)
+    for _ in range(10):
+        state = complete(limiter, 0.01, saturated=False)
+    before = state.limit
+    for _ in range(5):
+        complete(limiter, 1.0, saturated=False)
+    assert state.limit < before
+    assert state.limit >= limiter.min_limit
+
+
+def test_thread_slots_block_at_the_limit():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with limiter.slot(HOST):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+    assert limiter.host(HOST).inflight == 0
+
+
+def test_async_slots_share_the_limit():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with limiter.aslot(HOST):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(4)))
+
+    asyncio.run(main())
+    assert peak == 1
+    assert limiter.host(HOST).inflight == 0
+
+
+def test_limit_is_exported_as_metric():
+    limiter = AdaptiveLimiter(initial=3)
+    limiter.host("http://metrics-host:11434")
+    assert (
+        'agents_llm_concurrency_limit{host="http://metrics-host:11434"} 3'
+        in REGISTRY.render()
+    )
+
+
+def test_manager_only_limits_model_calls():
+    manager = Manager(limiter=AdaptiveLimiter())
+    assert manager._limited_host(TesterAgent()) is None
+    worker = SimpleNamespace(llm=SimpleNamespace(base_url=HOST, model="llama3"))
+    assert manager._limited_host(worker) == HOST
+    assert Manager()._limited_host(worker) is None
@@ -0,0 +1,73 @@
+import json
+import logging
+import pathlib
+import sys
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from core.logging import (
+    DebugThrottle,
+    TaskLoggerAdapter,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+
+
+def test_records_are_written_by_background_listener(tmp_path):
+    path = tmp_path / "log.jsonl"
+    configure_logging(json_path=str(path), stream=False)
+    try:
+        logger = get_logger("json-agent", level=logging.DEBUG)
+        logger.info("hello %s", "world", extra={"task": 7})
+    finally:
+        shutdown_logging()
+
+    record = json.loads(path.read_text().splitlines()[0])
+    assert record["agent"] == "json-agent"
+    assert record["task"] == 7
+    assert record["message"] == "hello world"
+
+
+def test_adapter_does_not_mutate_call_extra():
+    adapter = TaskLoggerAdapter(logging.getLogger("adapter"), {"agent": "a"})
+    extra = {"task": 1}
+    _, kwargs = adapter.process("msg", {"extra": extra})
+    assert extra == {"task": 1}
+    assert kwargs["extra"] == {"task": 1, "agent": "a"}
+    _, kwargs = adapter.process("msg", {})
+    assert kwargs["extra"] is adapter.extra
+
+
+def test_debug_throttle_samples_per_agent():
+    throttle = DebugThrottle({"noisy": 3, "*": 1})
+
+    def record(agent: str, level: int = logging.DEBUG) -> logging.LogRecord:
+        rec = logging.LogRecord(agent, level, __file__, 1, "m", None, None)
+        rec.agent = agent
+        return rec
+
+    kept = [throttle.filter(record("noisy")) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert throttle.filter(record("quiet"))
+    assert throttle.filter(record("noisy", logging.INFO))
+
+
+def test_debug_throttle_rate_limits():
+    throttle = DebugThrottle(rate=2)
+    rec = logging.LogRecord("x", logging.DEBUG, __file__, 1, "m", None, None)
+    kept = [throttle.filter(rec) for _ in range(5)]
+    assert kept.count(True) == 2
+
+
+def test_logger_survives_pipeline_restart(tmp_path):
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    configure_logging(json_path=str(first), stream=False)
+    get_logger("restart").info("one")
+    shutdown_logging()
+    configure_logging(json_path=str(second), stream=False)
+    get_logger("restart").info("two")
+    shutdown_logging()
+    assert "one" in first.read_text()
+    assert "two" in second.read_text()
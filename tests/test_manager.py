@@ -0,0 +1,188 @@
+import asyncio
+import pathlib
+import sys
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from agents.tester import TesterAgent
+
+
+class StubLLM:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    def invoke(self, prompt: str) -> str:
+        return self.output
+
+
+def test_manager_forwards_only_current_writes(tmp_path):
+    """Testers receive the files written by the current step only."""
+    developer = DeveloperAgent()
+    developer.llm = StubLLM("print('hi')")
+    tester = TesterAgent()
+    manager = Manager({"developer": developer, "tester": tester})
+
+    first = tmp_path / "first.py"
+    developer.act("write", path=first)
+    manager._share_changes(developer)
+    assert tester.changed_hints == {first}
+
+    tester.changed_hints = set()
+    developer.act("explain")
+    manager._share_changes(developer)
+    assert tester.changed_hints == set()
+
+
+def test_manager_dispatches_tasks_while_planning():
+    """The first task runs before the plan stream is exhausted."""
+    events: list[str] = []
+
+    class StreamingLLM:
+        def invoke(self, prompt: str) -> str:
+            raise AssertionError("plan should be streamed")
+
+        def stream(self, prompt: str):
+            for chunk in ["1. alpha\n", "2. beta\n"]:
+                events.append(f"plan {chunk.strip()}")
+                yield chunk
+
+    class Recorder(DeveloperAgent):
+        def act(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            events.append(f"act {prompt}")
+            return prompt
+
+    worker = Recorder()
+    manager = Manager({"worker": worker})
+    manager.llm = StreamingLLM()
+
+    results = manager.act("objective")
+
+    assert results == [("alpha", "alpha"), ("beta", "beta")]
+    assert events == ["plan 1. alpha", "act alpha", "plan 2. beta", "act beta"]
+    assert manager.tasks == ["alpha", "beta"]
+
+
+def _approve(manager, reply="approve"):
+    from agents.message import Message
+
+    async def supervisor():
+        await manager.bus.recv_from_supervisor()
+        manager.bus.send_to_supervisor(Message(sender="supervisor", content=reply))
+
+    return asyncio.create_task(supervisor())
+
+
+def test_run_offloads_sync_agents_and_awaits_async_ones(tmp_path):
+    """Blocking agents run on the pool while the event loop keeps ticking."""
+    import time
+
+    from core.storage import Storage
+    from core.task import TaskStatus
+
+    class BlockingAgent(DeveloperAgent):
+        def act(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            time.sleep(0.2)
+            return f"sync {prompt}"
+
+    class AsyncAgent(DeveloperAgent):
+        async def aact(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            await asyncio.sleep(0)
+            return f"async {prompt}"
+
+    storage = Storage(tmp_path / "state.json")
+    manager = Manager({"sync": BlockingAgent(), "async": AsyncAgent()}, storage=storage)
+    manager.llm = StubLLM("1. alpha\n2. beta\n3. gamma")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def main():
+        tick_task = asyncio.create_task(ticker())
+        approve = _approve(manager)
+        try:
+            return await manager.run("objective")
+        finally:
+            tick_task.cancel()
+            approve.cancel()
+
+    tasks = asyncio.run(main())
+    assert [t.result for t in tasks] == ["sync alpha", "async beta", "sync gamma"]
+    assert all(t.status is TaskStatus.DONE for t in tasks)
+    assert ticks >= 20
+    saved, _, decisions, _ = storage.load()
+    assert decisions == ["approve"]
+    assert [t.status for t in saved] == [TaskStatus.DONE] * 3
+
+
+def test_run_stops_when_supervisor_aborts():
+    from core.task import TaskStatus
+
+    worker = DeveloperAgent()
+    worker.llm = StubLLM("never")
+    manager = Manager({"worker": worker})
+    manager.llm = StubLLM("1. alpha")
+
+    async def main():
+        approve = _approve(manager, "abort")
+        try:
+            return await manager.run("objective")
+        finally:
+            approve.cancel()
+
+    tasks = asyncio.run(main())
+    assert [t.status for t in tasks] == [TaskStatus.PENDING]
+
+
+def test_decisions_are_bounded_by_history_window(tmp_path):
+    from agents.message import Message
+    from core.storage import Storage
+
+    storage = Storage(tmp_path / "state.json")
+    manager = Manager(storage=storage, history_window=2)
+
+    class Scheduler:
+        def cancel(self, task, reason):
+            pass
+
+    async def main():
+        for i in range(5):
+            manager.bus.send_to_supervisor(Message(sender="supervisor", content=f"note {i}"))
+        listener = asyncio.create_task(manager._supervise(Scheduler()))
+        await asyncio.sleep(0.01)
+        listener.cancel()
+        await manager._save([])
+
+    asyncio.run(main())
+    assert list(manager.decisions) == ["note 3", "note 4"]
+    assert storage.load()[2] == ["note 3", "note 4"]
+
+
+def test_register_agent_connects_bus():
+    manager = Manager()
+    tester = TesterAgent()
+    manager.register_agent("tester", tester)
+    assert manager.agents["tester"] is tester
+    assert tester.bus is manager.bus
+
+
+def test_developer_aact_uses_async_llm(tmp_path):
+    class AsyncLLM:
+        def invoke(self, prompt):
+            raise AssertionError("blocking call")
+
+        async def ainvoke(self, prompt):
+            return f"code for {prompt}"
+
+    developer = DeveloperAgent()
+    developer.llm = AsyncLLM()
+    path = tmp_path / "out.py"
+    assert asyncio.run(developer.aact("x", path=path)) == "code for x"
+    assert path.read_text() == "code for x"
+    assert developer.changed_paths == [path]
@@ -0,0 +1,76 @@
+import pathlib
+import sys
+import threading
+import urllib.request
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from config.schema import ConfigModel
+from core.metrics import Registry
+
+
+def test_counter_sums_updates_from_all_threads():
+    counter = Registry().counter("hits", "Hits")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counter.value == 4000
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = Registry()
+    hist = reg.histogram("latency", "Latency", ("agent",), buckets=(0.1, 1.0))
+    child = hist.labels(agent="dev")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+    text = reg.render()
+    assert 'latency_bucket{agent="dev",le="0.1"} 2' in text
+    assert 'latency_bucket{agent="dev",le="1.0"} 3' in text
+    assert 'latency_bucket{agent="dev",le="+Inf"} 4' in text
+    assert 'latency_count{agent="dev"} 4' in text
+    assert child.count == 4
+
+
+def test_gauge_function_and_label_escaping():
+    reg = Registry()
+    depth = reg.gauge("depth", "Depth", ("target",))
+    depth.labels(target='a"b').set_function(lambda: 3)
+    assert 'depth{target="a\\"b"} 3' in reg.render()
+
+
+def test_registry_rejects_kind_conflicts():
+    reg = Registry()
+    reg.counter("x", "X")
+    try:
+        reg.gauge("x", "X")
+    except ValueError:
+        pass
+    else:  # pragma: no cover - failure path
+        raise AssertionError("expected ValueError")
+
+
+def test_http_endpoint_serves_metrics():
+    reg = Registry()
+    reg.counter("served", "Served").inc(2)
+    server = reg.serve(port=0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            body = resp.read().decode()
+    finally:
+        server.shutdown()
+    assert "served_total 2" in body
+
+
+def test_metrics_disabled_by_default():
+    cfg = ConfigModel.model_validate({"agents": {}})
+    assert cfg.metrics.enabled is False
+    assert cfg.metrics.host == "127.0.0.1"
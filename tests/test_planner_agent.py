@@ -1,6 +1,8 @@
 import pathlib
 import sys
 
+import pytest
+
 # Ensure src directory on path
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
 
@@ -24,3 +26,37 @@ def test_planner_decomposes_tasks():
     assert response == ["alpha", "beta"]
     planner.observe(response)
     assert planner.tasks == ["alpha", "beta"]
+
+
+class StreamingLLM:
+    def __init__(self, chunks: list[str], events: list[str]) -> None:
+        self.chunks = chunks
+        self.events = events
+
+    def invoke(self, prompt: str) -> str:
+        return "".join(self.chunks)
+
+    def stream(self, prompt: str):
+        for chunk in self.chunks:
+            self.events.append(f"chunk:{chunk!r}")
+            yield chunk
+
+
+def test_planner_streams_tasks_line_by_line():
+    events: list[str] = []
+    planner = PlannerAgent()
+    planner.llm = StreamingLLM(["1. al", "pha\n2.", " beta\n", "- gamma"], events)
+
+    stream = planner.stream_plan("plan something")
+    assert next(stream) == "alpha"
+    assert events == ["chunk:'1. al'", "chunk:'pha\\n2.'"]
+    assert list(stream) == ["beta", "gamma"]
+    assert planner.tasks == ["alpha", "beta", "gamma"]
+
+
+@pytest.mark.asyncio
+async def test_planner_astream_plan_falls_back_to_invoke():
+    planner = PlannerAgent()
+    planner.llm = StubLLM("1. alpha\n\n2. beta")
+    tasks = [t async for t in planner.astream_plan("plan")]
+    assert tasks == ["alpha", "beta"]
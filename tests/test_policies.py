@@ -0,0 +1,57 @@
+import pathlib
+import sys
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from config.schema import PoliciesConfig
+from core import policies
+from core.policies import PolicyEngine
+
+
+def test_engine_applies_whitelist_and_network_rules():
+    engine = PolicyEngine(["Plan", "code"], network_access=False)
+    assert engine.check("plan the work")
+    assert engine.check("CODE it")
+    assert not engine.check("deploy now")
+    assert not engine.check("code against HTTPS://example.com")
+    assert engine.check("")
+
+
+def test_engine_deny_patterns_and_batch_checks():
+    patterns = [rf"secret{i}" for i in range(300)] + [r"rm\s+-rf"]
+    engine = PolicyEngine(None, network_access=True, denied_patterns=patterns)
+    verdicts = engine.check_many(
+        ["fetch http://x", "leak secret299", "run rm  -rf /", "harmless"]
+    )
+    assert verdicts == [True, False, False, True]
+    engine.check_many(["harmless"] * 10)
+    assert engine._cached.cache_info().hits >= 10
+
+
+def test_engine_from_config_falls_back_to_module_defaults():
+    engine = PolicyEngine.from_config(PoliciesConfig())
+    assert engine.allowed_commands == frozenset(policies.ALLOWED_COMMANDS)
+    assert engine.network_access is policies.NETWORK_ACCESS
+
+    cfg = PoliciesConfig(allowed_commands=["test"], network_access=True, denied_patterns=["drop"])
+    engine = PolicyEngine.from_config(cfg)
+    assert engine.check("test http://x")
+    assert not engine.check("test drop table")
+
+
+def test_invalid_denied_pattern_is_a_config_error():
+    with pytest.raises(ValueError, match="invalid denied pattern '\\('"):
+        PoliciesConfig(denied_patterns=["("])
+
+
+def test_check_policy_uses_installed_engine():
+    try:
+        policies.install(PolicyEngine(["custom"]))
+        assert policies.check_policy("custom step")
+        assert not policies.check_policy("alpha step")
+    finally:
+        policies.install(None)
+    assert policies.check_policy("alpha step")
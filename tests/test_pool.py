@@ -0,0 +1,115 @@
+import asyncio
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from agents.message import Message
+from agents.pool import AgentPool
+from cli import build_manager
+
+
+class StubLLM:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    def invoke(self, prompt: str) -> str:
+        return self.output
+
+
+def test_lease_picks_least_busy_replica():
+    pool = AgentPool(["a", "b", "c"])
+    with pool.lease() as first, pool.lease() as second:
+        assert {first, second} == {"a", "b"}
+        with pool.lease() as third:
+            assert third == "c"
+    with pool.lease() as again:
+        # all idle: the least used replica wins
+        assert again in {"a", "b", "c"}
+    assert pool.busy == [0, 0, 0]
+    assert sum(pool.used) == 4
+
+
+def test_lease_waits_for_an_idle_replica():
+    pool = AgentPool(["a"])
+    order = []
+
+    def worker(tag):
+        with pool.lease():
+            order.append(f"start {tag}")
+            time.sleep(0.02)
+            order.append(f"end {tag}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(order[i].startswith("start") for i in range(0, 6, 2))
+    assert all(order[i].startswith("end") for i in range(1, 6, 2))
+
+    async def main():
+        async with pool.alease():
+            waiting = asyncio.create_task(asyncio.wait_for(pool.aacquire(), 0.01))
+            with pytest.raises(asyncio.TimeoutError):
+                await waiting
+            blocked = asyncio.create_task(pool.aacquire())
+            await asyncio.sleep(0)
+            assert not blocked.done()
+        return await blocked
+
+    assert asyncio.run(main()) == 0
+    pool.release(0)
+    assert pool.busy == [0] and not pool._waiters
+
+
+def test_build_manager_creates_isolated_replicas(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "")
+    base = {"role": "r", "goal": "g", "backstory": "b", "llm": {"model": "m"}}
+    manager = build_manager({"agents": {"developer": {**base, "replicas": 3}, "writer": base}})
+    replicas = list(manager.pools["developer"])
+    assert len(replicas) == 3 and len(manager.pools["writer"]) == 1
+    assert len({id(r) for r in replicas}) == 3
+    assert all(r.llm is replicas[0].llm for r in replicas)
+    assert manager.agents["developer"] is replicas[0]
+    with pytest.raises(ValueError):
+        build_manager({"agents": {"developer": {**base, "replicas": 0}}})
+
+
+def test_tasks_spread_over_replicas():
+    class SlowDeveloper(DeveloperAgent):
+        async def aact(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            self.changed_paths = [pathlib.Path(prompt)]
+            await asyncio.sleep(0.2)
+            return prompt
+
+    replicas = [SlowDeveloper() for _ in range(3)]
+    manager = Manager({"developer": AgentPool(replicas)})
+    manager.llm = StubLLM("\n".join(f"{i}. task{i}" for i in range(1, 7)))
+
+    async def main():
+        async def approve():
+            await manager.bus.recv_from_supervisor()
+            manager.bus.send_to_supervisor(Message(sender="supervisor", content="approve"))
+
+        control = asyncio.create_task(approve())
+        try:
+            return await manager.run("objective")
+        finally:
+            control.cancel()
+
+    start = time.perf_counter()
+    tasks = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    assert [t.result for t in tasks] == [f"task{i}" for i in range(1, 7)]
+    # six tasks on three replicas take two rounds, not six
+    assert elapsed < 0.9
+    assert manager.pools["developer"].used == [2, 2, 2]
+    assert {str(r.changed_paths[0]) for r in replicas} == {"task4", "task5", "task6"}
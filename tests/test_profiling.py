@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from agents.message import Message
+from core import profiling
+from core.logging import TaskLoggerAdapter, current_task, task_context
+
+
+class StubLLM:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    def invoke(self, prompt: str) -> str:
+        return self.output
+
+
+def busy_developer_work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class BusyDeveloper(DeveloperAgent):
+    def act(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+        self.changed_paths = []
+        busy_developer_work(200_000)
+        return prompt
+
+
+@pytest.fixture(autouse=True)
+def stopped():
+    yield
+    profiling.stop()
+
+
+def test_task_context_labels_log_records_and_threads():
+    adapter = TaskLoggerAdapter(logging.getLogger("ctx"), {"agent": "a"})
+    with task_context("developer", 3):
+        _, kwargs = adapter.process("msg", {})
+        assert kwargs["extra"] == {"task": 3, "agent": "a"}
+        _, kwargs = adapter.process("msg", {"extra": {"task": 9}})
+        assert kwargs["extra"]["task"] == 9
+        seen = []
+        worker = threading.Thread(target=profiling.bind(lambda: seen.append(current_task())))
+        worker.start()
+        worker.join()
+    assert seen == [("developer", 3)]
+    assert current_task() is None
+
+
+def test_cpu_profile_is_split_per_task(tmp_path):
+    manager = Manager({"developer": BusyDeveloper()})
+    manager.llm = StubLLM("1. one\n2. two")
+
+    async def main():
+        async def approve():
+            await manager.bus.recv_from_supervisor()
+            manager.bus.send_to_supervisor(Message(sender="supervisor", content="approve"))
+
+        control = asyncio.create_task(approve())
+        try:
+            return await manager.run("objective")
+        finally:
+            control.cancel()
+
+    profiling.start(["cpu"])
+    asyncio.run(main())
+    paths = profiling.stop(tmp_path)
+    assert {p.name for p in paths} == {"cpu.txt", "cpu.prof"}
+    report = (tmp_path / "cpu.txt").read_text()
+    for task_id in (1, 2):
+        section = report.split(f"== developer/task {task_id} ")[1].split("\n== ")[0]
+        assert "busy_developer_work" in section
+    assert "== main thread" in report
+
+
+def test_memory_profile_reports_allocations_per_task(tmp_path):
+    kept = []
+    profiling.start(["memory"])
+    with profiling.task_scope("writer", 1):
+        kept.append([bytearray(1024) for _ in range(200)])
+    profiling.stop(tmp_path)
+    report = (tmp_path / "memory.txt").read_text()
+    section = report.split("== writer/task 1")[1].split("\n== ")[0]
+    assert "test_profiling.py" in section
+    assert "end of run" in report
+
+
+def test_asyncio_profile_names_the_stalling_task(tmp_path):
+    async def stall():
+        with profiling.task_scope("tester", 4):
+            time.sleep(0.06)
+            await asyncio.sleep(0)
+
+    original = asyncio.events.Handle._run
+    profiler = profiling.start(["asyncio"], slow_callback=0.05)[0]
+    asyncio.run(stall())
+    profiling.stop(tmp_path)
+    assert [where for _, where, _ in profiler.stalls] == ["tester/task 4"]
+    assert "stall" in (tmp_path / "asyncio.txt").read_text()
+    assert asyncio.events.Handle._run is original
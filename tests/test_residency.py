@@ -0,0 +1,71 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+# Ensure src directory and repository root on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from benchmarks.fake_ollama import FakeOllama
+from core.residency import ModelResidency
+
+HOST = "http://gpu:11434"
+
+
+def llm(model, host=HOST):
+    return SimpleNamespace(model=model, base_url=host)
+
+
+def test_alternating_models_count_reloads():
+    residency = ModelResidency(max_loaded=1)
+    for model in ["llama3", "codellama", "llama3", "llama3", "codellama"]:
+        residency.note(llm(model))
+    assert residency.report() == {"loads": 4, "reloads": 2}
+    assert residency.resident(HOST) == ["codellama"]
+
+
+def test_order_groups_models_and_prefers_resident():
+    residency = ModelResidency()
+    residency.note(llm("mistral"))
+    llms = [llm("llama3"), llm("mistral"), llm("llama3"), llm("mistral")]
+    assert residency.order(llms) == [1, 3, 0, 2]
+
+
+def test_warm_up_loads_models_in_parallel_with_keep_alive():
+    with FakeOllama(latency=0.2, tokens_per_second=0) as fake:
+        residency = ModelResidency(keep_alive="30m", max_loaded=2)
+        residency.register([llm("a", fake.url), llm("b", fake.url), llm("a", fake.url)])
+        timings = residency.warm_up()
+        assert fake.requests == 2
+    assert sorted(timings) == [f"{fake.url}/a", f"{fake.url}/b"]
+    residency.note(llm("a", fake.url))
+    assert residency.report() == {"loads": 0, "reloads": 0}
+
+
+def test_manager_groups_tasks_by_model_but_keeps_plan_order():
+    class PlanLLM:
+        def invoke(self, prompt):
+            return "1. a\n2. b\n3. c\n4. d"
+
+    calls = []
+
+    class Worker(DeveloperAgent):
+        def act(self, prompt, **kwargs):  # type: ignore[override]
+            calls.append(prompt)
+            return prompt.upper()
+
+    first, second = Worker(), Worker()
+    first.llm, second.llm = llm("llama3"), llm("codellama")
+    residency = ModelResidency()
+    manager = Manager(
+        {"first": first, "second": second}, residency=residency, group_by_model=True
+    )
+    manager.llm = PlanLLM()
+
+    results = manager.act("objective")
+
+    assert calls == ["a", "c", "b", "d"]
+    assert results == [("a", "A"), ("b", "B"), ("c", "C"), ("d", "D")]
+    assert residency.report() == {"loads": 2, "reloads": 0}
@@ -0,0 +1,146 @@
+import asyncio
+import pathlib
+import sys
+import time
+
+import pytest
+
+# Ensure src directory and repository root on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from agents.developer import DeveloperAgent
+from benchmarks.fake_ollama import FakeOllama
+from cli import build_manager
+from config.schema import ConfigModel
+from core.routing import EndpointPool, NoHealthyEndpoint, RoutedLLM
+
+
+class Client:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.base_url = f"http://{name}:11434"
+        self.model = "llama3"
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(self.name)
+        return self.name
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ConnectionError(self.name)
+        return self.name
+
+    def stream(self, prompt, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(self.name)
+        yield from [self.name, "!"]
+
+
+def prime(pool, latency=0.01, samples=20):
+    pool.latencies.extend([latency] * samples)
+
+
+def test_requests_follow_weights_when_idle():
+    a, b = Client("a"), Client("b")
+    pool = EndpointPool([(a, 2.0), (b, 1.0)], hedge_percentile=None)
+    for _ in range(9):
+        pool.call(lambda c: c.invoke("x"))
+    assert (a.calls, b.calls) == (6, 3)
+    assert all(ep["outstanding"] == 0 for ep in pool.snapshot())
+
+
+def test_slow_request_is_hedged_to_second_endpoint():
+    slow, fast = Client("slow", delay=0.5), Client("fast", delay=0.0)
+    pool = EndpointPool([(slow, 1.0), (fast, 1.0)])
+    prime(pool)
+    start = time.perf_counter()
+    assert pool.call(lambda c: c.invoke("x")) == "fast"
+    assert time.perf_counter() - start < 0.4
+    assert (slow.calls, fast.calls) == (1, 1)
+
+
+def test_async_hedge_cancels_the_loser():
+    slow, fast = Client("slow", delay=1.0), Client("fast", delay=0.0)
+    pool = EndpointPool([(slow, 1.0), (fast, 1.0)])
+    prime(pool)
+
+    async def main():
+        result = await pool.acall(lambda c: c.ainvoke("x"))
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == "fast"
+    assert slow.cancelled == 1
+    assert all(ep["outstanding"] == 0 for ep in pool.snapshot())
+
+
+def test_failures_fail_over_and_eject_the_endpoint():
+    bad, good = Client("bad", fail=True), Client("good")
+    pool = EndpointPool([(bad, 10.0), (good, 1.0)], failure_threshold=2, cooldown=0.2)
+    for _ in range(4):
+        assert pool.call(lambda c: c.invoke("x")) == "good"
+    assert bad.calls == 2
+    assert pool.snapshot()[0]["state"] == "open"
+
+    time.sleep(0.25)
+    bad.fail = False
+    assert pool.call(lambda c: c.invoke("x")) == "bad"
+    assert pool.snapshot()[0]["state"] == "closed"
+
+
+def test_all_endpoints_ejected():
+    pool = EndpointPool([(Client("a", fail=True), 1.0)], failure_threshold=1)
+    with pytest.raises(ConnectionError):
+        pool.call(lambda c: c.invoke("x"))
+    with pytest.raises(NoHealthyEndpoint):
+        pool.call(lambda c: c.invoke("x"))
+
+
+def test_routed_llm_streams_with_failover_and_fits_agents():
+    bad, good = Client("bad", fail=True), Client("good")
+    llm = RoutedLLM.from_clients([(bad, 1.0), (good, 1.0)])
+    assert "".join(llm.stream("x")) == "good!"
+    assert llm.invoke("x") == "good"
+    assert llm.base_url == "http://bad:11434"
+    agent = DeveloperAgent(llm=llm)
+    assert agent.llm is llm
+
+
+def test_endpoints_config(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "")
+    base = {"role": "r", "goal": "g", "backstory": "b"}
+    with pytest.raises(ValueError):
+        ConfigModel.model_validate(
+            {"agents": {"developer": {**base, "llm": {
+                "model": "m", "base_url": "http://a", "endpoints": [{"url": "http://b"}]
+            }}}}
+        )
+    with FakeOllama(latency=0, tokens_per_second=0) as one, FakeOllama(
+        latency=0, tokens_per_second=0
+    ) as two:
+        manager = build_manager(
+            {"agents": {"developer": {**base, "llm": {"model": "m", "endpoints": [
+                {"url": one.url, "weight": 1}, {"url": two.url, "weight": 1}
+            ]}}}}
+        )
+        llm = manager.agents["developer"].llm
+        assert isinstance(llm, RoutedLLM)
+        llm.invoke("hello")
+        llm.invoke("hello")
+        assert (one.requests, two.requests) == (1, 1)
+    assert [url for url, _ in manager.residency.models] == [one.url, two.url]
@@ -0,0 +1,171 @@
+import asyncio
+import pathlib
+import sys
+import time
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.developer import DeveloperAgent
+from agents.manager import Manager
+from agents.message import Message
+from agents.tester import TesterAgent
+from core.bus import MessageBus
+from core.scheduler import TaskScheduler
+from core.task import Task, TaskStatus
+
+
+class StubLLM:
+    def __init__(self, output: str) -> None:
+        self.output = output
+
+    def invoke(self, prompt: str) -> str:
+        return self.output
+
+
+def test_highest_priority_runs_first():
+    order = []
+
+    async def execute(task):
+        order.append(task.id)
+        await asyncio.sleep(0)
+        return f"done {task.id}"
+
+    tasks = [Task(1, "a"), Task(2, "b", priority=5), Task(3, "c"), Task(4, "d", priority=1)]
+
+    async def main():
+        scheduler = TaskScheduler(execute)
+        for task in tasks:
+            scheduler.add(task)
+        scheduler.reprioritize(3, 3)
+        await scheduler.run()
+
+    asyncio.run(main())
+    assert order == [2, 3, 4, 1]
+    assert [t.result for t in tasks] == ["done 1", "done 2", "done 3", "done 4"]
+
+
+def test_urgent_task_does_not_wait_behind_long_one():
+    finished = []
+
+    async def execute(task):
+        await asyncio.sleep(0.3 if task.description == "long" else 0.01)
+        finished.append(task.description)
+
+    tasks = [Task(1, "long"), Task(2, "other"), Task(3, "urgent", priority=9)]
+    resources = {1: "a", 2: "a", 3: "b"}
+
+    async def main():
+        scheduler = TaskScheduler(
+            execute, parallelism=2, resource=lambda t: resources[t.id]
+        )
+        for task in tasks:
+            scheduler.add(task)
+        await scheduler.run()
+
+    asyncio.run(main())
+    assert finished == ["urgent", "long", "other"]
+
+
+def test_deadline_cancels_running_and_queued_tasks():
+    async def execute(task):
+        await asyncio.sleep(5)
+
+    now = time.time()
+    running = Task(1, "slow", deadline=now + 0.1, priority=1)
+    queued = Task(2, "queued", deadline=now + 0.1)
+
+    async def main():
+        scheduler = TaskScheduler(execute, partial=lambda t: "half done")
+        scheduler.add(running)
+        scheduler.add(queued)
+        await scheduler.run()
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert time.perf_counter() - start < 2
+    assert running.status is TaskStatus.CANCELLED
+    assert running.result == "cancelled: deadline exceeded\nhalf done"
+    assert queued.status is TaskStatus.CANCELLED
+
+
+def test_supervisor_commands_and_updates_block_separately():
+    bus = MessageBus()
+
+    async def main():
+        bus.send_to_supervisor(Message(sender="manager", content="progress"))
+        start = time.process_time()
+        try:
+            await asyncio.wait_for(bus.recv_command(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+        idle = time.process_time() - start
+        bus.send_to_supervisor(Message(sender="supervisor", content="cancel"))
+        update = await bus.recv_from_supervisor()
+        command = await bus.recv_command()
+        return idle, update.content, command.content
+
+    idle, update, command = asyncio.run(main())
+    assert (update, command) == ("progress", "cancel")
+    assert idle < 0.1
+
+
+def test_supervisor_cancel_kills_subprocess_and_keeps_partial_output(tmp_path):
+    script = tmp_path / "slow.sh"
+    script.write_text("echo started\nsleep 10\n")
+    tester = TesterAgent()
+    writer = DeveloperAgent()
+    writer.llm = StubLLM("text")
+    manager = Manager({"tester": tester, "writer": writer})
+    manager.llm = StubLLM(f"1. sh {script}\n2. write docs")
+
+    async def supervisor():
+        await manager.bus.recv_from_supervisor()
+        manager.bus.send_to_supervisor(Message(sender="supervisor", content="approve"))
+        while True:
+            msg = await manager.bus.recv_from_supervisor()
+            if msg.content == "output":
+                break
+        manager.bus.send_to_supervisor(
+            Message(sender="supervisor", content="cancel", metadata={"task": 1})
+        )
+
+    async def main():
+        control = asyncio.create_task(supervisor())
+        try:
+            return await manager.run("objective")
+        finally:
+            control.cancel()
+
+    start = time.perf_counter()
+    tasks = asyncio.run(main())
+    assert time.perf_counter() - start < 5
+    assert tasks[0].status is TaskStatus.CANCELLED
+    assert tasks[0].result == "cancelled: cancelled by supervisor\nstarted\n"
+    assert tasks[1].status is TaskStatus.DONE
+    assert manager.results[1] == ("write docs", "text")
+
+
+def test_run_applies_deadline_to_tasks():
+    class SlowAgent(DeveloperAgent):
+        async def aact(self, prompt: str, **kwargs) -> str:  # type: ignore[override]
+            await asyncio.sleep(5)
+            return prompt
+
+    manager = Manager({"slow": SlowAgent()}, task_timeout=0.1)
+    manager.llm = StubLLM("1. alpha\n2. beta")
+
+    async def main():
+        async def approve():
+            await manager.bus.recv_from_supervisor()
+            manager.bus.send_to_supervisor(Message(sender="supervisor", content="approve"))
+
+        control = asyncio.create_task(approve())
+        try:
+            return await manager.run("objective", deadline=time.time() + 60)
+        finally:
+            control.cancel()
+
+    tasks = asyncio.run(main())
+    assert [t.status for t in tasks] == [TaskStatus.CANCELLED] * 2
+    assert all(t.deadline is not None and t.deadline < time.time() for t in tasks)
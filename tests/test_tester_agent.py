@@ -1,37 +1,152 @@
 import pathlib
 import sys
 import inspect
+import time
 import pytest
 
 # Ensure src directory on path
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
 
+from agents.message import Message
 from agents.tester import TesterAgent
+from core.process import CommandResult
 
 
 @pytest.mark.asyncio
-async def test_tester_act_async(monkeypatch):
-    """TesterAgent.act should run subprocess in a thread and be async."""
+async def test_tester_act_async():
+    """TesterAgent.act should run the command asynchronously."""
+    agent = TesterAgent()
+    assert inspect.iscoroutinefunction(agent.act)
+    response = await agent.act(f"{sys.executable} -c print('ok')")
+    assert response == "success"
+    assert agent.last_result == "ok\n"
 
-    def fake_run(cmd, capture_output, text, check):
-        class Result:
-            stdout = "ok"
-            stderr = ""
 
-        return Result()
+@pytest.mark.asyncio
+async def test_tester_streams_output_to_bus(tmp_path):
+    """Each output line is dispatched to the bus while the command runs."""
+    sent: list[Message] = []
+
+    class StubBus:
+        def dispatch(self, target: str, message: Message) -> None:
+            sent.append(message)
 
-    called: dict[str, object] = {}
+    agent = TesterAgent()
+    agent.bus = StubBus()
+    agent.max_output = 16
+    script = tmp_path / "emit.py"
+    script.write_text("import sys\nfor i in range(10):\n    print(i)\nprint('bad', file=sys.stderr)\n")
+    response = await agent.act(f"{sys.executable} {script}")
 
-    async def fake_to_thread(func, *args, **kwargs):
-        called["func"] = func
-        return func(*args, **kwargs)
+    assert response == "success"
+    lines = [(m.metadata["stream"], m.metadata["line"]) for m in sent]
+    assert ("stdout", "0") in lines and ("stderr", "bad") in lines
+    assert all(m.content == "output" for m in sent)
+    assert agent.last_result == "2\n3\n4\n5\n6\n7\n8\n9\n"
 
-    monkeypatch.setattr("agents.tester.subprocess.run", fake_run)
-    monkeypatch.setattr("agents.tester.asyncio.to_thread", fake_to_thread)
 
+@pytest.mark.asyncio
+async def test_tester_kills_hung_command(tmp_path):
+    """A command producing no output is killed after the idle timeout."""
     agent = TesterAgent()
-    assert inspect.iscoroutinefunction(agent.act)
-    response = await agent.act("echo hi")
-    assert called["func"] is fake_run
-    assert response == "success"
-    assert agent.last_result == "ok"
+    agent.idle_timeout = 0.2
+    script = tmp_path / "hang.py"
+    script.write_text("import time\ntime.sleep(30)\n")
+    start = time.monotonic()
+    response = await agent.act(f"{sys.executable} {script}")
+    assert response == "failure"
+    assert time.monotonic() - start < 5
+    assert "idle" in agent.last_result
+
+
+@pytest.mark.asyncio
+async def test_tester_runs_only_affected_tests(monkeypatch, tmp_path):
+    """After a green run only tests importing changed files are selected."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "alpha.py").write_text("A = 1\n")
+    (tmp_path / "src" / "beta.py").write_text("B = 1\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_alpha.py").write_text("from alpha import A\n")
+    (tmp_path / "tests" / "test_beta.py").write_text("import beta\n")
+
+    commands: list[list[str]] = []
+
+    async def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        return CommandResult(returncode=0, stdout="ok", stderr="")
+
+    monkeypatch.setattr("agents.tester.run_command", fake_run)
+
+    agent = TesterAgent()
+    agent.root = tmp_path
+    agent.cache_results = False
+    assert await agent.act("pytest -q") == "success"
+    assert commands[-1] == ["pytest", "-q"]
+
+    (tmp_path / "src" / "beta.py").write_text("B = 2\n")
+    agent.note_changes([tmp_path / "src" / "beta.py"])
+    assert await agent.act("pytest -q") == "success"
+    assert commands[-1] == ["pytest", "-q", str(tmp_path.resolve() / "tests" / "test_beta.py")]
+
+    assert await agent.act("pytest -q") == "success"
+    assert len(commands) == 2
+    assert agent.last_result == "no affected tests"
+
+
+@pytest.mark.asyncio
+async def test_tester_failure_does_not_mark_green(monkeypatch, tmp_path):
+    """A failing run keeps the changed files pending for the next run."""
+    (tmp_path / "alpha.py").write_text("A = 1\n")
+    (tmp_path / "test_alpha.py").write_text("import alpha\n")
+
+    outcomes = ["ok", "fail", "ok"]
+    commands: list[list[str]] = []
+
+    async def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        if outcomes.pop(0) == "fail":
+            return CommandResult(returncode=1, stdout="", stderr="boom")
+        return CommandResult(returncode=0, stdout="ok", stderr="")
+
+    monkeypatch.setattr("agents.tester.run_command", fake_run)
+
+    agent = TesterAgent()
+    agent.root = tmp_path
+    agent.cache_results = False
+    assert await agent.act("pytest") == "success"
+    (tmp_path / "alpha.py").write_text("A = 2\n")
+    assert await agent.act("pytest") == "failure"
+    assert await agent.act("pytest") == "success"
+    expected = ["pytest", str(tmp_path.resolve() / "test_alpha.py")]
+    assert commands[1:] == [expected, expected]
+
+
+@pytest.mark.asyncio
+async def test_tester_reuses_result_for_unchanged_tree(monkeypatch, tmp_path):
+    """Identical commands on an identical tree are served from the cache."""
+    (tmp_path / "alpha.py").write_text("A = 1\n")
+    (tmp_path / "test_alpha.py").write_text("import alpha\n")
+    calls: list[list[str]] = []
+
+    async def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return CommandResult(returncode=1, stdout="", stderr=f"fail {len(calls)}")
+
+    monkeypatch.setattr("agents.tester.run_command", fake_run)
+
+    agent = TesterAgent()
+    agent.root = tmp_path
+    assert await agent.act("pytest") == "failure"
+    assert await agent.act("pytest") == "failure"
+    assert agent.last_result == "fail 1"
+    assert len(calls) == 1
+
+    fresh = TesterAgent()
+    fresh.root = tmp_path
+    assert await fresh.act("pytest") == "failure"
+    assert len(calls) == 1
+
+    (tmp_path / "alpha.py").write_text("A = 2\n")
+    assert await agent.act("pytest") == "failure"
+    assert agent.last_result == "fail 2"
+    assert len(calls) == 2
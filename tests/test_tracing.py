@@ -0,0 +1,88 @@
+import asyncio
+import json
+import pathlib
+import sys
+
+import pytest
+
+# Ensure src directory on path
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+from agents.message import Message
+from core.bus import MessageBus
+from core.tracing import TRACER, Tracer, span, traced
+
+
+@pytest.fixture
+def tracer():
+    TRACER.clear()
+    TRACER.enable()
+    try:
+        yield TRACER
+    finally:
+        TRACER.disable()
+        TRACER.clear()
+
+
+def test_disabled_tracer_records_nothing():
+    TRACER.clear()
+    with span("idle"):
+        pass
+    assert list(TRACER.spans()) == []
+
+
+def test_ring_buffer_drops_oldest():
+    t = Tracer(capacity=2)
+    t.enable()
+    for name in ("a", "b", "c"):
+        with t.span(name):
+            pass
+    assert [e["name"] for e in t.spans()] == ["b", "c"]
+
+
+def test_traced_uses_concrete_class_name(tracer):
+    class Base:
+        @traced()
+        def act(self):
+            return 1
+
+        @traced()
+        async def aact(self):
+            return 2
+
+    class Child(Base):
+        pass
+
+    assert Child().act() == 1
+    assert asyncio.run(Child().aact()) == 2
+    names = [e["name"] for e in tracer.spans()]
+    assert names == ["Child.act", "Child.aact"]
+
+
+def test_bus_records_queue_wait(tracer):
+    bus = MessageBus()
+    bus.register("worker")
+
+    async def main():
+        await bus.send("worker", Message(sender="a", content="x"))
+        await asyncio.sleep(0.01)
+        return await bus.recv("worker")
+
+    assert asyncio.run(main()).content == "x"
+    (wait,) = tracer.spans("bus.queue_wait")
+    assert wait["dur"] >= 10_000
+    assert wait["args"] == {"target": "worker"}
+    assert list(tracer.spans("MessageBus.send"))
+
+
+def test_export_writes_chrome_trace(tracer, tmp_path):
+    with span("outer", cat="test", step=1):
+        with span("inner"):
+            pass
+    path = tmp_path / "trace.json"
+    tracer.export(path)
+    data = json.loads(path.read_text())
+    events = {e["name"]: e for e in data["traceEvents"]}
+    assert events["outer"]["ph"] == "X"
+    assert events["outer"]["args"] == {"step": 1}
+    assert events["outer"]["dur"] >= events["inner"]["dur"]
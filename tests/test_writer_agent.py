@@ -41,3 +41,26 @@ def test_writer_observe_updates_documents(tmp_path):
     agent.observe(file_path)
 
     assert agent.documents[file_path] == "more text"
+
+
+def test_writer_documents_memory_is_bounded(tmp_path):
+    """Only metadata stays resident; contents reload lazily from disk."""
+    agent = WriterAgent()
+    agent.documents.max_cached_chars = 10
+    for i in range(20):
+        agent.llm = StubLLM(f"document {i:02d}")
+        agent.act("Write", path=tmp_path / f"doc{i}.txt")
+
+    assert len(agent.documents) == 20
+    assert agent.documents.cached_chars <= 10
+    assert agent.documents[tmp_path / "doc3.txt"] == "document 03"
+    info = agent.documents.info(tmp_path / "doc3.txt")
+    assert info.size == len("document 03")
+
+
+def test_writer_observe_missing_file(tmp_path):
+    agent = WriterAgent()
+    agent.llm = StubLLM("unused")
+    missing = tmp_path / "missing.txt"
+    agent.observe(missing)
+    assert agent.documents[missing] == ""